@@ -185,7 +185,7 @@ class Bar100(Visualization):
                                *args, **kwargs)
         self.bars.append(bars)
         self._add_name(name)
-        self._fit_axes()
+        self._fit()
 
         """
         Draw the legend.
@@ -438,23 +438,27 @@ class Bar100(Visualization):
 
         label_style = label_style or { }
 
-        for value in values:
-            if 'label' not in value:
-                continue
+        """
+        Draw all the labels in a batch so that the drawable is re-drawn only once.
+        """
+        with self.drawable.legend.batch():
+            for value in values:
+                if 'label' not in value:
+                    continue
 
-            label = value['label']
+                label = value['label']
 
-            """
-            If the label is empty or `None`, there is nothing to draw, so skip it.
-            """
-            if not label:
-                continue
+                """
+                If the label is empty or `None`, there is nothing to draw, so skip it.
+                """
+                if not label:
+                    continue
 
-            style = value.get('style', { })
-            default_style = dict(**kwargs)
-            default_style.update(style)
-            default_style.update(label_style)
-            default_style.update(value.get('label_style', { }))
-            default_style.pop('pad', None)
+                style = value.get('style', { })
+                default_style = dict(**kwargs)
+                default_style.update(style)
+                default_style.update(label_style)
+                default_style.update(value.get('label_style', { }))
+                default_style.pop('pad', None)
 
-            self.drawable.legend.draw_text_only(label, label_style=default_style)
+                self.drawable.legend.draw_text_only(label, label_style=default_style)
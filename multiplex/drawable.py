@@ -24,11 +24,22 @@ Some important functionality that the :class:`~Drawable` class provides:
 - The :func:`~drawable.Drawable.savefig` and :func:`~drawable.Drawable.show` functions.
   These functions mirror matplotlib's `savefig <https://matplotlib.org/3.1.1/api/_as_gen/matplotlib.pyplot.savefig.html>`_ and `show <https://matplotlib.org/3.1.1/api/_as_gen/matplotlib.pyplot.show.html>`_ functions respectively.
   When you call these functions, the :class:`~Drawable` re-draws the visualization, making sure that the title, caption and legend do not overlap.
+  The :class:`~Drawable` only re-draws the components that changed since the last time it re-drew the visualization.
+  If you change the figure without going through the :class:`~Drawable`, call the :func:`~drawable.Drawable.invalidate` function before saving or showing it.
+- The :func:`~drawable.Drawable.batch` function.
+  When you draw many components, you can draw them in a batch so that the :class:`~Drawable` lays out the visualization only once, at the end:
+
+  .. code-block:: python
+
+    with viz.batch():
+        for x, y, text in annotations:
+            viz.annotate(text, (x, x + 1), y)
 - The :func:`~drawable.Drawable.annotate` function.
   You can call this function to add text to any plot.
   This function is useful to point to information that is not immediately obvious, or to draw your readers' attention.
 """
 
+from contextlib import contextmanager
 import matplotlib.pyplot as plt
 import os
 import re
@@ -37,6 +48,7 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 from bar.bar100 import Bar100
 from graph.graph import Graph
+from layout import LayoutContext
 from legend import Legend
 from population.population import Population
 from text.annotation import Annotation
@@ -62,6 +74,8 @@ class Drawable():
     :vartype secondary: :class:`matplotlib.axes.Axes`
     :var caption: The caption, displayed under the title.
     :vartype caption: :class:`~text.annotation.Annotation`
+    :ivar context: The layout context, which caches the renderer and transformations while the figure does not change.
+    :vartype context: :class:`~layout.LayoutContext`
 
     :ivar bar100: The 100% bar chart visualization that is being used.
                   When no visualization has been created, it is set to `None`.
@@ -80,8 +94,19 @@ class Drawable():
     :vartype legend: :class:`~legend.Legend`
     :ivar annotations: The annotations in the visualization.
     :vartype annotations: list of :class:`~text.annotation.Annotation`
+
+    :cvar COMPONENTS: The components that the :class:`~Drawable` re-draws: the visualizations, the annotations, the legend, the caption and the title.
+    :vartype COMPONENTS: tuple of str
+    :cvar LAYOUT_METHODS: The prefixes of the axes' methods that change the layout, such as the limits, scales, position, labels, ticks and title.
+                          When they are called through the :class:`~Drawable`, all components become dirty.
+    :vartype LAYOUT_METHODS: tuple of str
     """
 
+    COMPONENTS = ( 'visualizations', 'annotations', 'legend', 'caption', 'title' )
+    LAYOUT_METHODS = ( 'set_x', 'set_y', 'set_position', 'set_title', 'set_aspect', 'set_box_aspect', 'set_anchor', 'set_adjustable',
+                       'set_axis_', 'set_frame_on', 'axis', 'margins', 'autoscale', 'relim', 'apply_aspect',
+                       'tick_params', 'locator_params', 'minorticks_', 'invert_', 'label_outer' )
+
     def __init__(self, figure, axes=None):
         """
         Create the drawable with the figure.
@@ -98,6 +123,7 @@ class Drawable():
         self.axes = plt.gca() if axes is None else axes
         self.secondary = self.axes
         self.caption = None
+        self.context = LayoutContext(self.figure, self.axes)
 
         self.annotations = [ ]
         self.legend = Legend(self)
@@ -106,6 +132,11 @@ class Drawable():
         self.slope = None
         self.timeseries = None
 
+        self._dirty = set(self.COMPONENTS)
+        self._generation, self._header = None, (None, None)
+        self._batch, self._deferred = 0, { }
+        self._ticks_generation = None
+
     def set_caption(self, caption, alpha=0.8, lineheight=1.25, *args, **kwargs):
         """
         Add a caption to the subplot.
@@ -131,6 +162,7 @@ class Drawable():
                                   transform=self.axes.transAxes,
                                   *args, **kwargs)
         self.caption.draw()
+        self.invalidate('caption')
         self.redraw()
         return self.caption
 
@@ -138,97 +170,232 @@ class Drawable():
         """
         Re-create the title, with the goal of leaving enough space to fit the caption and the legend.
         Afterwards, it redraws the legend.
+
+        Only the dirty components are re-drawn, along with the components that depend on them.
+        The caption depends on the legend, and the title depends on both the legend and the caption.
+        If the figure's size or the axes' limits changed since the last re-draw, all components are dirty.
+        If the title or the x-axis label changed, for example through the axes directly, the header is dirty as well.
+        If no component is dirty, this function does nothing.
+        In a :func:`~drawable.Drawable.batch`, the :class:`~Drawable` is only re-drawn when the batch ends.
         """
 
-        self.figure.canvas.draw()
+        if self._batch:
+            return
+
+        """
+        Find the components that need to be re-drawn.
+        """
+        self.context.validate()
+        if self.context.generation != self._generation:
+            self._dirty.update(self.COMPONENTS)
+
+        """
+        Changes to the title and to the x-axis label do not change any transformation, so the layout context cannot detect them.
+        Therefore the header's text is compared with the text when the header was last re-drawn, which is cheap.
+        """
+        titles, labels = self._get_header_state()
+        if titles != self._header[0]:
+            self._dirty.add('title')
+        if labels != self._header[1]:
+            self._dirty.add('legend')
+
+        if not self._dirty:
+            return
+
+        dirty = set(self._dirty)
+        if 'legend' in dirty:
+            dirty.update(( 'caption', 'title' ))
+        if 'caption' in dirty:
+            dirty.add('title')
+
+        self.context.draw()
 
         # redraw all visualizations
-        for viz in [ self.bar100, self.population, self.slope, self.timeseries ]:
-            if viz:
-                viz.redraw()
+        if 'visualizations' in dirty:
+            for viz in [ self.bar100, self.population, self.slope, self.timeseries ]:
+                if viz:
+                    viz.redraw()
 
         # redraw all annotations
-        for annotation in self.annotations:
-            annotation.redraw()
+        if 'annotations' in dirty:
+            for annotation in self.annotations:
+                annotation.redraw()
 
-        self.legend.redraw()
-        self._redraw_caption()
-        self._redraw_title()
+        self._redraw_header(dirty)
 
-    def _redraw_caption(self):
         """
-        Re-draw the caption, re-positioning so that it does not overlap with the legend or axes.
+        Re-drawing may itself change the layout, so remember the layout after re-drawing.
         """
+        self._dirty.clear()
+        self.context.validate()
+        self._generation = self.context.generation
+        self._header = self._get_header_state()
 
-        if not self.caption:
-            return
+    @contextmanager
+    def batch(self):
+        """
+        Draw many components while laying out the visualization only once.
+        In a batch, the :class:`~Drawable` does not re-draw itself or draw the canvas every time that a component is added.
+        Work that the visualizations need to do after drawing, such as fitting the axes, is also done only once.
+        The legend annotations are added in a :func:`~legend.Legend.batch` too.
+        When the batch ends, the deferred work runs, and then the :class:`~Drawable` re-draws itself once.
 
-        figure, axes = self.figure, self.axes
+        Batches may be nested, in which case the deferred work runs when the outermost batch ends.
+
+        .. code-block:: python
+
+            with viz.batch():
+                for x, y, text in annotations:
+                    viz.annotate(text, (x, x + 1), y)
 
+        :return: The drawable itself.
+        :rtype: :class:`~Drawable`
         """
-        Move the caption up to make space for the legend and the label.
+
+        self._batch += 1
+        try:
+            with self.legend.batch():
+                yield self
+        finally:
+            self._batch -= 1
+            if not self._batch:
+                deferred, self._deferred = self._deferred, { }
+                for f in deferred:
+                    f()
+                self.redraw()
+
+    def _defer(self, f):
         """
-        y = 1.015
-        y += self.legend.get_virtual_bb(transform=self.axes.transAxes).height
+        Call the given function now or, in a batch, when the batch ends.
+        A function that is deferred several times in the same batch is only called once.
 
+        :param f: The function to call, which takes no arguments.
+        :type f: function
         """
-        If the x-label is on top, make space for it in the caption.
-        In this case, it is assumed that the ticks are also at the top.
-        This is because for some reason they may be set to 'unknown'.
+
+        if self._batch:
+            self._deferred[f] = None
+        else:
+            f()
+
+    def invalidate(self, *components):
         """
-        if axes.xaxis.get_label_position() == 'top':
-            y += self._get_xlabel(transform=self.axes.transAxes).height * 2
+        Mark components as dirty so that the next :func:`~drawable.Drawable.redraw` re-draws them.
+        The :class:`~Drawable` marks components as dirty itself when they change through it.
+        Call this function when you change the figure in some other way, for example through the axes directly.
 
-            xtick_labels_bb = self._get_xtick_labels(transform=axes.transAxes)
-            if xtick_labels_bb:
-                y += max(xtick_labels_bb, key=lambda bb: bb.height).height * 2
+        :param components: The names of the components to mark as dirty, taken from :attr:`~drawable.Drawable.COMPONENTS`.
+                           If no components are given, all components are marked as dirty.
+        :type components: str
+
+        :raises ValueError: When a component is not one of the :attr:`~drawable.Drawable.COMPONENTS`.
+        """
+
+        for component in components:
+            if component not in self.COMPONENTS:
+                raise ValueError(f"Unknown component { component }; expected one of { ', '.join(self.COMPONENTS) }")
 
-        self.caption.redraw()
-        self.caption.set_position((0, y), ha='left', va='bottom', transform=self.axes.transAxes)
+        self._dirty.update(components or self.COMPONENTS)
 
-    def _redraw_title(self):
+    def _redraw_header(self, dirty):
         """
-        Re-draw the title, adding enough padding so that there is enough space for the axes label, the legend and the caption.
+        Re-draw the dirty components of the header, above the axes.
+        From the bottom up, the header is made up of the x-axis label and tick labels if they are at the top, the legend, the caption and the title.
+        The header is laid out once by :func:`~drawable.Drawable._get_header`, and then each dirty component moves into its place.
+
+        :param dirty: The names of the dirty components.
+        :type dirty: set of str
         """
 
-        figure, axes = self.figure, self.axes
+        axes = self.axes
 
-        title = axes.get_title(loc='left')
+        if not { 'legend', 'caption', 'title' } & dirty:
+            return
 
         """
-        Get the height of the caption and the height of the legend.
-        The title should allow enough padding to make space for both.
+        The caption may wrap differently than before, so re-draw it before measuring it.
         """
-        caption_height = 0
-        if self.caption:
-            caption_height = util.to_px(axes, self.caption.get_virtual_bb(transform=axes.transAxes),
-                                        transform=axes.transAxes).height
+        if self.caption and 'caption' in dirty:
+            self.caption.redraw()
+
+        legend_y, caption_y, title_pad = self._get_header()
+        if 'legend' in dirty:
+            self.legend.redraw(y=legend_y)
+        if self.caption and 'caption' in dirty:
+            self.caption.set_position((0, caption_y), ha='left', va='bottom', transform=axes.transAxes)
+        if 'title' in dirty:
+            self.axes.set_title(axes.get_title(loc='left'), loc='left', pad=title_pad)
 
-        legend_height = util.to_px(axes, self.legend.get_virtual_bb(transform=axes.transAxes),
-                                   transform=axes.transAxes).height
+    def _get_header_state(self):
+        """
+        Get the state of the header that the layout context does not watch: the text of the titles and of the x-axis label, and where the x-axis label and ticks are.
+        If this state changes, the header has to be laid out again.
 
+        :return: A tuple made up of the titles' state, which only affects the title, and the x-axis label's state, which affects the entire header.
+        :rtype: tuple of tuple
         """
-        If the x-label is on top, make space for it in the title.
-        In this case, it is assumed that the ticks are also at the top.
+
+        axes = self.axes
+        titles = tuple( axes.get_title(loc=loc) for loc in ( 'left', 'center', 'right' ) )
+        labels = (axes.xaxis.get_label_text(), axes.xaxis.get_label_position(), axes.xaxis.get_ticks_position())
+        return (titles, labels)
+
+    def _get_header(self):
+        """
+        Lay out the header in one pass.
+        The function measures the x-axis label and tick labels, the legend and the caption once, and stacks them vertically.
+        The title goes on top, so its padding leaves enough space for all the other components.
+
+        :return: A tuple made up of the y-coordinate of the legend's bottom and the y-coordinate of the caption's bottom, both in axes coordinates, and the title's padding in pixels.
+        :rtype: tuple of float
+        """
+
+        axes = self.axes
+
+        """
+        Measure the components in axes coordinates.
+        """
+        labels_height = self._get_top_labels_height(transform=axes.transAxes)
+        legend_height = self.legend.get_virtual_bb(transform=axes.transAxes).height
+        caption_height = self.caption.get_virtual_bb(transform=axes.transAxes).height if self.caption else 0
+
+        """
+        Stack the components, leaving some padding between the legend and the caption, and between the caption and the title.
+        """
+        pad = 0.015
+        legend_y = 1 + labels_height
+        caption_y = legend_y + legend_height + pad
+        scale = abs(axes.transAxes.transform((0, 1))[1] - axes.transAxes.transform((0, 0))[1])
+        title_pad = (abs(labels_height) + abs(legend_height) + abs(caption_height) + pad * 2) * scale
+
+        return (legend_y, caption_y, title_pad)
+
+    def _get_top_labels_height(self, transform=None):
+        """
+        Get the space that the x-axis label and tick labels need above the axes.
+        If the x-axis label is at the bottom, they need no space.
+        If the x-label is on top, it is assumed that the ticks are also at the top.
         This is because for some reason they may be set to 'unknown'.
+
+        :param transform: The bounding box transformation.
+                          If `None` is given, the data transformation is used.
+        :type transform: None or :class:`matplotlib.transforms.TransformNode`
+
+        :return: The height of the x-axis label and tick labels, with padding, or 0 if they are at the bottom.
+        :rtype: float
         """
-        label_height = 0
+
+        axes = self.axes
+
+        height = 0
         if axes.xaxis.get_label_position() == 'top':
-            label_bb = self._get_xlabel(transform=axes.transData)
-            label_height = util.to_px(axes, label_bb,
-                                      transform=axes.transData).height * 2
-            xtick_labels_bb = self._get_xtick_labels(transform=axes.transData)
+            height += self._get_xlabel(transform=transform).height * 2
+
+            xtick_labels_bb = self._get_xtick_labels(transform=transform)
             if xtick_labels_bb:
-                label_bb = max(xtick_labels_bb, key=lambda bb: bb.height)
-                label_height += util.to_px(axes, label_bb, transform=axes.transData).height * 2
+                height += max(xtick_labels_bb, key=lambda bb: bb.height).height * 2
 
-        """
-        Add some extra padding to the height.
-        """
-        height = abs(caption_height) + abs(legend_height) + abs(label_height)
-        pad_px = abs(self.axes.transAxes.transform((0, 0.015))[1] - self.axes.transAxes.transform((0, 0))[1])
-        pad = pad_px * 2
-        self.axes.set_title(title, loc='left', pad=(height + pad))
+        return height
 
     def _get_xlabel(self, transform=None):
         """
@@ -245,7 +412,7 @@ class Drawable():
         figure, axes = self.figure, self.axes
 
         transform = transform or axes.transData
-        return util.get_bb(figure, axes, axes.xaxis.get_label(), transform=transform)
+        return util.get_bb(figure, axes, axes.xaxis.get_label(), transform=transform, context=self.context)
 
     def _get_xtick_labels(self, transform=None):
         """
@@ -261,9 +428,18 @@ class Drawable():
 
         figure, axes = self.figure, self.axes
 
-        figure.canvas.draw()
+        """
+        The tick labels are only positioned when the figure is drawn, but they do not need to be rendered.
+        In a batch, the figure is only drawn again if the layout changed since the last time.
+        """
+        self.context.validate()
+        if not self._batch or self._ticks_generation != self.context.generation:
+            self.context.draw()
+            self.context.validate()
+            self._ticks_generation = self.context.generation
+
         transform = transform or axes.transData
-        return [ util.get_bb(figure, axes, label, transform=transform)
+        return [ util.get_bb(figure, axes, label, transform=transform, context=self.context)
                  for label in axes.xaxis.get_ticklabels(which='both') ]
 
     def savefig(self, *args, **kwargs):
@@ -308,10 +484,20 @@ class Drawable():
             Try to get the attribute from the axes.
             If arguments were given, then the attribute is treated as a method call.
             Otherwise, it is treated as a normal attribute call.
+
+            Only the methods that change the layout, taken from :attr:`~drawable.Drawable.LAYOUT_METHODS`, make all components dirty.
+            Other calls, like plotting, may still change the limits by autoscaling, but :func:`~drawable.Drawable.redraw` detects these changes through the layout context.
+            Since cached measurements are only validated once per layout pass, the layout context is validated after the layout changes.
             """
 
             if callable(getattr(self.axes, name)):
-                return getattr(self.axes, name)(*args, **kwargs)
+                if not name.startswith(self.LAYOUT_METHODS):
+                    return getattr(self.axes, name)(*args, **kwargs)
+
+                self.invalidate()
+                result = getattr(self.axes, name)(*args, **kwargs)
+                self.context.validate()
+                return result
             else:
                 return getattr(self.axes, name)
 
@@ -346,7 +532,7 @@ class Drawable():
         """
 
         annotation = Annotation(self, text, x, y, pad=pad, *args, **kwargs)
-        self.figure.canvas.draw()
+        self._defer(self.context.draw)
 
         """
         Draw the marker if it is given.
@@ -364,6 +550,7 @@ class Drawable():
                 self.axes.plot((x[0] + x[1])/2., y, *args, **marker)
 
         self.annotations.append(annotation)
+        self.invalidate('annotations')
 
         return annotation
 
@@ -376,6 +563,7 @@ class Drawable():
         :rtype: list of :class:`matplotlib.patches.Rectangle`
         """
 
+        self.invalidate()
         self.bar100 = self.bar100 or Bar100(self)
         return self.bar100.draw(*args, **kwargs)
 
@@ -388,6 +576,7 @@ class Drawable():
         :rtype: tuple
         """
 
+        self.invalidate()
         graph = Graph(self)
         return graph.draw(*args, **kwargs)
 
@@ -400,6 +589,7 @@ class Drawable():
         :rtype: list of list of :class:`matplotlib.collections.PathCollection`
         """
 
+        self.invalidate()
         self.population = self.population if self.population else Population(self)
         return self.population.draw(*args, **kwargs)
 
@@ -412,6 +602,7 @@ class Drawable():
         :rtype: tuple (:class:`matplotlib.lines.Line2D`, list of :class:`~text.annotation.Annotation`)
         """
 
+        self.invalidate()
         self.slope = self.slope or Slope(self)
         return self.slope.draw(*args, **kwargs)
 
@@ -427,6 +618,7 @@ class Drawable():
         :rtype: list of tuple
         """
 
+        self.invalidate()
         text_annotation = TextAnnotation(self)
         return text_annotation.draw(*args, **kwargs)
 
@@ -439,5 +631,6 @@ class Drawable():
         :rtype: tuple
         """
 
+        self.invalidate()
         self.timeseries = self.timeseries or TimeSeries(self)
         return self.timeseries.draw(*args, **kwargs)
@@ -0,0 +1,167 @@
+"""
+Directed graphs draw many arrows with the same style together, as one collection of shafts and one collection of heads.
+The heads keep their size in points, so their direction and the point where the shafts stop depend on how the data is displayed.
+The axes' limits, their aspect ratio and the figure's size can all change after the graph is drawn, for example when the legend is drawn.
+Therefore the :class:`~ArrowShafts` and :class:`~ArrowHeads` collections calculate their geometry again every time that they are drawn.
+"""
+
+from matplotlib.collections import LineCollection, PolyCollection
+import numpy as np
+
+def get_directions(transform, start, end):
+    """
+    Get the direction of each arrow on the display.
+
+    :param transform: The transformation from the arrows' coordinates to display coordinates.
+    :type transform: :class:`matplotlib.transforms.Transform`
+    :param start: The start positions of the arrows as an array with one row for each arrow.
+    :type start: :class:`numpy.ndarray`
+    :param end: The end positions of the arrows, where the heads point, as an array with one row for each arrow.
+    :type end: :class:`numpy.ndarray`
+
+    :return: A tuple containing the arrows' unit directions and lengths on the display.
+             Arrows without a length on the display have no direction.
+    :rtype: tuple of :class:`numpy.ndarray`
+    """
+
+    start, end = transform.transform(start), transform.transform(end)
+    length = np.hypot(*(end - start).T)
+    direction = np.divide(end - start, length[:, None], out=np.zeros_like(start), where=length[:, None] > 0)
+    return direction, length
+
+class ArrowShafts(LineCollection):
+    """
+    The :class:`~ArrowShafts` is a collection of the shafts of arrows.
+    Each shaft starts at the arrow's start and stops where the arrow's head starts.
+
+    :ivar start: The start positions of the arrows, in data coordinates.
+    :vartype start: :class:`numpy.ndarray`
+    :ivar end: The end positions of the arrows, where the heads point, in data coordinates.
+    :vartype end: :class:`numpy.ndarray`
+    :ivar headlength: The length of each arrow's head in points.
+    :vartype headlength: :class:`numpy.ndarray`
+    """
+
+    def __init__(self, start, end, headlength, transform, dpi, *args, **kwargs):
+        """
+        Create the collection of shafts.
+        The shafts are retracted with the given transformation until the collection is drawn.
+
+        Any additional arguments and keyword arguments are passed on to the `matplotlib.collections.LineCollection <https://matplotlib.org/3.1.1/api/collections_api.html#matplotlib.collections.LineCollection>`_.
+
+        :param start: The start positions of the arrows as an array with one row for each arrow.
+        :type start: :class:`numpy.ndarray`
+        :param end: The end positions of the arrows, where the heads point, as an array with one row for each arrow.
+        :type end: :class:`numpy.ndarray`
+        :param headlength: The length of each arrow's head in points.
+        :type headlength: :class:`numpy.ndarray`
+        :param transform: The transformation from data coordinates to display coordinates.
+        :type transform: :class:`matplotlib.transforms.Transform`
+        :param dpi: The figure's resolution, used to convert points to pixels.
+        :type dpi: float
+        """
+
+        self.start, self.end, self.headlength = start, end, headlength
+        super().__init__(self._get_segments(transform, dpi / 72.), *args, **kwargs)
+
+    def draw(self, renderer):
+        """
+        Retract the shafts with the current transformation and draw them.
+
+        :param renderer: The renderer used to draw the shafts.
+        :type renderer: :class:`matplotlib.backend_bases.RendererBase`
+        """
+
+        self.set_segments(self._get_segments(self.get_transform(), renderer.points_to_pixels(1.)))
+        super().draw(renderer)
+
+    def _get_segments(self, transform, scale):
+        """
+        Get the segments of the shafts, which stop where the heads start.
+
+        :param transform: The transformation from data coordinates to display coordinates.
+        :type transform: :class:`matplotlib.transforms.Transform`
+        :param scale: The number of pixels in a point.
+        :type scale: float
+
+        :return: The segments as an array with one row for each shaft, each made up of the shaft's start and end in data coordinates.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        direction, length = get_directions(transform, self.start, self.end)
+        shaft = transform.transform(self.end) - direction * np.minimum(self.headlength * scale, length)[:, None]
+        return np.stack((self.start, transform.inverted().transform(shaft)), axis=1)
+
+class ArrowHeads(PolyCollection):
+    """
+    The :class:`~ArrowHeads` is a collection of the triangular heads of arrows.
+    The heads are drawn in points around the arrows' ends, so that they keep their size and shape when the axes are resized.
+
+    :ivar start: The start positions of the arrows, in data coordinates.
+    :vartype start: :class:`numpy.ndarray`
+    :ivar headwidth: The width of each arrow's head in points.
+    :vartype headwidth: :class:`numpy.ndarray`
+    :ivar headlength: The length of each arrow's head in points.
+    :vartype headlength: :class:`numpy.ndarray`
+    """
+
+    def __init__(self, start, end, headwidth, headlength, offset_transform, *args, **kwargs):
+        """
+        Create the collection of heads.
+        The heads point in the direction that the given transformation shows until the collection is drawn.
+
+        Any additional arguments and keyword arguments are passed on to the `matplotlib.collections.PolyCollection <https://matplotlib.org/3.1.1/api/collections_api.html#matplotlib.collections.PolyCollection>`_.
+
+        :param start: The start positions of the arrows as an array with one row for each arrow.
+        :type start: :class:`numpy.ndarray`
+        :param end: The end positions of the arrows, where the heads point, as an array with one row for each arrow.
+                    These are the offsets of the heads.
+        :type end: :class:`numpy.ndarray`
+        :param headwidth: The width of each arrow's head in points.
+        :type headwidth: :class:`numpy.ndarray`
+        :param headlength: The length of each arrow's head in points.
+        :type headlength: :class:`numpy.ndarray`
+        :param offset_transform: The transformation from data coordinates to display coordinates.
+        :type offset_transform: :class:`matplotlib.transforms.Transform`
+        """
+
+        """
+        Older versions of matplotlib call the offsets' transformation ``transOffset``.
+        """
+        self.start, self.headwidth, self.headlength = start, headwidth, headlength
+        if hasattr(PolyCollection, 'set_offset_transform'):
+            kwargs['offset_transform'] = offset_transform
+        else:
+            kwargs['transOffset'] = offset_transform
+        super().__init__(self._get_heads(offset_transform, end), *args, offsets=end, **kwargs)
+
+    def draw(self, renderer):
+        """
+        Point the heads in the arrows' current direction and draw them.
+
+        :param renderer: The renderer used to draw the heads.
+        :type renderer: :class:`matplotlib.backend_bases.RendererBase`
+        """
+
+        self.set_verts(self._get_heads(self.get_offset_transform(), self.get_offsets()))
+        super().draw(renderer)
+
+    def _get_heads(self, transform, end):
+        """
+        Get the triangles of the heads in points, relative to the arrows' ends.
+
+        :param transform: The transformation from data coordinates to display coordinates.
+        :type transform: :class:`matplotlib.transforms.Transform`
+        :param end: The end positions of the arrows, where the heads point, as an array with one row for each arrow.
+        :type end: :class:`numpy.ndarray`
+
+        :return: The heads as an array with one row for each head, each made up of the triangle's three corners.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        direction, _ = get_directions(transform, self.start, end)
+        normal = np.stack((-direction[:, 1], direction[:, 0]), axis=1)
+        base = - direction * self.headlength[:, None]
+        return np.stack((np.zeros_like(base),
+                         base + normal * self.headwidth[:, None] / 2,
+                         base - normal * self.headwidth[:, None] / 2), axis=1)
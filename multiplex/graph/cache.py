@@ -0,0 +1,203 @@
+"""
+Laying out a graph is usually the slowest part of drawing it.
+Graphs are often drawn again with the same structure, for example to try different colors, so the :class:`~LayoutCache` remembers the positions of the nodes.
+
+Layouts are cached by the graph's structure—its nodes, its edges and their weights—and by the arguments of the layout.
+Node and edge attributes that do not change the layout, like their style, do not change the key.
+The cache lives in memory, but it can also keep the layouts in a directory to re-use them between sessions:
+
+.. code-block:: python
+
+    from multiplex.graph.graph import Graph
+    from multiplex.graph.cache import LayoutCache
+    Graph.layouts = LayoutCache(directory='.layouts')
+
+When the structure of a graph changes only a bit, there is no cached layout for it.
+However, the new layout starts from the last positions of the nodes that have not changed.
+In this way, the layout needs fewer iterations to settle, and the graph keeps its shape.
+"""
+
+import hashlib
+import networkx as nx
+import os
+import pickle
+import sys
+
+sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..'))
+from metrics import LRUCache
+
+class LayoutCache(object):
+    """
+    The :class:`~LayoutCache` stores the positions that the `networkx.spring_layout <https://networkx.github.io/documentation/stable/reference/generated/networkx.drawing.layout.spring_layout.html>`_ function generates.
+
+    :ivar layouts: The layouts in memory.
+                   The keys are the hashes of the graphs and the layout arguments, and the values are the positions of the nodes.
+                   Its :func:`~metrics.LRUCache.info` function returns the cache's hit and miss statistics.
+    :vartype layouts: :class:`~metrics.LRUCache`
+    :ivar directory: The directory where the layouts are stored, or `None` if they are only kept in memory.
+    :vartype directory: None or str
+    :ivar overlap: The minimum fraction of a graph's nodes that the last layout with the same arguments must have for the new layout to start from its positions.
+    :vartype overlap: float
+    """
+
+    def __init__(self, maxsize=32, directory=None, overlap=0.5):
+        """
+        Create an empty cache.
+
+        :param maxsize: The maximum number of layouts to keep in memory.
+        :type maxsize: int
+        :param directory: The directory where to store the layouts, or `None` to keep them only in memory.
+                          The directory is created if it does not exist.
+        :type directory: None or str
+        :param overlap: The minimum fraction of a graph's nodes that the last layout with the same arguments must have for the new layout to start from its positions.
+                        If the overlap is greater than 1, layouts never start from previous positions.
+        :type overlap: float
+
+        :raises ValueError: When the overlap is negative.
+        """
+
+        if overlap < 0:
+            raise ValueError(f"The overlap must not be negative, received { overlap }")
+
+        self.layouts = LRUCache(maxsize)
+        self.directory = directory
+        self.overlap = overlap
+        self._latest = { }
+
+    def layout(self, G, *args, **kwargs):
+        """
+        Get the positions of the given graph's nodes.
+        If the graph has not been laid out with the same arguments, the positions are generated and cached.
+
+        Any additional arguments and keyword arguments are passed on to the `networkx.spring_layout <https://networkx.github.io/documentation/stable/reference/generated/networkx.drawing.layout.spring_layout.html>`_ function.
+
+        :param G: The graph to lay out.
+        :type G: :class:`networkx.classes.graph.Graph`
+
+        :return: The positions of the nodes as a dictionary.
+                 The keys are the node names, and the values are the corresponding positions.
+                 The dictionary is a copy, so it can be changed without changing the cache.
+        :rtype: dict
+        """
+
+        arguments = self._hash_arguments(*args, **kwargs)
+        key = self._hash(self._hash_graph(G, kwargs.get('weight', 'weight')), arguments)
+
+        """
+        Look for the layout in memory, and then on disk.
+        """
+        positions = self.layouts.get(key)
+        if positions is None and self.directory is not None:
+            positions = self._load(key)
+            if positions is not None:
+                self.layouts.put(key, positions)
+
+        """
+        If the layout is not cached, generate it.
+        Start from the positions of the last layout with the same arguments if it shares enough nodes with the graph.
+        """
+        if positions is None:
+            previous = self.layouts.get(self._latest[arguments]) if arguments in self._latest else None
+            if previous is not None and 'pos' not in kwargs and len(G):
+                common = { node: previous[node] for node in G.nodes if node in previous }
+                if len(common) >= self.overlap * len(G):
+                    kwargs['pos'] = common
+
+            positions = nx.spring_layout(G, *args, **kwargs)
+            self.layouts.put(key, positions)
+            if self.directory is not None:
+                self._save(key, positions)
+
+        self._latest[arguments] = key
+        return dict(positions)
+
+    def clear(self):
+        """
+        Remove all layouts from memory.
+        The layouts on disk are not removed.
+        """
+
+        self.layouts.clear()
+        self._latest.clear()
+
+    def _hash_graph(self, G, weight='weight'):
+        """
+        Get the hash of the given graph's structure.
+        The structure is made up of the nodes, the edges and their weights.
+
+        :param G: The graph to hash.
+        :type G: :class:`networkx.classes.graph.Graph`
+        :param weight: The edge attribute that holds the edges' weights, or `None` if the edges have no weights.
+        :type weight: None or str
+
+        :return: The hash of the graph's structure.
+        :rtype: str
+        """
+
+        """
+        Sort the nodes and edges so that the hash does not depend on the order in which they were added.
+        The nodes of undirected edges are sorted too.
+        """
+        directed = nx.is_directed(G)
+        nodes = sorted( repr(node) for node in G.nodes )
+        edges = [ ]
+        for source, target, value in G.edges(data=weight):
+            source, target = repr(source), repr(target)
+            if not directed:
+                source, target = min(source, target), max(source, target)
+            edges.append(f"{ source } { target } { repr(value) }")
+
+        return self._hash(str(directed), *nodes, '', *sorted(edges))
+
+    def _hash_arguments(self, *args, **kwargs):
+        """
+        Get the hash of the given layout arguments.
+
+        :return: The hash of the layout arguments.
+        :rtype: str
+        """
+
+        return self._hash(*( repr(arg) for arg in args ),
+                          *( f"{ name }={ repr(value) }" for name, value in sorted(kwargs.items()) ))
+
+    def _hash(self, *values):
+        """
+        Get the hash of the given strings.
+
+        :return: The hash of the strings.
+        :rtype: str
+        """
+
+        return hashlib.sha1('\n'.join(values).encode('utf-8')).hexdigest()
+
+    def _load(self, key):
+        """
+        Load the layout with the given key from the directory.
+
+        :param key: The key of the layout.
+        :type key: str
+
+        :return: The positions of the nodes, or `None` if the layout is not stored.
+        :rtype: None or dict
+        """
+
+        path = os.path.join(self.directory, f"{ key }.pickle")
+        if not os.path.isfile(path):
+            return None
+
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _save(self, key, positions):
+        """
+        Save the layout with the given key to the directory.
+
+        :param key: The key of the layout.
+        :type key: str
+        :param positions: The positions of the nodes.
+        :type positions: dict
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{ key }.pickle"), 'wb') as f:
+            pickle.dump(positions, f)
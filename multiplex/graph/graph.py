@@ -29,14 +29,23 @@ Finally, Multiplex's graphs also support legend labels for both nodes and edges.
     Therefore it is a prerequisite to have it installed before creating these visualizations.
 """
 
+from matplotlib.collections import LineCollection
+from matplotlib.transforms import Affine2D
+from matplotlib.colors import to_rgba
 import math
 import networkx as nx
+import numpy as np
 import os
 import sys
 
 sys.path.append(os.path.join(os.path.abspath(os.path.dirname(__file__)), '..'))
+from spatial import GridIndex
 import util
 
+from graph.arrows import ArrowHeads, ArrowShafts
+from graph.cache import LayoutCache
+from graph.views import ArrowView, EdgeView, NodeView
+
 from labelled import LabelledVisualization
 from text.annotation import Annotation
 
@@ -48,8 +57,16 @@ class Graph(LabelledVisualization):
     The :class:`~Graph` class builds on the :class:`~labelled.LabelledVisualization`.
     The reason why the :class:`~Graph` builds on that, and not the simpler :class:`~visualization.Visualization`, is that it uses the :class:`~labelled.LabelledVisualization`'s labels for node names.
     In this way, the :class:`~Graph` automatically ensures that the node names do not overlap.
+
+    All graphs share the same :class:`~graph.cache.LayoutCache`, so graphs with the same structure are laid out only once.
+    To keep the layouts between sessions, replace the cache with one that stores them in a directory.
+
+    :cvar layouts: The cache of the node positions that the graphs generate.
+    :vartype layouts: :class:`~graph.cache.LayoutCache`
     """
 
+    layouts = LayoutCache()
+
     def __init__(self, *args, **kwargs):
         """
         Initialize the graph.
@@ -97,6 +114,8 @@ class Graph(LabelledVisualization):
         :param positions: The node's initial positions.
                           If you provide no positions, the function uses the `networkx.spring_layout <https://networkx.github.io/documentation/stable/reference/generated/networkx.drawing.layout.spring_layout.html?highlight=spring_layout#networkx.drawing.layout.spring_layout>`_ function to find the best position for nodes.
                           If you provide a position for a subset of the nodes, the rest of the positions are generated automatically.
+                          If you provide a position for all nodes, the graph is not laid out at all.
+                          Generated positions are cached in the :class:`~graph.cache.LayoutCache`, so drawing a graph with the same structure again re-uses them.
 
                           You can provide the positions with node names as keys and their positions as values.
                           Positions must be tuples: the x and y coordinates.
@@ -140,9 +159,9 @@ class Graph(LabelledVisualization):
 
         :return: A tuple containing the drawn components:
 
-                 1. A list of drawn nodes as :class:`matplotlib.collections.PathCollection` instances,
+                 1. A list of drawn nodes as :class:`~graph.views.NodeView` instances, which look like :class:`matplotlib.collections.PathCollection` instances,
                  2. A list of rendered node names as :class:`~text.annotation.Annotation` instances,
-                 3. A list of edges as :class:`matplotlib.lines.Line2D` instances if the graph is undirected or as :class:`matplotlib.text.Annotation` if the graph is directed, and
+                 3. A list of edges as :class:`~graph.views.EdgeView` instances if the graph is undirected or as :class:`~graph.views.ArrowView` instances if the graph is directed, and
                  4. A list of rendered edge names as :class:`~text.annotation.Annotation` instances.
         :rtype: tuple
         """
@@ -153,14 +172,19 @@ class Graph(LabelledVisualization):
         edge_style = edge_style or { }
         label_style = label_style or { }
 
+        """
+        Generate the positions of the nodes that do not have one.
+        If all nodes have a position, the graph is not laid out at all.
+        """
         self.drawable.axes.axis('off')
-        spring = nx.spring_layout(G, *args, **kwargs)
+        self.drawable.context.validate()
+        spring = { } if all( node in positions for node in G.nodes ) else self.layouts.layout(G, *args, **kwargs)
         spring.update(positions)
         positions = spring
         nodes = self._draw_nodes(G.nodes, positions, **node_style)
         node_names = self._draw_node_names(G.nodes, positions,
-                                           s=node_style.get('s', 100), **name_style)
-        self.drawable.figure.canvas.draw()
+                                           s=node_style.get('s', 100), edges=G.edges, **name_style)
+        self.drawable._defer(self.drawable.context.draw)
         edges = self._draw_edges(G.edges, G.nodes, positions,
                                  s=node_style.get('s', 100),
                                  directed=nx.is_directed(G), **edge_style)
@@ -179,6 +203,10 @@ class Graph(LabelledVisualization):
         The nodes should be given as dictionaries, whose keys are the node names.
         The corresponding values are their positions.
 
+        Nodes are drawn together, as one collection for each group of nodes that share the same style.
+        The size, colors and line width may differ between the nodes of a collection.
+        Nodes that do not set these properties get the collection's default values.
+
         :param nodes: The list of actual nodes to draw.
         :type nodes: networkx.classes.reportviews.NodeView
         :param positions: The positions of the nodes as a dictionary.
@@ -186,31 +214,160 @@ class Graph(LabelledVisualization):
         :type positions: dict
 
         :return: A dictionary of rendered nodes.
-                 The keys are the node names and the values are `matplotlib.collections.PathCollection <https://matplotlib.org/3.1.1/api/collections_api.html>`_, representing the rendered nodes.
+                 The keys are the node names and the values are :class:`~graph.views.NodeView` instances.
+                 Each view looks like a `matplotlib.collections.PathCollection <https://matplotlib.org/3.1.1/api/collections_api.html>`_ that contains only the node.
         :rtype: dict
         """
 
         rendered = { }
 
         """
-        Extract the node positions and draw scatter plots.
+        Load each node's style.
+        The keyword arguments may be overwritten by the node's style.
         """
-        x = [ position[0] for position in positions.values() ]
-        y = [ position[1] for position in positions.values() ]
-        for node, x, y in zip(nodes, x, y):
+        styles = [ ]
+        for node in nodes:
             node_style = dict(kwargs)
             node_style.update(nodes[node].get('style', { }))
             node_style.update({ 'marker': 'o' }) # TODO: do it properly
-            rendered[node] = self.drawable.scatter(x, y, *args, **node_style)
+            styles.append((node, node_style))
+
+        """
+        Draw each group of nodes with the same style as one collection.
+        """
+        for style, members in self._group_styles(styles, self._node_properties):
+            offsets = [ positions[node] for node, _ in members ]
+            collection = self.drawable.scatter([ x for x, _ in offsets ], [ y for _, y in offsets ], *args, **style)
+            self._set_node_properties(collection, [ properties for _, properties in members ])
+            for i, (node, _) in enumerate(members):
+                rendered[node] = NodeView(collection, i)
 
         return rendered
 
-    def _draw_node_names(self, nodes, positions, s, *args, **kwargs):
+    """
+    The node and edge properties that can differ between the items of a collection, and the style keys that set them.
+    When a style has more than one of the keys, the first one is used.
+    """
+    _node_properties = { 'sizes': ( 's', ),
+                         'facecolors': ( 'facecolor', 'facecolors', 'color', 'c' ),
+                         'edgecolors': ( 'edgecolor', 'edgecolors', 'color' ),
+                         'linewidths': ( 'linewidth', 'linewidths', 'lw' ) }
+    _arrow_properties = { 'facecolors': ( 'facecolor', 'fc', 'color', 'c' ),
+                          'edgecolors': ( 'edgecolor', 'ec', 'color', 'c' ),
+                          'linewidths': ( 'linewidth', 'linewidths', 'lw' ),
+                          'width': ( 'width', ),
+                          'headwidth': ( 'headwidth', ),
+                          'headlength': ( 'headlength', ) }
+    _edge_properties = { 'colors': ( 'color', 'colors', 'c' ),
+                         'linewidths': ( 'linewidth', 'linewidths', 'lw' ),
+                         'linestyles': ( 'linestyle', 'linestyles', 'ls' ) }
+
+    """
+    The arrow style keys that only annotations support.
+    """
+    _annotation_keys = ( 'arrowstyle', 'connectionstyle', 'shrink' )
+
+    """
+    The line style keys that only lines support, but which line collections do not.
+    """
+    _line_keys = ( 'marker', 'markersize', 'ms', 'markevery', 'fillstyle',
+                   'markeredgecolor', 'mec', 'markeredgewidth', 'mew',
+                   'markerfacecolor', 'mfc', 'markerfacecoloralt', 'mfcalt',
+                   'dashes', 'drawstyle', 'ds',
+                   'dash_capstyle', 'dash_joinstyle', 'solid_capstyle', 'solid_joinstyle' )
+
+    def _group_styles(self, styles, properties):
+        """
+        Group the given items by their style.
+        The properties that can differ between the items of a collection do not split groups.
+        Instead, they are taken out of the style and returned separately for each item.
+
+        :param styles: The items to group as a list of tuples, each made up of the item's key and its style.
+        :type styles: list of tuple
+        :param properties: The properties that can differ between the items of a collection.
+                           The keys are the property names, and the values are the style keys that set them.
+        :type properties: dict
+
+        :return: A list of groups, in the order in which they first appear.
+                 Each group is a tuple made up of the group's style and its members.
+                 Each member is a tuple made up of the item's key and its properties, with `None` as the value of properties that the item does not set.
+        :rtype: list of tuple
+        """
+
+        groups = { }
+        for item, style in styles:
+            style = dict(style)
+            values = { name: self._get_property(style, keys) for name, keys in properties.items() }
+            for keys in properties.values():
+                for key in keys:
+                    style.pop(key, None)
+
+            key = tuple(sorted( (name, repr(value)) for name, value in style.items() ))
+            groups.setdefault(key, (style, [ ]))[1].append((item, values))
+
+        return list(groups.values())
+
+    def _get_property(self, style, keys, default=None):
+        """
+        Get a property from the given style.
+
+        :param style: The style of the node or edge.
+        :type style: dict
+        :param keys: The style keys that set the property, in order of precedence.
+        :type keys: tuple of str
+        :param default: The value to return if the style does not set the property.
+        :type default: object
+
+        :return: The value of the property, or the default value if the style does not set it.
+        :rtype: object
+        """
+
+        for key in keys:
+            if key in style:
+                return style[key]
+
+        return default
+
+    def _set_node_properties(self, collection, properties):
+        """
+        Set the properties that differ between the nodes of a collection.
+        Nodes that do not set a property get the collection's default value.
+        The edge color of nodes that do not set it is the same as their face color, like in matplotlib.
+
+        :param collection: The collection of nodes.
+        :type collection: :class:`matplotlib.collections.PathCollection`
+        :param properties: The properties of each node in the collection.
+                           Each node's properties are a dictionary, with `None` as the value of properties that the node does not set.
+        :type properties: list of dict
+        """
+
+        if any( node['sizes'] is not None for node in properties ):
+            default = collection.get_sizes()[0]
+            collection.set_sizes([ default if node['sizes'] is None else node['sizes'] for node in properties ])
+
+        if any( node['linewidths'] is not None for node in properties ):
+            default = collection.get_linewidth()[0]
+            collection.set_linewidths([ default if node['linewidths'] is None else node['linewidths'] for node in properties ])
+
+        facecolors = [ node['facecolors'] for node in properties ]
+        if any( color is not None for color in facecolors ):
+            default = collection.get_facecolor()[0]
+            facecolors = [ default if color is None else to_rgba(color) for color in facecolors ]
+            collection.set_facecolors(facecolors)
+
+        if any( node['edgecolors'] is not None for node in properties ):
+            facecolors = collection.get_facecolor()
+            collection.set_edgecolors([ facecolors[i % len(facecolors)] if node['edgecolors'] is None else to_rgba(node['edgecolors'])
+                                        for i, node in enumerate(properties) ])
+
+    def _draw_node_names(self, nodes, positions, s, edges=None, *args, **kwargs):
         """
         Draw names for the nodes.
         Names are drawn if they have a `name` attribute.
         The `name_style` attribute, if given, is used to override the default name style.
         By default, names are aligned centrally and are positioned above the node.
+        If a name above the node would overlap with other nodes or edges, and fewer of them below the node, the name is moved below the node instead.
+        Names with an explicit vertical alignment are never moved.
 
         Any additional keyword arguments are considered to be styling options.
 
@@ -222,6 +379,9 @@ class Graph(LabelledVisualization):
         :param s: The default radius of the node.
                   It may be overwritten with the node's own radius.
         :type s: float
+        :param edges: The graph's edges, which names should avoid.
+                      If `None` is given, names only avoid nodes.
+        :type edges: None or :class:`networkx.classes.reportviews.EdgeView`
 
         :return: A dictionary of rendered node names.
                  The keys are the node names and the values are :class:`~text.annotation.Annotation`, representing the rendered annotations.
@@ -230,12 +390,20 @@ class Graph(LabelledVisualization):
 
         annotations = { }
 
+        """
+        Index the nodes and edges so that each name can be checked against the components near it.
+        The index is only needed if at least one name may move, which is not the case if no node has a name or if the vertical alignment is fixed.
+        """
+        obstacles, segments = None, None
+        if 'va' not in kwargs and any( nodes[node].get('name') and 'va' not in nodes[node].get('name_style', { }) for node in nodes ):
+            obstacles, segments = self._index_obstacles(nodes, positions, s, edges or [ ])
+
         """
         Extract the node positions and draw the names.
+        The positions may not be in the same order as the nodes.
         """
-        x = [ position[0] for position in positions.values() ]
-        y = [ position[1] for position in positions.values() ]
-        for node, x, y in zip(nodes, x, y):
+        for node in nodes:
+            x, y = positions[node]
             """
             Nodes are drawn only if they have a name attribute.
             """
@@ -263,17 +431,163 @@ class Graph(LabelledVisualization):
                 # TODO: Add support for drawing names on the left or right of nodes.
                 annotation = self.draw_label(name, (x - pad * 2, x + pad * 2), y,
                                              pad=pad, **default_style)
-                annotation.draw()
+                if obstacles is not None and 'va' not in style:
+                    self._avoid_obstacles(annotation, node, y, obstacles, segments)
                 annotations[node] = annotation
 
         return annotations
 
+    def _index_obstacles(self, nodes, positions, s, edges):
+        """
+        Create a spatial index of the nodes and edges, which node names should avoid.
+        The index stores the components in display coordinates.
+        Nodes are stored with the key ``('node', node)``, and edges with the key ``('edge', source, target)``.
+        Edges are stored as segments, so that they only cover the cells that they pass through.
+        Self-loops are not stored.
+
+        :param nodes: The list of graph nodes.
+        :type nodes: :class:`networkx.classes.reportviews.NodeView`
+        :param positions: The positions of the nodes as a dictionary.
+                          The keys are the node names, and the values are the corresponding positions.
+        :type positions: dict
+        :param s: The default radius of the node.
+                  It may be overwritten with the node's own radius.
+        :type s: float
+        :param edges: The graph's edges.
+        :type edges: :class:`networkx.classes.reportviews.EdgeView`
+
+        :return: A tuple made up of the spatial index and the edges' segments in display coordinates.
+                 The segments are a dictionary with the edges' keys as keys.
+        :rtype: tuple (:class:`~spatial.GridIndex`, dict)
+        """
+
+        axes = self.drawable.axes
+        self.drawable.context.validate() # update the axes limits before transforming the positions
+
+        """
+        The grid's cells are as big as the largest node.
+        """
+        radii = { node: nodes[node].get('style', { }).get('s', s) ** 0.5 / 2. for node in nodes }
+        index = GridIndex(cell_size=max([ radius * 2 for radius in radii.values() ] + [ 10 ]))
+        display = dict(zip(positions, axes.transData.transform(np.array(list(positions.values()), dtype=float).reshape(-1, 2))))
+
+        for node in nodes:
+            (x, y), radius = display[node], radii[node]
+            index.insert(('node', node), (x - radius, y - radius, x + radius, y + radius))
+
+        segments = { }
+        for source, target in edges:
+            if source != target:
+                (x0, y0), (x1, y1) = display[source], display[target]
+                segments[('edge', source, target)] = (x0, y0, x1, y1)
+                index.insert_segment(('edge', source, target), (x0, y0, x1, y1))
+
+        return index, segments
+
+    def _avoid_obstacles(self, annotation, node, y, obstacles, segments):
+        """
+        Move the given node name below its node if it overlaps fewer nodes and edges there.
+        The name's own node is not considered to be an obstacle.
+
+        :param annotation: The node name, drawn above the node.
+        :type annotation: :class:`~text.annotation.Annotation`
+        :param node: The node that the name describes.
+        :type node: object
+        :param y: The node's y-coordinate.
+        :type y: float
+        :param obstacles: The spatial index of nodes and edges, as created by :func:`~Graph._index_obstacles`.
+        :type obstacles: :class:`~spatial.GridIndex`
+        :param segments: The edges' segments in display coordinates, as created by :func:`~Graph._index_obstacles`.
+        :type segments: dict
+        """
+
+        transform = self.drawable.axes.transData
+
+        """
+        The name below the node is the mirror image of the name above the node.
+        """
+        bb = annotation.get_virtual_bb()
+        gap = bb.y0 - y
+        above = transform.transform(((bb.x0, bb.y0), (bb.x1, bb.y1))).flatten()
+        below = transform.transform(((bb.x0, y - gap - bb.height), (bb.x1, y - gap))).flatten()
+
+        collisions = [ self._count_collisions(extents, node, obstacles, segments) for extents in (above, below) ]
+        if collisions[1] < collisions[0]:
+            annotation.set_position((bb.x0, y - gap), va='top')
+            self._arrange_labels(annotation)
+
+    def _count_collisions(self, extents, node, obstacles, segments):
+        """
+        Count the nodes and edges that overlap with the given extents.
+
+        :param extents: The extents to check, in display coordinates.
+        :type extents: tuple of float
+        :param node: The node to ignore.
+        :type node: object
+        :param obstacles: The spatial index of nodes and edges, as created by :func:`~Graph._index_obstacles`.
+        :type obstacles: :class:`~spatial.GridIndex`
+        :param segments: The edges' segments in display coordinates, as created by :func:`~Graph._index_obstacles`.
+        :type segments: dict
+
+        :return: The number of nodes and edges that overlap with the extents.
+        :rtype: int
+        """
+
+        collisions = 0
+        for key in obstacles.query(extents):
+            if key == ('node', node):
+                continue
+
+            if key[0] == 'edge' and not self._intersects_segment(extents, segments[key]):
+                continue
+
+            collisions += 1
+
+        return collisions
+
+    def _intersects_segment(self, extents, segment):
+        """
+        Check whether the given segment passes through the given extents.
+        The segment is clipped to the extents' horizontal range, and then compared with the extents' vertical range.
+
+        :param extents: The extents as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates.
+        :type extents: tuple of float
+        :param segment: The segment as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates of its endpoints.
+        :type segment: tuple of float
+
+        :return: A boolean indicating whether the segment passes through the extents.
+        :rtype: bool
+        """
+
+        x0, y0, x1, y1 = min(extents[0], extents[2]), min(extents[1], extents[3]), max(extents[0], extents[2]), max(extents[1], extents[3])
+        sx0, sy0, sx1, sy1 = segment
+
+        """
+        Find the part of the segment that lies within the extents' horizontal range.
+        Vertical segments lie either entirely within the range or entirely outside it.
+        """
+        if sx0 == sx1:
+            if not x0 <= sx0 <= x1:
+                return False
+            low, high = min(sy0, sy1), max(sy0, sy1)
+        else:
+            t0, t1 = sorted(((x0 - sx0) / (sx1 - sx0), (x1 - sx0) / (sx1 - sx0)))
+            t0, t1 = max(t0, 0), min(t1, 1)
+            if t0 > t1:
+                return False
+            low, high = sorted((sy0 + (sy1 - sy0) * t0, sy0 + (sy1 - sy0) * t1))
+
+        return low <= y1 and y0 <= high
+
     def _draw_edges(self, edges, nodes, positions, s, directed=False, *args, **kwargs):
         """
         Draw the edges connecting the given nodes.
         Depending on whether the graph is undirected or directed, the edges are drawn with arrows.
 
-        Any additional arguments and keyword arguments are passed on to the `matplotlib.pyplot.plot <https://matplotlib.org/3.1.1/api/_as_gen/matplotlib.pyplot.plot.html>`_ function or as arrowprops.
+        Any additional arguments and keyword arguments are passed on to the `matplotlib.collections.LineCollection <https://matplotlib.org/3.1.1/api/collections_api.html#matplotlib.collections.LineCollection>`_ or as arrowprops.
+
+        Undirected edges are drawn together, as one collection for each group of edges that share the same style.
+        The color, line width and line style may differ between the edges of a collection.
 
         :param edges: The list of edges to draw.
                       The edges should be a list of tuples representing the source and target.
@@ -291,68 +605,289 @@ class Graph(LabelledVisualization):
         :param directed: A boolean indicating whether the graph is directed or not.
         :type directed: bool
 
-        :return: A list of drawn edges.
-                 If the graph is undirected, lines are returned.
-                 Otherwise, annotations (with arrows) are returned.
-        :rtype: list of :class:`matplotlib.lines.Line2D` or list of :class:`matplotlib.text.Annotation`
+        :return: A dictionary of drawn edges.
+                 If the graph is undirected, :class:`~graph.views.EdgeView` instances, which look like lines, are returned.
+                 Otherwise, arrows are returned, as described in :func:`~Graph._draw_arrows`.
+                 Loops are returned as tuples that contain the loop's :class:`~graph.views.EdgeView` and, if the graph is directed, its arrow head.
+        :rtype: dict
         """
 
         rendered = { }
 
+        """
+        Load the style of each edge, keeping loops apart from the other edges.
+        The keyword arguments may be overwritten by the edge's style.
+        """
+        styles, loops = [ ], [ ]
         for source, target in edges:
-            if source == target:
-                rendered[(source, target)] = self._draw_loop(nodes[target], positions[target],
-                                                             s=nodes[target].get('style', { }).get('s', s),
-                                                             directed=directed, *args, **kwargs)
-                continue
-
-            """
-            Load the edge's style.
-            The keyword arguments may be overwritten by the edge's style.
-            """
-            u, v = list(positions[source]), list(positions[target])
             edge_style = dict(kwargs)
             edge_style.update(edges[(source, target)].get('style', { }))
+            (loops if source == target else styles).append(((source, target), edge_style))
+
+        """
+        Calculate the radius of each node size only once.
+        """
+        radii = { }
+        for node in { node for (source, target), _ in styles + loops for node in (source, target) }:
+            size = nodes[node].get('style', { }).get('s', s)
+            if size not in radii:
+                radii[size] = self._get_radius(nodes[node], s=size)
+
+        get_radius = lambda node: radii[nodes[node].get('style', { }).get('s', s)]
+
+        """
+        Update the start and end positions so that the edges do not start and end at the center of the nodes.
+        This allows nodes to be transparent without the edges looking bad.
+        """
+        lines = [ ]
+        if styles:
+            u = np.array([ positions[source] for (source, _), _ in styles ], dtype=float)
+            v = np.array([ positions[target] for (_, target), _ in styles ], dtype=float)
+            u, v = self._clip_edges(u, v, np.array([ get_radius(source) for (source, _), _ in styles ]),
+                                          np.array([ get_radius(target) for (_, target), _ in styles ]))
 
             """
-            Update the start and end positions so that the edges do not start and end at the center of the nodes.
-            This allows nodes to be transparent without the edges looking bad.
-            This is done by calculating the radius of the nodes, which is where the edges should end.
-            Calculate the distance between the two centers and reduce from it the radius of the source and target nodes.
+            If the graph is directed, draw the edges as arrows.
+            Otherwise, connect the two nodes with straight lines.
             """
-            ratio = util.get_aspect(self.drawable.axes)
-            angle = self._get_angle(u, v)
-            direction = self._get_direction(u, v)
-            for node, position in zip([ source, target ], [ u, v ]):
-                distance = self._get_distance(u, v) # since positions are changing, the distance has to be computed each time
-                radius = self._get_radius(nodes[node], s=nodes[node].get('style', { }).get('s', s))
-                if ratio > 1:
-                    diff = abs(radius[0] * math.cos(angle)) / ratio + abs(radius[1] * math.sin(angle))
-                else:
-                    diff = abs(radius[0] * math.cos(angle)) + abs(radius[1] * math.sin(angle)) * ratio
-
-                """
-                Retract the start and end by the radius.
-                """
-                if node == source:
-                    u = [ u[0] + direction[0] * diff,
-                          u[1] + direction[1] * diff ]
-                elif node == target:
-                    v = [ u[0] + direction[0] * (distance - diff),
-                          u[1] + direction[1] * (distance - diff) ]
-
-            if not directed:
-                """
-                If the graph is not directed, connect the two nodes' centers with a straight line.
-                """
-                x, y = (u[0], v[0]), (u[1], v[1])
-                rendered[(source, target)] = self.drawable.plot(x, y, zorder=-1, *args, **edge_style)[0]
             if directed:
-                rendered[(source, target)] = self.drawable.axes.annotate('', xy=v, xytext=u,
-                                                                         zorder=-1, arrowprops=edge_style)
+                rendered.update(zip([ edge for edge, _ in styles ], self._draw_arrows(u, v, styles)))
+            else:
+                lines.extend( (edge, style, segment) for (edge, style), segment in zip(styles, np.stack((u, v), axis=1)) )
+
+        """
+        Loops are lines, and they are drawn together with the other lines.
+        Loops are thicker than edges, and they have no arrow style.
+        """
+        if loops:
+            paths = self._get_loops(np.array([ positions[node] for (node, _), _ in loops ], dtype=float),
+                                    np.array([ get_radius(node) for (node, _), _ in loops ]))
+            for (edge, style), path in zip(loops, paths):
+                loop_style = { key: value for key, value in style.items() if key not in ('headwidth', 'headlength', 'lw', 'linewidths') }
+                loop_style['linewidth'] = self._get_property(style, self._edge_properties['linewidths'], 1) * 2
+                lines.append((edge, loop_style, path))
+
+        lines = dict(zip([ edge for edge, _, _ in lines ], self._draw_lines(lines, *args)))
+        for edge, _ in loops:
+            rendered[edge] = ( lines.pop(edge), )
+        rendered.update(lines)
+
+        """
+        If the graph is directed, the loops end with an arrow head.
+        The heads are smaller than those of the other edges.
+        """
+        if directed and loops:
+            arrows = [ ]
+            for edge, style in loops:
+                arrowprops = dict(style)
+                for key in ('headwidth', 'headlength'):
+                    if key in arrowprops:
+                        arrowprops[key] = arrowprops[key] * 0.75
+                arrows.append((edge, arrowprops))
+
+            arrows = self._draw_arrows(paths[:, -2], paths[:, -1], arrows)
+            for (edge, _), arrow in zip(loops, arrows):
+                rendered[edge] += ( arrow, )
+
+        return rendered
+
+    def _draw_lines(self, lines, *args):
+        """
+        Draw the given lines.
+        All lines with the same style are drawn as one collection.
+        The color, line width and line style may differ between the lines of a collection.
+        Lines whose style sets a property that only lines support, such as a `marker` or `dashes`, are drawn one by one instead.
+
+        Any additional arguments are passed on to the `matplotlib.collections.LineCollection <https://matplotlib.org/3.1.1/api/collections_api.html#matplotlib.collections.LineCollection>`_.
+
+        :param lines: The lines to draw as a list of tuples, each made up of the line's key, its style and its points.
+        :type lines: list of tuple
+
+        :return: A list of drawn lines, in the same order as the given lines.
+                 Lines are returned as :class:`~graph.views.EdgeView` instances, or as :class:`matplotlib.lines.Line2D` instances if they are drawn one by one.
+        :rtype: list
+        """
+
+        rendered = [ None ] * len(lines)
+
+        """
+        Draw the lines that need the features of lines one by one.
+        """
+        styles = [ ]
+        for i, (_, style, points) in enumerate(lines):
+            if any( key in style for key in self._line_keys ):
+                points = np.asarray(points)
+                rendered[i] = self.drawable.axes.plot(points[:, 0], points[:, 1], *args, **{ 'zorder': -1, **style })[0]
+            else:
+                styles.append((i, style))
+
+        for style, members in self._group_styles(styles, self._edge_properties):
+            style = dict(style)
+            style.setdefault('zorder', -1)
+            collection = LineCollection([ lines[i][2] for i, _ in members ], *args, **style)
+            self._set_edge_properties(collection, [ properties for _, properties in members ])
+            self.drawable.axes.add_collection(collection)
+            for j, (i, _) in enumerate(members):
+                rendered[i] = EdgeView(collection, j)
+
+        return rendered
+
+    def _draw_arrows(self, u, v, styles):
+        """
+        Draw arrows from the given start positions to the given end positions.
+
+        Arrows are drawn together, as one collection of shafts and one collection of heads for each group of arrows that share the same style.
+        The styles accept the same keys as the `arrowprops` of `matplotlib.pyplot.annotate <https://matplotlib.org/3.1.1/api/_as_gen/matplotlib.pyplot.annotate.html>`_ when no `arrowstyle` is given.
+        The ``width``, ``headwidth`` and ``headlength`` are in points, and they, the colors and the line width may differ between the arrows of a collection.
+        Arrows whose style sets an `arrowstyle`, a `connectionstyle` or how much to `shrink` are drawn as annotations instead.
+
+        :param u: The start positions of the arrows as an array with one row for each arrow.
+        :type u: :class:`numpy.ndarray`
+        :param v: The end positions of the arrows, where the heads point, as an array with one row for each arrow.
+        :type v: :class:`numpy.ndarray`
+        :param styles: The arrows' styles as a list of tuples, each made up of the arrow's key and its style.
+        :type styles: list of tuple
+
+        :return: A list of drawn arrows, in the same order as the styles.
+                 Arrows are returned as :class:`~graph.views.ArrowView` instances, or as :class:`matplotlib.text.Annotation` instances if they are drawn as annotations.
+        :rtype: list
+        """
+
+        rendered = [ None ] * len(styles)
+
+        """
+        Draw the arrows that need the features of annotations one by one.
+        """
+        batched = [ ]
+        for i, (_, style) in enumerate(styles):
+            if any( key in style for key in self._annotation_keys ):
+                rendered[i] = self.drawable.axes.annotate('', xy=v[i], xytext=u[i], zorder=-1, arrowprops=style)
+            else:
+                batched.append((i, style))
+
+        """
+        Draw the other arrows in collections.
+        The heads are drawn in points around the arrows' ends, so that they keep their size and shape when the axes are resized.
+        The shafts stop where the heads start.
+        Since the direction of the arrows on the display changes with the axes, the collections calculate it again when they are drawn.
+        """
+        transform = self.drawable.axes.transData
+        head_transform = Affine2D().scale(1 / 72.) + self.drawable.figure.dpi_scale_trans
+        for style, members in self._group_styles(batched, self._arrow_properties):
+            index = [ i for i, _ in members ]
+            properties = [ properties for _, properties in members ]
+            get = lambda name, default: np.array([ default if arrow[name] is None else arrow[name] for arrow in properties ], dtype=float)
+            width, headwidth, headlength = get('width', 4), get('headwidth', 12), get('headlength', 12)
+
+            style = dict(style)
+            style.setdefault('zorder', -1)
+            shafts = ArrowShafts(u[index], v[index], headlength, transform, self.drawable.figure.dpi, capstyle='butt', **style)
+            heads = ArrowHeads(u[index], v[index], headwidth, headlength, transform, transform=head_transform, **style)
+            self._set_arrow_properties(shafts, heads, properties, width)
+            self.drawable.axes.add_collection(shafts)
+            self.drawable.axes.add_collection(heads, autolim=False)
+            for j, i in enumerate(index):
+                rendered[i] = ArrowView(shafts, heads, j)
 
         return rendered
 
+    def _clip_edges(self, u, v, source_radii, target_radii):
+        """
+        Retract the start and end of the given edges by the radius of their nodes.
+        All edges are clipped at once.
+
+        Since the nodes look like circles, but the display or data ratios are not always equal, the radius depends on the edge's angle.
+
+        :param u: The positions of the edges' source nodes as an array with one row for each edge.
+        :type u: :class:`numpy.ndarray`
+        :param v: The positions of the edges' target nodes as an array with one row for each edge.
+        :type v: :class:`numpy.ndarray`
+        :param source_radii: The x- and y-radii of the edges' source nodes as an array with one row for each edge.
+        :type source_radii: :class:`numpy.ndarray`
+        :param target_radii: The x- and y-radii of the edges' target nodes as an array with one row for each edge.
+        :type target_radii: :class:`numpy.ndarray`
+
+        :return: A tuple containing the new start and end positions of the edges.
+        :rtype: tuple of :class:`numpy.ndarray`
+        """
+
+        ratio = util.get_aspect(self.drawable.axes, context=self.drawable.context)
+        angle = np.arctan2(v[:, 1], v[:, 0]) - np.arctan2(u[:, 1], u[:, 0])
+        distance = np.hypot(*(v - u).T)
+        direction = np.divide(v - u, distance[:, None], out=np.zeros_like(u), where=distance[:, None] > 0)
+
+        """
+        Calculate how much of each edge is covered by its source and target nodes.
+        """
+        def get_diff(radii):
+            x, y = np.abs(radii[:, 0] * np.cos(angle)), np.abs(radii[:, 1] * np.sin(angle))
+            return x / ratio + y if ratio > 1 else x + y * ratio
+
+        """
+        Retract the start by the source node's radius.
+        Then, retract the end by the target node's radius, based on the distance from the new start.
+        """
+        u = u + direction * get_diff(source_radii)[:, None]
+        distance = np.hypot(*(v - u).T)
+        v = u + direction * (distance - get_diff(target_radii))[:, None]
+        return u, v
+
+    def _set_arrow_properties(self, shafts, heads, properties, width):
+        """
+        Set the properties that differ between the arrows of a collection.
+        Arrows that do not set a color get the collection's default color, and the edges of the heads have the same color as their faces.
+        The shafts are as wide as the given width and the width of the heads' edges together.
+
+        :param shafts: The collection of the arrows' shafts.
+        :type shafts: :class:`~graph.arrows.ArrowShafts`
+        :param heads: The collection of the arrows' heads.
+        :type heads: :class:`~graph.arrows.ArrowHeads`
+        :param properties: The properties of each arrow in the collection.
+                           Each arrow's properties are a dictionary, with `None` as the value of properties that the arrow does not set.
+        :type properties: list of dict
+        :param width: The width of each arrow's shaft in points.
+        :type width: :class:`numpy.ndarray`
+        """
+
+        facecolors = [ arrow['facecolors'] for arrow in properties ]
+        if any( color is not None for color in facecolors ):
+            default = heads.get_facecolor()[0]
+            heads.set_facecolor([ default if color is None else to_rgba(color) for color in facecolors ])
+
+        facecolors = heads.get_facecolor()
+        edgecolors = [ facecolors[i % len(facecolors)] if arrow['edgecolors'] is None else to_rgba(arrow['edgecolors'])
+                       for i, arrow in enumerate(properties) ]
+        heads.set_edgecolor(edgecolors)
+        shafts.set_color([ facecolors[i % len(facecolors)] for i in range(len(properties)) ])
+
+        default = heads.get_linewidth()[0]
+        linewidths = np.array([ default if arrow['linewidths'] is None else arrow['linewidths'] for arrow in properties ], dtype=float)
+        heads.set_linewidth(linewidths)
+        shafts.set_linewidth(width + linewidths)
+
+    def _set_edge_properties(self, collection, properties):
+        """
+        Set the properties that differ between the edges of a collection.
+        Edges that do not set a property get the collection's default value.
+
+        :param collection: The collection of edges.
+        :type collection: :class:`matplotlib.collections.LineCollection`
+        :param properties: The properties of each edge in the collection.
+                           Each edge's properties are a dictionary, with `None` as the value of properties that the edge does not set.
+        :type properties: list of dict
+        """
+
+        if any( edge['colors'] is not None for edge in properties ):
+            default = collection.get_color()[0]
+            collection.set_color([ default if edge['colors'] is None else to_rgba(edge['colors']) for edge in properties ])
+
+        if any( edge['linewidths'] is not None for edge in properties ):
+            default = collection.get_linewidth()[0]
+            collection.set_linewidth([ default if edge['linewidths'] is None else edge['linewidths'] for edge in properties ])
+
+        if any( edge['linestyles'] is not None for edge in properties ):
+            collection.set_linestyle([ 'solid' if edge['linestyles'] is None else edge['linestyles'] for edge in properties ])
+
     def _draw_edge_names(self, edges, nodes, positions, s, *args, **kwargs):
         """
         Draw names for the edges.
@@ -427,7 +962,7 @@ class Graph(LabelledVisualization):
                 Re-draw the annotation, this time positionally centered along the edge.
                 The rotation depends on the elevation from the source to the target node.
                 """
-                ratio = util.get_aspect(self.drawable.axes)
+                ratio = util.get_aspect(self.drawable.axes, context=self.drawable.context)
                 distance = self._get_distance(u, v)
                 direction = self._get_direction(u, v)
                 angle = self._get_elevation(u, v)
@@ -445,90 +980,49 @@ class Graph(LabelledVisualization):
 
         return annotations
 
-    def _draw_loop(self, node, position, s, directed, offset_angle=math.pi/2, *args, **kwargs):
+    def _get_loops(self, positions, radii, offset_angle=math.pi/2):
         """
-        Draw a loop, indicating an edge from a node to itself.
-
-        Any additional arguments and keyword arguments are passed on to the edge drawing functions.
-
-        :param node: The node for which to draw a loop.
-        :type node: dict
-        :param position: The position of the node as a tuple.
-        :type position: tuple
-        :param s: The default radius of the node.
-                  It may be overwritten with the node's own radius.
-        :type s: float
-        :param directed: A boolean indicating whether the graph is directed or not.
-        :type: bool
-        :param offset_angle: The loop's offset angle in radians.
-                             By default, the value is :math:`\\frac{\\pi}{2}`, which places the loop on top of the node.
+        Get the paths of loops, which indicate edges from nodes to themselves.
+        The paths of all loops are calculated together.
+
+        :param positions: The positions of the looped nodes as an array with one row for each loop.
+        :type positions: :class:`numpy.ndarray`
+        :param radii: The x- and y-radii of the looped nodes as an array with one row for each loop.
+        :type radii: :class:`numpy.ndarray`
+        :param offset_angle: The loops' offset angle in radians.
+                             By default, the value is :math:`\\frac{\\pi}{2}`, which places the loops on top of the nodes.
         :type offset_angle: float
 
-        :return: A tuple containing the undirected edge and, if directed, the arrow.
-        :rtype: tuple
+        :return: The paths of the loops as an array with one row for each loop.
+                 Each path is made up of the x and y coordinates of its points, and all loops have the same number of points.
+        :rtype: :class:`numpy.ndarray`
         """
 
         """
-        Get the node's radius and calculate the loop's radius as a fraction of the node's radius.
-        To calculate the angles covered by the loop, the loop is initally placed directly above the node.
+        The loop's radius is a fraction of the node's radius.
+        To calculate the angles covered by the loop, the loop is initally placed directly above the node, with its center on the node's border.
         Since nodes are circular, the loop's position is just rotated around the node later.
-        """
-        radius = self._get_radius(node, s)
-        loop = ( radius[0] * 0.5, radius[1] * 0.5 )
-        center = ( position[0], position[1] + radius[1] )
 
-        """
         Get the vertical distance from the node to the place where the loop will intersect with it.
         The notation is taken from `this blog post <https://diego.assencio.com/?index=8d6ca3d82151bad815f78addf9b5c1c6>`_.
+        Since the loop's radius is always the same fraction of the node's radius, all loops intersect with their node at the same angles.
         """
-        d = center[1] - position[1]
-        d1 = (radius[1] ** 2 - loop[1] ** 2 + d ** 2) / ( 2 * d)
+        fraction = 0.5
+        d = 1
+        d1 = (1 - fraction ** 2 + d ** 2) / ( 2 * d)
         d2 = d - d1
+        angle = math.floor(math.degrees(math.asin(-d2 / fraction)))
 
         """
-        Calculate the horizontal distance from the center of the node to where the node and the loop intersect.
-        """
-        ratio = util.get_aspect(self.drawable.axes)
-        x1 = math.sqrt( ( (radius[0]) ** 2 * radius[1] ** 2 - (radius[0]) ** 2 * d1 ** 2 ) / ( (radius[0]) ** 2 ) ) * ratio
-
-        """
-        Offset the center of the node properly, this time based on the given offset angle.
-        Calculate the angle (in degrees) from the rightmost intersection to the leftmost intersection.
-        Use it to calculate the x and y coordinates of the points of the looped edge.
-        """
-        center = ( position[0] + radius[0] * math.cos(offset_angle),
-                   position[1] + radius[1] * math.sin(offset_angle) )
-        angle = math.asin(-d2 / loop[1])
-        angle = math.floor(math.degrees(angle))
-        x = [ center[0] + loop[0] * math.cos(math.pi * (i / 180 - 1 / 2) + offset_angle) for i in range(angle, - angle + 180) ]
-        y = [ center[1] + loop[1] * math.sin(math.pi * (i / 180 - 1 / 2) + offset_angle) for i in range(angle, - angle + 180) ]
-
-        """
-        Remove some style attributes that belong to arrows, not edges.
+        Offset the center of the loops based on the given offset angle.
+        Use the angles from the rightmost intersection to the leftmost intersection to calculate the x and y coordinates of the points of the loops.
         """
-        edge_style = dict(kwargs)
-        edge_style.pop('headwidth', None)
-        edge_style.pop('headlength', None)
-        edge_style['linewidth'] = edge_style.get('linewidth', 1) * 2
-        edge = self.drawable.plot(x, y, zorder=-1, **edge_style)
-
-        """
-        If the arrow is directed, calculate its position.
-        The arrow points is set to always point downwards.
-        """
-        if directed:
-            arrowprops = dict(kwargs)
-            if 'headwidth' in arrowprops:
-                arrowprops['headwidth'] = arrowprops.get('headwidth') * 0.75
-            if 'headlength' in arrowprops:
-                arrowprops['headlength'] = arrowprops.get('headwidth') * 0.75
-            xy = ( x[-1], y[-1] )
-            xytext = ( x[-2], y[-2] )
-            arrow = self.drawable.axes.annotate('', xy=xy, xytext=xytext,
-                                                zorder=-1, arrowprops=arrowprops)
-
-
-        return ( edge, arrow ) if directed else ( edge, )
+        loops = radii * fraction
+        centers = positions + radii * (math.cos(offset_angle), math.sin(offset_angle))
+        angles = np.pi * (np.arange(angle, - angle + 180) / 180 - 1 / 2) + offset_angle
+        x = centers[:, 0, None] + loops[:, 0, None] * np.cos(angles)
+        y = centers[:, 1, None] + loops[:, 1, None] * np.sin(angles)
+        return np.stack((x, y), axis=2)
 
     def _draw_node_labels(self, nodes, label_style, *args, **kwargs):
         """
@@ -543,26 +1037,30 @@ class Graph(LabelledVisualization):
         :type label_style: dict
         """
 
-        for node in nodes:
-            """
-            Go through each node and look for the label.
-            The drawn label depends on the type of graph.
-            Once a label is drawn, it is added to a list of drawn labels so it is not drawn again.
-            """
-            if 'label' in nodes[node]:
-                label = nodes[node]['label']
-
-                default_style = dict(**kwargs)
-                default_style.update(nodes[node].get('style', { }))
-
+        """
+        The labels are added in a batch so that the drawable is re-drawn only once.
+        """
+        with self.drawable.legend.batch():
+            for node in nodes:
                 """
-                The y-axis change when drawing points.
-                Therefore save the y-limit and re-set it after drawing.
+                Go through each node and look for the label.
+                The drawn label depends on the type of graph.
+                Once a label is drawn, it is added to a list of drawn labels so it is not drawn again.
                 """
-                ylim = self.drawable.axes.get_ylim()
-                self.drawable.legend.draw_point(label, label_style=label_style,
-                                                *args, **default_style)
-                self.drawable.axes.set_ylim(ylim)
+                if 'label' in nodes[node]:
+                    label = nodes[node]['label']
+
+                    default_style = dict(**kwargs)
+                    default_style.update(nodes[node].get('style', { }))
+
+                    """
+                    The y-axis change when drawing points.
+                    Therefore save the y-limit and re-set it after drawing.
+                    """
+                    ylim = self.drawable.axes.get_ylim()
+                    self.drawable.legend.draw_point(label, label_style=label_style,
+                                                    *args, **default_style)
+                    self.drawable.axes.set_ylim(ylim)
 
     def _draw_edge_labels(self, edges, directed, label_style, *args, **kwargs):
         """
@@ -579,23 +1077,27 @@ class Graph(LabelledVisualization):
         :type label_style: dict
         """
 
-        for edge in edges:
-            """
-            Go through each edge and look for the label.
-            The drawn label depends on the type of graph.
-            Once a label is drawn, it is added to a list of drawn labels so it is not drawn again.
-            """
-            if 'label' in edges[edge]:
-                label = edges[edge]['label']
-
-                default_style = dict(**kwargs)
-                default_style.update(edges[edge].get('style', { }))
-                if directed:
-                    self.drawable.legend.draw_arrow(label, label_style=label_style,
-                                                    *args, **default_style)
-                else:
-                    self.drawable.legend.draw_line(label, label_style=label_style,
-                                                    *args, **default_style)
+        """
+        The labels are added in a batch so that the drawable is re-drawn only once.
+        """
+        with self.drawable.legend.batch():
+            for edge in edges:
+                """
+                Go through each edge and look for the label.
+                The drawn label depends on the type of graph.
+                Once a label is drawn, it is added to a list of drawn labels so it is not drawn again.
+                """
+                if 'label' in edges[edge]:
+                    label = edges[edge]['label']
+
+                    default_style = dict(**kwargs)
+                    default_style.update(edges[edge].get('style', { }))
+                    if directed:
+                        self.drawable.legend.draw_arrow(label, label_style=label_style,
+                                                        *args, **default_style)
+                    else:
+                        self.drawable.legend.draw_line(label, label_style=label_style,
+                                                        *args, **default_style)
 
     def _get_distance(self, u, v):
         """
@@ -671,7 +1173,7 @@ class Graph(LabelledVisualization):
         if xdiff == 0:
             return math.pi / 2.
 
-        ratio = util.get_aspect(self.drawable.axes)
+        ratio = util.get_aspect(self.drawable.axes, context=self.drawable.context)
         ydiff = (v[1] - u[1]) * ratio
 
         return math.atan(ydiff / xdiff)
@@ -698,8 +1200,10 @@ class Graph(LabelledVisualization):
         :rtype: tuple
         """
 
-        origin = self.drawable.axes.transData.inverted().transform((0, 0))
+        transform = self.drawable.axes.transData
+        inverted = self.drawable.context.inverted(transform)
+        origin = self.drawable.context.inverted_origin(transform)
 
-        x = (self.drawable.axes.transData.inverted().transform((s ** 0.5, 0))[0] - origin[0])/2.
-        y = (self.drawable.axes.transData.inverted().transform((0, s ** 0.5))[1] - origin[1])/2.
+        x = (inverted.transform((s ** 0.5, 0))[0] - origin[0])/2.
+        y = (inverted.transform((0, s ** 0.5))[1] - origin[1])/2.
         return (x, y)
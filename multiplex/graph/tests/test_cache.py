@@ -0,0 +1,188 @@
+"""
+Unit tests for the :class:`~graph.cache.LayoutCache` class.
+"""
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+import os
+import sys
+import tempfile
+
+path = os.path.join(os.path.dirname(__file__), '..', '..')
+if path not in sys.path:
+    sys.path.insert(1, path)
+
+from tests.test import MultiplexTest
+from graph.cache import LayoutCache
+from graph.graph import Graph
+import drawable
+
+class TestLayoutCache(MultiplexTest):
+    """
+    Unit tests for the :class:`~graph.cache.LayoutCache` class.
+    """
+
+    def test_init_negative_overlap(self):
+        """
+        Test that when creating a cache with a negative overlap, a ValueError is raised.
+        """
+
+        self.assertRaises(ValueError, LayoutCache, overlap=-1)
+
+    def test_layout_all_nodes(self):
+        """
+        Test that the layout has a position for all nodes.
+        """
+
+        G = nx.path_graph(10)
+        cache = LayoutCache()
+        positions = cache.layout(G)
+        self.assertEqual(set(G.nodes), set(positions))
+
+    def test_layout_cached(self):
+        """
+        Test that laying out the same graph again returns the cached positions.
+        """
+
+        G = nx.path_graph(10)
+        cache = LayoutCache()
+        positions = cache.layout(G)
+        self.assertEqual(1, len(cache.layouts))
+        self.assertEqual(1, cache.layouts.info()['misses'])
+
+        cached = cache.layout(G)
+        self.assertEqual(1, len(cache.layouts))
+        self.assertEqual(1, cache.layouts.info()['hits'])
+        self.assertTrue(all( tuple(positions[node]) == tuple(cached[node]) for node in G.nodes ))
+
+    def test_layout_copy(self):
+        """
+        Test that changing the returned positions does not change the cache.
+        """
+
+        G = nx.path_graph(10)
+        cache = LayoutCache()
+        positions = cache.layout(G)
+        positions[0] = (10, 10)
+        self.assertNotEqual((10, 10), tuple(cache.layout(G)[0]))
+
+    def test_layout_same_structure(self):
+        """
+        Test that graphs with the same structure share the same layout, even if their nodes have different attributes or are added in a different order.
+        """
+
+        G = nx.Graph()
+        G.add_edges_from([ ('A', 'B'), ('B', 'C') ])
+        H = nx.Graph()
+        H.add_edges_from([ ('C', 'B'), ('B', 'A') ])
+        H.nodes['A']['style'] = { 'color': '#FF0000' }
+
+        cache = LayoutCache()
+        cache.layout(G)
+        cache.layout(H)
+        self.assertEqual(1, len(cache.layouts))
+
+    def test_layout_different_structure(self):
+        """
+        Test that graphs with a different structure, direction or weights do not share the same layout.
+        """
+
+        G = nx.path_graph(5)
+        H = nx.path_graph(5)
+        H.edges[(0, 1)]['weight'] = 2
+
+        cache = LayoutCache()
+        cache.layout(G)
+        cache.layout(nx.cycle_graph(5))
+        cache.layout(nx.path_graph(5, create_using=nx.DiGraph))
+        cache.layout(H)
+        self.assertEqual(4, len(cache.layouts))
+
+    def test_layout_different_arguments(self):
+        """
+        Test that laying out the same graph with different arguments generates a new layout.
+        """
+
+        G = nx.path_graph(5)
+        cache = LayoutCache()
+        cache.layout(G, k=0.1)
+        cache.layout(G, k=0.2)
+        cache.layout(G, k=0.1)
+        self.assertEqual(2, len(cache.layouts))
+        self.assertEqual(1, cache.layouts.info()['hits'])
+
+    def test_layout_warm_start(self):
+        """
+        Test that when the graph changes only a bit, the layout starts from the previous positions.
+        """
+
+        G = nx.path_graph(10)
+        cache = LayoutCache()
+        positions = cache.layout(G, iterations=0)
+
+        """
+        Without any iterations, the nodes only move as much as needed to rescale the layout.
+        Therefore the nodes keep their relative positions.
+        """
+        G.add_edge(9, 10)
+        warm = cache.layout(G, iterations=0)
+        self.assertEqual(2, len(cache.layouts))
+        scale = (warm[1] - warm[0]) / (positions[1] - positions[0])
+        for node in range(2, 10):
+            self.assertTrue(np.allclose(scale * (positions[node] - positions[0]), warm[node] - warm[0]))
+
+    def test_layout_no_warm_start(self):
+        """
+        Test that when the graph changes a lot, the layout does not start from the previous positions.
+        """
+
+        G = nx.path_graph(10)
+        cache = LayoutCache(overlap=2)
+        positions = cache.layout(G, iterations=0, seed=1)
+        G.add_edge(9, 10)
+        cold = cache.layout(G, iterations=0, seed=1)
+        fresh = nx.spring_layout(G, iterations=0, seed=1)
+        self.assertTrue(all( np.allclose(fresh[node], cold[node]) for node in G.nodes ))
+
+    def test_layout_directory(self):
+        """
+        Test that layouts stored in a directory are re-used by other caches.
+        """
+
+        G = nx.path_graph(10)
+        with tempfile.TemporaryDirectory() as directory:
+            positions = LayoutCache(directory=directory).layout(G)
+            self.assertEqual(1, len(os.listdir(directory)))
+
+            cache = LayoutCache(directory=directory)
+            cached = cache.layout(G)
+            self.assertEqual(1, len(cache.layouts))
+            self.assertTrue(all( tuple(positions[node]) == tuple(cached[node]) for node in G.nodes ))
+
+    def test_clear(self):
+        """
+        Test that clearing the cache removes all layouts.
+        """
+
+        G = nx.path_graph(10)
+        cache = LayoutCache()
+        cache.layout(G)
+        cache.clear()
+        self.assertFalse(len(cache.layouts))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_positions_skip_layout(self):
+        """
+        Test that when all nodes have a position, the graph is not laid out.
+        """
+
+        G = nx.path_graph(3)
+        Graph.layouts.clear()
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.draw_graph(G, positions={ 0: (0, 0), 1: (1, 0), 2: (2, 0) })
+        self.assertFalse(len(Graph.layouts.layouts))
+
+        viz.draw_graph(G, positions={ 0: (0, 0), 1: (1, 0) })
+        self.assertEqual(1, len(Graph.layouts.layouts))
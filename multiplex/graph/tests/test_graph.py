@@ -3,6 +3,9 @@ Unit tests for the :class:`~graph.graph.Graph` class.
 """
 
 import math
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgb
+from matplotlib.lines import Line2D
 import matplotlib
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -15,6 +18,7 @@ if path not in sys.path:
 
 from tests.test import MultiplexTest
 from graph.graph import Graph
+from graph.views import ArrowView, EdgeView
 import drawable
 import util
 
@@ -114,6 +118,57 @@ class TestGraph(MultiplexTest):
         self.assertFalse(rendered_positions['E'] in positions.values())
         self.assertFalse(rendered_positions['D'] == rendered_positions['E'])
 
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_nodes_one_collection(self):
+        """
+        Test that nodes with the same style are drawn as one collection.
+        """
+
+        G = nx.Graph()
+        G.add_nodes_from(range(100))
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G)
+        self.assertEqual(100, len(nodes))
+        self.assertEqual(1, len(viz.axes.collections))
+        self.assertEqual(1, len({ id(node.collection) for node in nodes.values() }))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_nodes_style_groups(self):
+        """
+        Test that nodes with a different marker style are drawn in separate collections, but different colors and sizes are not.
+        """
+
+        G = nx.Graph()
+        G.add_node('A', style={ 'color': '#FF0000', 's': 100 })
+        G.add_node('B', style={ 'color': '#00FF00' })
+        G.add_node('C', style={ 'alpha': 0.5 })
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G)
+        self.assertEqual(nodes['A'].collection, nodes['B'].collection)
+        self.assertNotEqual(nodes['A'].collection, nodes['C'].collection)
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_nodes_style(self):
+        """
+        Test that each node in a collection keeps its own style.
+        """
+
+        G = nx.Graph()
+        G.add_node('A', style={ 'color': '#FF0000', 's': 100, 'linewidth': 2 })
+        G.add_node('B', style={ 'facecolor': '#00FF00', 'edgecolor': '#0000FF' })
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, node_style={ 's': 50 })
+        self.assertEqual((1, 0, 0, 1), tuple(nodes['A'].get_facecolor()[0]))
+        self.assertEqual((1, 0, 0, 1), tuple(nodes['A'].get_edgecolor()[0]))
+        self.assertEqual(100, nodes['A'].get_sizes()[0])
+        self.assertEqual(2, nodes['A'].get_linewidth()[0])
+        self.assertEqual((0, 1, 0, 1), tuple(nodes['B'].get_facecolor()[0]))
+        self.assertEqual((0, 0, 1, 1), tuple(nodes['B'].get_edgecolor()[0]))
+        self.assertEqual(50, nodes['B'].get_sizes()[0])
+
     @MultiplexTest.temporary_plot
     def test_draw_graph_without_edges(self):
         """
@@ -144,7 +199,7 @@ class TestGraph(MultiplexTest):
         nodes, node_names, edges, edge_names = viz.draw_graph(G, edge_style=edge_style)
         self.assertEqual(3, len(nodes))
         self.assertEqual(2, len(edges))
-        self.assertTrue(all(type(edge) == matplotlib.lines.Line2D for edge in edges.values()))
+        self.assertTrue(all(type(edge) == EdgeView for edge in edges.values()))
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_undirected_edge_style(self):
@@ -162,7 +217,7 @@ class TestGraph(MultiplexTest):
         self.assertEqual(2, len(edges))
 
         self.assertTrue(all(edge.get_alpha() == edge_style['alpha'] for edge in edges.values()))
-        self.assertTrue(all(edge.get_color() == edge_style['color'] for edge in edges.values()))
+        self.assertTrue(all(edge.get_color()[:3] == to_rgb(edge_style['color']) for edge in edges.values()))
         self.assertTrue(all(edge.get_linewidth() == edge_style['linewidth'] for edge in edges.values()))
 
     @MultiplexTest.temporary_plot
@@ -204,12 +259,76 @@ class TestGraph(MultiplexTest):
         self.assertEqual(1, edges[('A', 'C')].get_alpha())
         self.assertEqual(0.5, edges[('A', 'B')].get_alpha())
         self.assertEqual(0.5, edges[('C', 'B')].get_alpha())
-        self.assertTrue(all( edge.get_color() == '#FF0000' for edge in edges.values() ))
+        self.assertTrue(all( edge.get_color()[:3] == to_rgb('#FF0000') for edge in edges.values() ))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_undirected_line_edge_style(self):
+        """
+        Test that when the edge style has properties that only lines support, the edges are drawn as lines with those properties.
+        """
+
+        E = [ ('A', 'C'), ('B', 'A'), ('C', 'B') ]
+        G = nx.from_edgelist(E)
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        edge_style = { 'color': '#FF0000', 'marker': 'o', 'drawstyle': 'steps' }
+        G.edges[('C', 'A')]['style'] = { 'dashes': (2, 2) }
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, edge_style=edge_style)
+        self.assertEqual(3, len(edges))
+        self.assertTrue(all( type(edge) == Line2D for edge in edges.values() ))
+        self.assertTrue(all( edge.get_marker() == 'o' for edge in edges.values() ))
+        self.assertTrue(all( edge.get_drawstyle() == 'steps' for edge in edges.values() ))
+        self.assertTrue(all( to_rgb(edge.get_color()) == to_rgb('#FF0000') for edge in edges.values() ))
+        self.assertEqual('--', edges[('A', 'C')].get_linestyle())
+
+        """
+        Edges that do not set these properties are still drawn in a collection.
+        """
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, edge_style={ 'color': '#FF0000' })
+        self.assertEqual(Line2D, type(edges[('A', 'C')]))
+        self.assertEqual(EdgeView, type(edges[('A', 'B')]))
+        self.assertEqual(EdgeView, type(edges[('C', 'B')]))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_undirected_edges_one_collection(self):
+        """
+        Test that undirected edges with the same style are drawn as one collection, even if their colors and widths differ.
+        """
+
+        G = nx.path_graph(100)
+        G.edges[(0, 1)]['style'] = { 'color': '#00FF00', 'linewidth': 3 }
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, edge_style={ 'color': '#FF0000' })
+        self.assertEqual(99, len(edges))
+        self.assertEqual(1, len([ collection for collection in viz.axes.collections if type(collection) == LineCollection ]))
+        self.assertEqual(to_rgb('#00FF00'), edges[(0, 1)].get_color()[:3])
+        self.assertEqual(3, edges[(0, 1)].get_linewidth())
+        self.assertEqual(to_rgb('#FF0000'), edges[(1, 2)].get_color()[:3])
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_undirected_edges_clipped(self):
+        """
+        Test that undirected edges start and end at the border of the nodes, not at their center.
+        """
+
+        G = nx.Graph()
+        G.add_edge('A', 'B')
+        G.add_node('B', style={ 's': 400 })
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        positions = { 'A': (0, 0), 'B': (1, 0) }
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, positions=positions, node_style={ 's': 100 })
+        x, y = edges[('A', 'B')].get_xdata(), edges[('A', 'B')].get_ydata()
+        self.assertEqual([ 0, 0 ], list(y))
+        self.assertTrue(0 < x[0] < x[1] < 1)
+        self.assertLess(x[0], 1 - x[1])
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_directed_edge_type(self):
         """
-        Test that when plotting a directed graph, the edges are drawn as text annotations.
+        Test that when plotting a directed graph, the edges are drawn as arrows.
         """
 
         E = [ ('A', 'C'), ('B', 'A') ]
@@ -220,7 +339,90 @@ class TestGraph(MultiplexTest):
         nodes, node_names, edges, edge_names = viz.draw_graph(G, edge_style=edge_style)
         self.assertEqual(3, len(nodes))
         self.assertEqual(2, len(edges))
-        self.assertTrue(all(type(edge) == matplotlib.text.Annotation for edge in edges.values()))
+        self.assertTrue(all(type(edge) == ArrowView for edge in edges.values()))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_directed_edges_one_collection(self):
+        """
+        Test that directed edges with the same style are drawn as one collection of shafts and one collection of heads.
+        """
+
+        G = nx.path_graph(100, create_using=nx.DiGraph)
+        G.edges[(0, 1)]['style'] = { 'color': '#00FF00', 'headwidth': 6 }
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, edge_style={ 'color': '#FF0000' })
+        self.assertEqual(99, len(edges))
+        self.assertEqual(1, len([ collection for collection in viz.axes.collections if isinstance(collection, LineCollection) ]))
+        self.assertEqual(1, len([ collection for collection in viz.axes.collections if isinstance(collection, PolyCollection) ]))
+        self.assertFalse(viz.axes.texts)
+        self.assertEqual(to_rgb('#00FF00'), edges[(0, 1)].get_facecolor()[:3])
+        self.assertEqual(to_rgb('#FF0000'), edges[(1, 2)].get_facecolor()[:3])
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_directed_edges_limits_change(self):
+        """
+        Test that when the axes limits change after drawing directed edges, the heads point along the edges and the shafts stop where the heads start.
+        """
+
+        G = nx.DiGraph()
+        G.add_edge('A', 'B')
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        positions = { 'A': (0, 0), 'B': (1, 1) }
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, positions=positions, edge_style={ 'headlength': 12 })
+        viz.set_xlim((-1, 10))
+        viz.set_ylim((-1, 2))
+        viz.figure.canvas.draw()
+
+        arrow = edges[('A', 'B')]
+        transform = viz.axes.transData
+        start, end = transform.transform(list(zip(arrow.get_xdata(), arrow.get_ydata())))
+        direction = (end - start) / math.sqrt(sum((end - start) ** 2))
+
+        """
+        The head's base is behind its tip, in the opposite direction of the edge on the display.
+        """
+        head = arrow.heads.get_paths()[arrow.index].vertices
+        base = (head[1] + head[2]) / 2
+        self.assertTrue(all( abs(value) < 1e-6 for value in base / 12 + direction ))
+
+        """
+        The shaft stops a head's length away from the end on the display.
+        """
+        shaft = transform.transform(arrow.shafts.get_segments()[arrow.index][1])
+        self.assertTrue(all( abs(value) < 1e-6 for value in shaft - (end - direction * 12 * viz.figure.dpi / 72.) ))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_directed_edges_end(self):
+        """
+        Test that the arrows of directed edges start and end at the same positions as the edges.
+        """
+
+        G = nx.DiGraph()
+        G.add_edge('A', 'B')
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        positions = { 'A': (0, 0), 'B': (1, 1) }
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, positions=positions)
+        x, y = edges[('A', 'B')].get_xdata(), edges[('A', 'B')].get_ydata()
+        self.assertTrue(0 < x[0] < x[1] < 1)
+        self.assertTrue(0 < y[0] < y[1] < 1)
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_directed_arrowstyle(self):
+        """
+        Test that directed edges with an arrow style are drawn as annotations.
+        """
+
+        E = [ ('A', 'C'), ('B', 'A') ]
+        G = nx.from_edgelist(E, create_using=nx.DiGraph)
+        G.edges[('A', 'C')]['style'] = { 'arrowstyle': '->' }
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G)
+        self.assertEqual(matplotlib.text.Annotation, type(edges[('A', 'C')]))
+        self.assertEqual(ArrowView, type(edges[('B', 'A')]))
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_directed_edge_style(self):
@@ -237,9 +439,9 @@ class TestGraph(MultiplexTest):
         self.assertEqual(3, len(nodes))
         self.assertEqual(2, len(edges))
 
-        self.assertTrue(all(edge.arrow_patch.get_edgecolor()[3] == edge_style['alpha'] for edge in edges.values()))
-        self.assertTrue(all(edge.arrow_patch.get_edgecolor()[:3] == (1, 0, 0) for edge in edges.values()))
-        self.assertTrue(all(edge.arrow_patch.get_linewidth() == edge_style['linewidth'] for edge in edges.values()))
+        self.assertTrue(all(edge.get_edgecolor()[3] == edge_style['alpha'] for edge in edges.values()))
+        self.assertTrue(all(edge.get_edgecolor()[:3] == (1, 0, 0) for edge in edges.values()))
+        self.assertTrue(all(edge.get_linewidth() == edge_style['linewidth'] for edge in edges.values()))
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_directed_override_edge_style(self):
@@ -257,9 +459,9 @@ class TestGraph(MultiplexTest):
         self.assertEqual(3, len(nodes))
         self.assertEqual(3, len(edges))
 
-        self.assertEqual(1, edges[('A', 'C')].arrow_patch.get_edgecolor()[3])
-        self.assertEqual(0.5, edges[('B', 'A')].arrow_patch.get_edgecolor()[3])
-        self.assertEqual(0.5, edges[('C', 'B')].arrow_patch.get_edgecolor()[3])
+        self.assertEqual(1, edges[('A', 'C')].get_edgecolor()[3])
+        self.assertEqual(0.5, edges[('B', 'A')].get_edgecolor()[3])
+        self.assertEqual(0.5, edges[('C', 'B')].get_edgecolor()[3])
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_directed_inherit_edge_style(self):
@@ -277,10 +479,10 @@ class TestGraph(MultiplexTest):
         self.assertEqual(3, len(nodes))
         self.assertEqual(3, len(edges))
 
-        self.assertEqual(1, edges[('A', 'C')].arrow_patch.get_edgecolor()[3])
-        self.assertEqual(0.5, edges[('B', 'A')].arrow_patch.get_edgecolor()[3])
-        self.assertEqual(0.5, edges[('C', 'B')].arrow_patch.get_edgecolor()[3])
-        self.assertTrue(all( edge.arrow_patch.get_edgecolor()[:3] == (1, 0, 0) for edge in edges.values() ))
+        self.assertEqual(1, edges[('A', 'C')].get_edgecolor()[3])
+        self.assertEqual(0.5, edges[('B', 'A')].get_edgecolor()[3])
+        self.assertEqual(0.5, edges[('C', 'B')].get_edgecolor()[3])
+        self.assertTrue(all( edge.get_edgecolor()[:3] == (1, 0, 0) for edge in edges.values() ))
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_no_node_names(self):
@@ -314,6 +516,37 @@ class TestGraph(MultiplexTest):
         self.assertEqual(1, len(node_names))
         self.assertEqual('A', str(node_names['A']).strip())
 
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_no_names_no_index(self):
+        """
+        Test that when no node name can move, the nodes and edges are not indexed.
+        """
+
+        G = nx.gnm_random_graph(200, 1000, seed=1)
+        positions = nx.random_layout(G, seed=1)
+
+        indexed = [ ]
+        index_obstacles = Graph._index_obstacles
+        Graph._index_obstacles = lambda *args, **kwargs: indexed.append(True) or index_obstacles(*args, **kwargs)
+        try:
+            viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+            nodes, node_names, edges, edge_names = viz.draw_graph(G, positions=positions)
+            self.assertFalse(node_names)
+            self.assertFalse(indexed)
+
+            """
+            Names with a fixed vertical alignment never move, so they do not need the index either.
+            """
+            G.nodes[0]['name'] = 'A'
+            nodes, node_names, edges, edge_names = viz.draw_graph(G, positions=positions, name_style={ 'va': 'top' })
+            self.assertEqual(1, len(node_names))
+            self.assertFalse(indexed)
+
+            nodes, node_names, edges, edge_names = viz.draw_graph(G, positions=positions)
+            self.assertTrue(indexed)
+        finally:
+            Graph._index_obstacles = index_obstacles
+
     @MultiplexTest.temporary_plot
     def test_draw_graph_node_name_style(self):
         """
@@ -397,7 +630,7 @@ class TestGraph(MultiplexTest):
         nodes, node_names, edges, edge_names = viz.draw_graph(G)
         self.assertEqual(1, len(edges))
         self.assertEqual(1, len(edges[('A', 'A')]))
-        self.assertEqual(matplotlib.lines.Line2D, type(edges[('A', 'A')][0][0]))
+        self.assertEqual(EdgeView, type(edges[('A', 'A')][0]))
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_loop_directed(self):
@@ -412,8 +645,42 @@ class TestGraph(MultiplexTest):
         nodes, node_names, edges, edge_names = viz.draw_graph(G)
         self.assertEqual(1, len(edges))
         self.assertEqual(2, len(edges[('A', 'A')]))
-        self.assertEqual(matplotlib.lines.Line2D, type(edges[('A', 'A')][0][0]))
-        self.assertEqual(matplotlib.text.Annotation, type(edges[('A', 'A')][1]))
+        self.assertEqual(EdgeView, type(edges[('A', 'A')][0]))
+        self.assertEqual(ArrowView, type(edges[('A', 'A')][1]))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_loops_one_collection(self):
+        """
+        Test that loops are drawn in the same collection as the other edges, and that their arrow heads are drawn together.
+        """
+
+        G = nx.path_graph(50, create_using=nx.DiGraph)
+        G.add_edges_from([ (node, node) for node in range(50) ])
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G)
+        self.assertEqual(99, len(edges))
+        self.assertTrue(all( len(edges[(node, node)]) == 2 for node in range(50) ))
+        self.assertEqual(3, len([ collection for collection in viz.axes.collections if isinstance(collection, LineCollection) ])) # edge shafts, loops and loop shafts
+        self.assertEqual(2, len([ collection for collection in viz.axes.collections if isinstance(collection, PolyCollection) ]))
+        self.assertEqual(1, len({ id(edges[(node, node)][0].collection) for node in range(50) }))
+        self.assertEqual(1, len({ id(edges[(node, node)][1].heads) for node in range(50) }))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_graph_loop_style(self):
+        """
+        Test that loops are drawn twice as thick as the other edges, and that they end where their arrow heads point.
+        """
+
+        G = nx.DiGraph()
+        G.add_edges_from([ ('A', 'A'), ('A', 'B') ])
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, edge_style={ 'linewidth': 1.5 })
+        loop, arrow = edges[('A', 'A')]
+        self.assertEqual(3, loop.get_linewidth())
+        self.assertEqual(loop.get_xdata()[-1], arrow.get_xdata()[-1])
+        self.assertEqual(loop.get_ydata()[-1], arrow.get_ydata()[-1])
 
     @MultiplexTest.temporary_plot
     def test_draw_graph_no_node_labels(self):
@@ -1129,3 +1396,62 @@ class TestGraph(MultiplexTest):
 
         self.assertEqual(round(bb.width / 2., 10), round(graph._get_radius(point, s=1000)[0], 10))
         self.assertEqual(round(bb.height / 2., 10), round(graph._get_radius(point, s=1000)[1], 10))
+
+    @MultiplexTest.temporary_plot
+    def test_node_name_avoids_node_above(self):
+        """
+        Test that when a node is directly above another node, the lower node's name is moved below it.
+        """
+
+        G = nx.Graph()
+        G.add_nodes_from([ 'A', 'B', 'C' ])
+        G.nodes['A']['name'] = 'A'
+        G.nodes['B']['name'] = 'B'
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, positions={ 'A': (0, 0), 'B': (0, 0.02), 'C': (1, 1) })
+        self.assertLess(node_names['A'].get_virtual_bb().y1, 0)
+        self.assertGreater(node_names['B'].get_virtual_bb().y0, 0.02)
+
+    @MultiplexTest.temporary_plot
+    def test_node_name_avoids_edge(self):
+        """
+        Test that when an edge passes right above a node, its name is moved below it.
+        """
+
+        G = nx.Graph()
+        G.add_edge('B', 'C')
+        G.add_nodes_from([ 'A', 'D' ])
+        G.nodes['A']['name'] = 'A'
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, positions={ 'A': (0, 0), 'B': (-1, 0.02), 'C': (1, 0.02), 'D': (0, 1) })
+        self.assertLess(node_names['A'].get_virtual_bb().y1, 0)
+
+    @MultiplexTest.temporary_plot
+    def test_node_name_explicit_va_not_moved(self):
+        """
+        Test that a node name with an explicit vertical alignment is not moved, even if it overlaps with other nodes.
+        """
+
+        G = nx.Graph()
+        G.add_nodes_from([ 'A', 'B', 'C' ])
+        G.nodes['A']['name'] = 'A'
+        G.nodes['A']['name_style'] = { 'va': 'bottom' }
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        nodes, node_names, edges, edge_names = viz.draw_graph(G, positions={ 'A': (0, 0), 'B': (0, 0.02), 'C': (1, 1) })
+        self.assertGreater(node_names['A'].get_virtual_bb().y0, 0)
+
+    def test_intersects_segment(self):
+        """
+        Test that segments are only considered to intersect with extents that they pass through.
+        """
+
+        viz = Graph(None)
+        self.assertTrue(viz._intersects_segment((0, 0, 10, 10), (-5, 5, 15, 5)))
+        self.assertTrue(viz._intersects_segment((0, 0, 10, 10), (5, -5, 5, 15)))
+        self.assertTrue(viz._intersects_segment((0, 0, 10, 10), (2, 2, 3, 3)))
+        self.assertFalse(viz._intersects_segment((0, 0, 10, 10), (-5, 15, 15, 11)))
+        self.assertFalse(viz._intersects_segment((0, 0, 10, 10), (11, -5, 11, 15)))
+        self.assertFalse(viz._intersects_segment((0, 0, 10, 10), (-10, 0, 0, 20)))
@@ -0,0 +1,279 @@
+"""
+Graphs draw many nodes or edges with the same style together, as one collection.
+Each node or edge is only one item in its collection, so the :class:`~graph.graph.Graph` returns views of them instead.
+
+A node view looks like the collection of a single node, and an edge view looks like a line.
+Node views have the same getters as a `matplotlib.collections.PathCollection <https://matplotlib.org/3.1.1/api/collections_api.html>`_, but they only return the node's values.
+Edge views have the same getters as a `matplotlib.lines.Line2D <https://matplotlib.org/3.1.1/api/_as_gen/matplotlib.lines.Line2D.html>`_:
+
+.. code-block:: python
+
+    nodes, node_names, edges, edge_names = viz.draw_graph(G)
+    x, y = nodes['u'].get_offsets()[0]
+    color = edges[('u', 'v')].get_color()
+
+Directed edges are arrows, and each one is made up of a shaft and a head in two separate collections.
+Arrow views have the same getters as the arrow patch of an annotation.
+"""
+
+import numpy as np
+
+class NodeView(object):
+    """
+    The :class:`~NodeView` is a lightweight view of one node in a collection of nodes.
+    The getters return arrays with one row, like the getters of a collection that contains only the node.
+
+    :ivar collection: The collection that contains the node.
+    :vartype collection: :class:`matplotlib.collections.PathCollection`
+    :ivar index: The index of the node in the collection.
+    :vartype index: int
+    """
+
+    def __init__(self, collection, index):
+        """
+        Create the view of the node at the given index in the collection.
+
+        :param collection: The collection that contains the node.
+        :type collection: :class:`matplotlib.collections.PathCollection`
+        :param index: The index of the node in the collection.
+        :type index: int
+        """
+
+        self.collection = collection
+        self.index = index
+
+    def get_offsets(self):
+        """
+        Get the position of the node.
+
+        :return: An array with one row: the node's x and y coordinates.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return self._get(self.collection.get_offsets())
+
+    def get_sizes(self):
+        """
+        Get the size of the node.
+
+        :return: An array with the node's size.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return self._get(self.collection.get_sizes())
+
+    def get_facecolor(self):
+        """
+        Get the face color of the node.
+
+        :return: An array with one row: the node's RGBA face color.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return self._get(self.collection.get_facecolor())
+
+    def get_edgecolor(self):
+        """
+        Get the edge color of the node.
+
+        :return: An array with one row: the node's RGBA edge color.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return self._get(self.collection.get_edgecolor())
+
+    def get_linewidth(self):
+        """
+        Get the width of the node's edge.
+
+        :return: An array with the width of the node's edge.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return self._get(self.collection.get_linewidth())
+
+    def _get(self, values):
+        """
+        Get the node's row from the given collection values.
+        Like matplotlib, the view cycles through the values if there are fewer values than nodes.
+
+        :param values: The values of the collection.
+        :type values: :class:`numpy.ndarray`
+
+        :return: An array with the node's row, or the values themselves if they are empty.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        if not len(values):
+            return values
+
+        index = self.index % len(values)
+        return values[index:index + 1]
+
+class EdgeView(object):
+    """
+    The :class:`~EdgeView` is a lightweight view of one edge in a collection of edges.
+    The getters return the same values as the getters of a `matplotlib.lines.Line2D <https://matplotlib.org/3.1.1/api/_as_gen/matplotlib.lines.Line2D.html>`_ that connects the edge's nodes.
+
+    :ivar collection: The collection that contains the edge.
+    :vartype collection: :class:`matplotlib.collections.LineCollection`
+    :ivar index: The index of the edge in the collection.
+    :vartype index: int
+    """
+
+    def __init__(self, collection, index):
+        """
+        Create the view of the edge at the given index in the collection.
+
+        :param collection: The collection that contains the edge.
+        :type collection: :class:`matplotlib.collections.LineCollection`
+        :param index: The index of the edge in the collection.
+        :type index: int
+        """
+
+        self.collection = collection
+        self.index = index
+
+    def get_xdata(self):
+        """
+        Get the x-coordinates of the edge's start and end.
+
+        :return: The x-coordinates of the edge's start and end.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return self.collection.get_segments()[self.index][:, 0]
+
+    def get_ydata(self):
+        """
+        Get the y-coordinates of the edge's start and end.
+
+        :return: The y-coordinates of the edge's start and end.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return self.collection.get_segments()[self.index][:, 1]
+
+    def get_color(self):
+        """
+        Get the color of the edge.
+
+        :return: The edge's RGBA color.
+        :rtype: tuple of float
+        """
+
+        colors = self.collection.get_color()
+        return tuple(colors[self.index % len(colors)])
+
+    def get_linewidth(self):
+        """
+        Get the width of the edge.
+
+        :return: The width of the edge.
+        :rtype: float
+        """
+
+        linewidths = self.collection.get_linewidth()
+        return linewidths[self.index % len(linewidths)]
+
+    def get_alpha(self):
+        """
+        Get the transparency of the edge.
+
+        :return: The transparency of the edge, or `None` if it is not set.
+        :rtype: None or float
+        """
+
+        return self.collection.get_alpha()
+
+class ArrowView(object):
+    """
+    The :class:`~ArrowView` is a lightweight view of one arrow, made up of a shaft in a collection of shafts and a head in a collection of heads.
+    The getters return the same values as the getters of the `arrow_patch` of a `matplotlib.text.Annotation <https://matplotlib.org/3.1.1/api/text_api.html#matplotlib.text.Annotation>`_.
+
+    :ivar shafts: The collection that contains the arrow's shaft.
+    :vartype shafts: :class:`~graph.arrows.ArrowShafts`
+    :ivar heads: The collection that contains the arrow's head.
+    :vartype heads: :class:`~graph.arrows.ArrowHeads`
+    :ivar index: The index of the arrow in the collections.
+    :vartype index: int
+    """
+
+    def __init__(self, shafts, heads, index):
+        """
+        Create the view of the arrow at the given index in the collections.
+
+        :param shafts: The collection that contains the arrow's shaft.
+        :type shafts: :class:`~graph.arrows.ArrowShafts`
+        :param heads: The collection that contains the arrow's head.
+        :type heads: :class:`~graph.arrows.ArrowHeads`
+        :param index: The index of the arrow in the collections.
+        :type index: int
+        """
+
+        self.shafts = shafts
+        self.heads = heads
+        self.index = index
+
+    def get_xdata(self):
+        """
+        Get the x-coordinates of the arrow's start and of the point where the head points.
+
+        :return: The x-coordinates of the arrow's start and end.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return np.array([ self.shafts.get_segments()[self.index][0, 0], self.heads.get_offsets()[self.index][0] ])
+
+    def get_ydata(self):
+        """
+        Get the y-coordinates of the arrow's start and of the point where the head points.
+
+        :return: The y-coordinates of the arrow's start and end.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        return np.array([ self.shafts.get_segments()[self.index][0, 1], self.heads.get_offsets()[self.index][1] ])
+
+    def get_facecolor(self):
+        """
+        Get the face color of the arrow.
+
+        :return: The arrow's RGBA face color.
+        :rtype: tuple of float
+        """
+
+        colors = self.heads.get_facecolor()
+        return tuple(colors[self.index % len(colors)])
+
+    def get_edgecolor(self):
+        """
+        Get the edge color of the arrow.
+
+        :return: The arrow's RGBA edge color.
+        :rtype: tuple of float
+        """
+
+        colors = self.heads.get_edgecolor()
+        return tuple(colors[self.index % len(colors)])
+
+    def get_linewidth(self):
+        """
+        Get the width of the arrow's edge.
+
+        :return: The width of the arrow's edge.
+        :rtype: float
+        """
+
+        linewidths = self.heads.get_linewidth()
+        return linewidths[self.index % len(linewidths)]
+
+    def get_alpha(self):
+        """
+        Get the transparency of the arrow.
+
+        :return: The transparency of the arrow, or `None` if it is not set.
+        :rtype: None or float
+        """
+
+        return self.heads.get_alpha()
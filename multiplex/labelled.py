@@ -5,6 +5,7 @@ All functionality goes through the :func:`~labelled.LabelledVisualization.draw_l
 """
 
 from abc import abstractmethod
+import numpy as np
 import os
 import sys
 
@@ -12,6 +13,7 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 import util
 
+from spatial import GridIndex
 from visualization import Visualization
 from text.annotation import Annotation
 
@@ -21,6 +23,10 @@ class LabelledVisualization(Visualization):
     Labels are normal :class:`~text.text.TextAnnotation`, which the class stores as instance variables.
     This class adds functionality to distribute overlapping labels.
 
+    The visualization remembers which labels it has distributed together as clusters.
+    When a new label is added, only the clusters that it overlaps are distributed again.
+    To find these clusters, the visualization keeps a spatial index of its labels, so a new label is only compared with the labels near it.
+
     :ivar labels: The labels in the visualizations.
                   This list is used to ensure that labels do not overlap.
     :vartype labels: list of :class:`~text.text.TextAnnotation`
@@ -33,6 +39,8 @@ class LabelledVisualization(Visualization):
 
         super().__init__(*args, **kwargs)
         self.labels = [ ]
+        self._clusters, self._anchors = { }, { }
+        self._index, self._index_generation = GridIndex(), None
 
     @abstractmethod
     def draw(self, *args, **kwargs):
@@ -54,6 +62,7 @@ class LabelledVisualization(Visualization):
     def draw_label(self, label, x, y, va='center', max_iterations=100, *args, **kwargs):
         """
         Draw a label at the end of the line.
+        The label is drawn immediately and arranged so that it does not overlap with the other labels.
 
         Any additional arguments and keyword arguments are passed on to the :func:`text.annotation.Annotation.draw` function.
 
@@ -85,7 +94,13 @@ class LabelledVisualization(Visualization):
         style = dict(kwargs)
         style = { key: value for key, value in style.items()
                              if not (key.startswith('marker') or key.startswith('line')) }
+        """
+        Draw the label straight away so that it can be arranged with the other labels.
+        Labels that are neither text nor a list of tokens, such as numbers, are converted to text.
+        """
+        label = label if type(label) in [ str, list ] else str(label)
         annotation = Annotation(self.drawable, label, x, y, va=va, *args, **style)
+        annotation.draw()
         self.labels.append(annotation)
         self._arrange_labels(annotation, max_iterations=max_iterations)
         return annotation
@@ -97,6 +112,8 @@ class LabelledVisualization(Visualization):
         """
 
         super().redraw()
+        self._clusters, self._anchors = { }, { }
+        self._index_generation = None
         for label in self.labels:
             label.redraw()
         self._arrange_labels()
@@ -105,7 +122,15 @@ class LabelledVisualization(Visualization):
         """
         Go through the labels and ensure that none overlap.
         If any do overlap, move the labels.
-        The function keeps repeating until no labels overlap or the maximum number of iterations is reached.
+
+        Overlapping labels are grouped into clusters, and each cluster is distributed in one step.
+        The labels in a cluster are placed as close as possible to their positions before the arrangement.
+        If a distributed cluster overlaps with other labels, they join the cluster and the whole cluster is distributed again.
+        Since clusters only grow, the function stops after a few iterations, regardless of how much the labels overlap initially.
+
+        The clusters persist between calls.
+        Therefore when a new label is added, only the clusters that it overlaps are distributed again.
+        The clusters are forgotten when the visualization is re-drawn.
 
         .. note::
 
@@ -120,24 +145,68 @@ class LabelledVisualization(Visualization):
                        If given, this function only checks for any other labels that overlap with the given label.
         :type labels: None or :class:`matplotlib.text.Text` or list of :class:`matplotlib.text.Text`
         :param max_iterations: The maximum number of iterations to spend arranging the labels.
+                               Each iteration distributes all clusters once.
         :type max_iterations: int
         """
 
-        overlapping = self._get_overlapping_labels(labels)
-        iterations = 0
-        while overlapping and iterations < max_iterations:
-            for group in overlapping:
-                self._distribute_labels(group)
-            labels = [ label for group in overlapping
-                             for label in group ]
-            overlapping = self._get_overlapping_labels(labels)
-            iterations += 1
+        """
+        The clusters map each label to the labels that have been distributed with it.
+        The anchors are the center of each label before it was first moved.
+        While arranging the labels, the figure does not change, so the layout context does not need to be validated.
+        """
+        clusters, anchors = self._clusters, self._anchors
+
+        with self.drawable.context.frozen():
+            overlapping = self._get_new_overlapping_labels(labels)
+            iterations = 0
+            while overlapping and iterations < max_iterations:
+                for group in overlapping:
+                    """
+                    Merge the group with the clusters of its labels.
+                    Distributing only part of a cluster would make its labels overlap again.
+                    """
+                    cluster = list(dict.fromkeys( member for label in group
+                                                         for member in clusters.get(label, [ label ]) ))
+                    for label in cluster:
+                        clusters[label] = cluster
+                        if label not in anchors:
+                            bb = label.get_virtual_bb()
+                            anchors[label] = (bb.y0 + bb.y1) / 2.
+
+                    self._distribute_labels(cluster, anchors)
+
+                """
+                Look for new overlaps among the moved labels.
+                """
+                labels = [ label for group in overlapping
+                                 for label in group ]
+                overlapping = self._get_new_overlapping_labels(labels)
+                iterations += 1
+
+    def _get_new_overlapping_labels(self, labels=None):
+        """
+        Get groups of overlapping labels that have not been distributed together yet.
+        Overlaps within the same cluster are only rounding errors since the cluster has already been distributed.
+
+        :param labels: The labels to check for overlaps.
+                       If given, this function only checks for any other labels that overlap with the given labels.
+        :type labels: None or :class:`matplotlib.text.Text` or list of :class:`matplotlib.text.Text`
+
+        :return: A list of lists.
+                 Each inner list represents overlapping labels that span more than one cluster.
+        :rtype: list of lists of :class:`matplotlib.text.Text`
+        """
+
+        clusters = self._clusters
+        return [ group for group in self._get_overlapping_labels(labels)
+                       if any( label not in clusters for label in group ) or
+                          len(set( id(clusters[label]) for label in group )) > 1 ]
 
     def _get_overlapping_labels(self, labels=None):
         """
         Get groups of overlapping labels.
         The function returns a list of lists.
-        Each inner list contains the labels that overlap.
+        Each inner list contains the labels that overlap, directly or through other labels in the same list.
         The function automatically excludes labels that do not overlap with other labels.
 
         :param labels: The labels to check for overlaps.
@@ -154,106 +223,108 @@ class LabelledVisualization(Visualization):
         figure = self.drawable.figure
         axes = self.drawable.axes
 
-        all = sorted(self.labels, key=lambda label: label.get_virtual_bb().y0)
         labels = labels or [ ] # change `None` to an empty list
         labels = [ labels ] if type(labels) is not list else labels # change a single label to a list
-        labels = labels or all
-
-        overlapping_labels = [ [ label ] for label in all
-                                         if label not in labels ]
-        for label in labels:
-            assigned = False
-
-            """
-            Go through each label and visit each group of overlapping labels.
-            If the label overlaps with any label in that group, add it to that group.
-            That group would have to be distributed entirely.
-            """
-            for group in overlapping_labels:
-                if (any([ util.overlapping_bb(label.get_virtual_bb(), other.get_virtual_bb()) for other in group ])):
-                    group.append(label)
-                    assigned = True
-                    break
-
-            """
-            If the label does not overlap with any other label, add it to its own group.
-            Groups with a single label overlap with no other group and require no distribution.
-            """
-            if not assigned:
-                overlapping_labels.append([ label])
-
-        return [ group for group in overlapping_labels if len(group) > 1 ]
-
-    def _distribute_labels(self, labels):
-        """
-        Distribute the given labels so that they do not overlap.
 
-        :param labels: The list of overlapping labels.
-        :type labels: list of :class:`matplotlib.text.Text`
         """
-
-        figure = self.drawable.figure
-        axes = self.drawable.axes
+        If labels are given, only overlaps involving these labels are considered.
+        Overlaps between the other labels are ignored because they should already be distributed.
+        Therefore only the given labels and the labels near them, which the spatial index returns, need to be grouped.
+        """
+        if labels:
+            index = self._get_index()
+            all = list(dict.fromkeys(labels))
+            for label in labels:
+                self._index_label(label)
+                if label in index:
+                    all.extend( other for other in index.query(index.get(label)) if other not in all )
+
+            virtual_bbs = np.array([ label.get_virtual_bb().extents for label in all ], dtype=float).reshape(-1, 4)
+            groups = util.overlapping_groups(virtual_bbs, list(range(len(set(labels)))))
+            return [ [ all[i] for i in group ] for group in groups ]
 
         """
-        Calculate the total height that the labels should occupy.
-        Then, get the mean y-coordinate of the labels to find the middle.
+        Otherwise, get the virtual bounding boxes of all labels once and compare them all.
         """
-        total_height = self._get_total_height(labels)
-        middle = self._get_middle(labels)
+        all = self.labels
+        virtual_bbs = np.array([ label.get_virtual_bb().extents for label in all ], dtype=float).reshape(-1, 4)
+        groups = util.overlapping_groups(virtual_bbs)
+        return [ [ all[i] for i in group ] for group in groups ]
 
+    def _get_index(self):
         """
-        Sort the labels in descending order of position.
-        Since labels are centered around the last point, the sorting is based on the center of labels.
-        The labels are moved one by one.
+        Get the spatial index of the labels.
+        The index stores the labels' virtual bounding boxes in display coordinates.
+        If the layout changed since the index was built, for example because the axes limits changed, the index is built anew.
 
-        The initial offset is calculated as the distance that the first label needs to move.
-        Subsequently, the offset is calculated by adding the height of each label.
+        :return: The spatial index of the labels.
+        :rtype: :class:`~spatial.GridIndex`
         """
-        labels = sorted(labels, reverse=True,
-                        key=lambda label: (label.get_virtual_bb().y0 + label.get_virtual_bb().y1)/2.)
-
-        y1 = middle + total_height / 2.
-        for label in labels:
-            bb = label.get_virtual_bb()
-            label.set_position((bb.x0, y1))
-            y1 -= bb.height
 
-    def _get_total_height(self, labels):
-        """
-        Get the total height of the given labels.
+        context = self.drawable.context
+        context.validate()
+        if self._index_generation != context.generation:
+            self._index.clear()
+            self._index_generation = context.generation
+            for label in self.labels:
+                self._index_label(label)
 
-        :param labels: The list of labels.
-        :type labels: list of :class:`matplotlib.text.Text`
+        return self._index
 
-        :return: The total height of the labels.
-        :rtype: float
+    def _index_label(self, label):
         """
+        Add the given label to the spatial index, or update its position in the index.
+        Labels that have not been drawn are removed from the index.
 
-        figure = self.drawable.figure
-        axes = self.drawable.axes
+        :param label: The label to index.
+        :type label: :class:`~text.annotation.Annotation`
+        """
 
-        return sum([ label.get_virtual_bb().height for label in labels ])
+        bb = label.get_virtual_bb()
+        extents = self.drawable.axes.transData.transform(((bb.x0, bb.y0), (bb.x1, bb.y1))).flatten() if label.lines else [ ]
+        if len(extents) and np.isfinite(extents).all():
+            self._index.insert(label, extents)
+        else:
+            self._index.remove(label)
 
-    def _get_middle(self, labels):
+    def _distribute_labels(self, labels, anchors=None):
         """
-        Get the middle y-coordinate of the given labels.
-        The middle is calculated as the mid-point between the label that is highest and lowest.
+        Distribute the given labels so that they do not overlap.
 
-        :param labels: The list of labels.
-        :type labels: list of :class:`matplotlib.text.Text`
+        The labels keep their vertical order, and they are moved as little as possible from their anchors.
+        The labels stay within the y-axis limits, unless they already extend beyond them.
 
-        :return: The middle y-coordinate of the labels.
-        :rtype: float
+        :param labels: The list of overlapping labels.
+        :type labels: list of :class:`matplotlib.text.Text`
+        :param anchors: The preferred center of each label, with labels as keys.
+                        If `None` is given, the labels' current centers are used.
+        :type anchors: None or dict
         """
 
         figure = self.drawable.figure
         axes = self.drawable.axes
 
-        labels = sorted(labels, key=lambda label: label.get_virtual_bb().y0)
-        bb0, bb1 = labels[0].get_virtual_bb(), labels[-1].get_virtual_bb()
+        """
+        Get the virtual bounding boxes of the labels once.
+        Then, calculate the bounds within which the labels must be distributed.
+        """
+        bbs = np.array([ label.get_virtual_bb().extents for label in labels ])
+        if anchors is None:
+            positions = (bbs[:, 1] + bbs[:, 3]) / 2.
+        else:
+            positions = [ anchors[label] for label in labels ]
+
+        ylim = sorted(axes.get_ylim())
+        lower, upper = min(ylim[0], bbs[:, 1].min()), max(ylim[1], bbs[:, 3].max())
 
-        return (bb0.y0 + bb1.y1) / 2.
+        """
+        Distribute the labels in one step and move them to their new positions.
+        """
+        bottoms = util.distribute(positions, bbs[:, 3] - bbs[:, 1], lower, upper)
+        for label, bb, y in zip(labels, bbs, bottoms):
+            label.set_position((bb[0], y), va='bottom')
+            if label in self._index:
+                self._index_label(label)
 
 class DummyLabelledVisualization(LabelledVisualization):
     """
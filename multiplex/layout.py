@@ -0,0 +1,372 @@
+"""
+The layout module keeps track of the state that Multiplex needs during a layout pass.
+Laying out a visualization involves measuring many components and converting between coordinate systems.
+Every measurement needs the figure's renderer and the inverse of some transformation, such as the data or axes transformation.
+Inverting a transformation is not free, and Multiplex would otherwise invert the same transformations thousands of times per figure.
+
+The :class:`~LayoutContext` fetches these values once and re-uses them for as long as they remain valid.
+The values become invalid when the figure's size or resolution change, or when any axes' limits, position or scale change.
+The context does not compare the figure's state to detect these changes.
+Instead, it listens to matplotlib's own transformations, which are invalidated whenever any of these properties change.
+Therefore the context checks whether it is still valid every time that it is used, and this check costs almost nothing.
+Code that measures many components without changing the figure, such as when arranging labels, can skip even these checks with :func:`~LayoutContext.frozen`.
+
+Listening to the transformations relies on how matplotlib invalidates them internally.
+If the installed version of matplotlib does not invalidate transformations in the same way, the context compares the figure's size and resolution, and the axes' positions, limits and scales instead.
+This is slower, but the cached values remain correct.
+
+Some components, such as tick labels, are only positioned when the figure is drawn.
+The context's :func:`~LayoutContext.draw` function positions them without rasterizing the figure, which is much cheaper than drawing the canvas when the figure has many points or lines.
+
+All of Multiplex's measurement helpers, such as :func:`~util.get_bb`, accept an optional context:
+
+.. code-block:: python
+
+    import matplotlib.pyplot as plt
+    from multiplex import drawable, util
+    viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+    bb = util.get_bb(viz.figure, viz.axes, viz.text(0, 0, 'token'), context=viz.context)
+"""
+
+from contextlib import contextmanager
+import os
+import sys
+
+from matplotlib.transforms import TransformNode
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from metrics import IdentityKey, LRUCache
+import util
+
+class LayoutContext(object):
+    """
+    The :class:`~LayoutContext` caches the renderer and transformations that are used to lay out a figure.
+
+    Every time that the context is used, it checks whether the figure changed since it last saw it.
+    If the figure changed, the context forgets everything it cached and increments its ``generation``.
+    Other classes can compare the generation to know whether their own cached measurements are still valid.
+    The generation only changes when the context is validated, so layout passes validate the context once when they start.
+
+    :ivar figure: The figure that the context lays out.
+    :vartype figure: :class:`matplotlib.figure.Figure`
+    :ivar axes: The main axes of the figure.
+                It is used as the default axes when calculating the aspect ratio.
+    :vartype axes: :class:`matplotlib.axes.Axes`
+    :ivar generation: A counter that increases every time that the cached values are invalidated.
+    :vartype generation: int
+    """
+
+    def __init__(self, figure, axes, maxsize=64):
+        """
+        Create the layout context for the given figure and axes.
+
+        :param figure: The figure that the context lays out.
+                       This is used to get the figure renderer.
+        :type figure: :class:`matplotlib.figure.Figure`
+        :param axes: The main axes of the figure.
+        :type axes: :class:`matplotlib.axes.Axes`
+        :param maxsize: The maximum number of transformations for which the context caches values.
+        :type maxsize: int
+        """
+
+        self.figure = figure
+        self.axes = axes
+        self.generation = 0
+
+        self._watcher, self._watched, self._state = None, None, None
+        self._watchable = hasattr(TransformNode(), '_invalid')
+        self._frozen = 0
+        self._renderer = None
+        self._inverted, self._origins, self._inverted_origins = LRUCache(maxsize), LRUCache(maxsize), LRUCache(maxsize)
+        self._aspects = { }
+
+    @property
+    def renderer(self):
+        """
+        Get the figure's renderer.
+
+        :return: The figure's renderer.
+        :rtype: :class:`matplotlib.backend_bases.RendererBase`
+        """
+
+        self.validate()
+        if self._renderer is None:
+            self._renderer = self.figure.canvas.get_renderer()
+
+        return self._renderer
+
+    def inverted(self, transform):
+        """
+        Get the inverse of the given transformation.
+
+        :param transform: The transformation to invert.
+        :type transform: :class:`matplotlib.transforms.Transform`
+
+        :return: The inverted transformation.
+        :rtype: :class:`matplotlib.transforms.Transform`
+        """
+
+        self.validate()
+        return self._get(self._inverted, transform, transform.inverted)
+
+    def origin(self, transform):
+        """
+        Get the display coordinates of the origin of the given transformation.
+        In other words, this function returns where the point `(0, 0)` ends up after the transformation.
+
+        :param transform: The transformation whose origin to get.
+        :type transform: :class:`matplotlib.transforms.Transform`
+
+        :return: The display coordinates of the origin.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        self.validate()
+        return self._get(self._origins, transform, lambda: transform.transform((0, 0)))
+
+    def inverted_origin(self, transform):
+        """
+        Get the coordinates, in terms of the given transformation, of the display's origin.
+        In other words, this function returns where the display point `(0, 0)` ends up after the inverse transformation.
+
+        :param transform: The transformation whose inverse origin to get.
+        :type transform: :class:`matplotlib.transforms.Transform`
+
+        :return: The coordinates of the display's origin.
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        self.validate()
+        return self._get(self._inverted_origins, transform, lambda: self.inverted(transform).transform((0, 0)))
+
+    def get_aspect(self, axes=None):
+        """
+        Get the aspect ratio of the given axes.
+        The calculation is the same as :func:`~util.get_aspect`.
+
+        :param axes: The axes whose aspect ratio will be calculated.
+                     If `None` is given, the context's axes are used.
+        :type axes: None or :class:`matplotlib.axes.Axes`
+
+        :return: The aspect ratio as a fraction of the display ratio and the data ratio.
+        :rtype: float
+        """
+
+        self.validate()
+        axes = self.axes if axes is None else axes
+        aspect = self._aspects.get(axes)
+        if aspect is None:
+            aspect = self._aspects[axes] = util.get_aspect(axes)
+
+        return aspect
+
+    def validate(self):
+        """
+        Check whether the cached values are still valid.
+        If the figure changed since the last check, the cached values are discarded.
+        While the context is frozen, the cached values are always considered to be valid.
+
+        :return: A boolean indicating whether the cached values were still valid.
+        :rtype: bool
+        """
+
+        if self._frozen:
+            return True
+
+        """
+        The context is still valid if the figure has the same canvas and axes, and none of the watched transformations changed.
+        """
+        figure = self.figure
+        axes_list = figure.axes if self.axes in figure.axes else figure.axes + [ self.axes ]
+        watched = (id(figure.canvas), tuple( id(axes) for axes in axes_list ))
+        if watched == self._watched and not self._changed(axes_list):
+            return True
+
+        self._watch(axes_list)
+        self._watched = watched
+        self._clear()
+        return False
+
+    @contextmanager
+    def frozen(self):
+        """
+        Skip the validity checks within a block of code.
+        The context is validated once when the block starts.
+        Until the block ends, the context assumes that the figure does not change, so using the context is cheaper.
+
+        Frozen blocks may be nested.
+        Code in the block may move components, but it should not change the figure's size or any axes' limits, position or scale.
+
+        .. code-block:: python
+
+            with viz.context.frozen():
+                bbs = [ util.get_bb(viz.figure, viz.axes, label, context=viz.context) for label in labels ]
+
+        :return: The context itself.
+        :rtype: :class:`~LayoutContext`
+        """
+
+        self.validate()
+        self._frozen += 1
+        try:
+            yield self
+        finally:
+            self._frozen -= 1
+
+    def invalidate(self):
+        """
+        Discard all cached values, even if the figure seems unchanged.
+        This is useful when the figure changes in a way that the context cannot detect, such as when the backend changes.
+        """
+
+        self._watched = None
+        self._clear()
+
+    def forget(self, transform):
+        """
+        Discard the cached values of the given transformation, but keep all other cached values.
+        This is useful when a transformation that the context does not watch changes, such as a translation that moves a group of components.
+
+        :param transform: The transformation whose cached values to discard.
+        :type transform: :class:`matplotlib.transforms.Transform`
+        """
+
+        for cache in (self._inverted, self._origins, self._inverted_origins):
+            cache.remove(IdentityKey(transform))
+
+    def draw(self):
+        """
+        Lay out the figure without rendering it.
+        The figure goes through the same steps as when it is drawn, so components like tick labels are positioned and can be measured.
+        However, nothing is rasterized, so the cost does not depend on how many points or lines the figure has.
+        If the installed version of matplotlib cannot draw figures without rendering them, the canvas is drawn instead.
+        """
+
+        if hasattr(self.figure, 'draw_without_rendering'):
+            self.figure.draw_without_rendering()
+        else:
+            self.figure.canvas.draw()
+
+    def _get(self, cache, transform, calculate):
+        """
+        Get the value that the given cache stores for the given transformation, calculating it if need be.
+
+        Transformations cannot be used as dictionary keys because they are compared by value.
+        Therefore the cache uses the transformation's identity as the key, through a :class:`~metrics.IdentityKey`.
+        The key only refers to the transformation weakly, so the cache does not keep transformations alive, and a new transformation that re-uses an old one's identity does not find its values.
+
+        :param cache: The cache where the value is stored.
+        :type cache: :class:`~metrics.LRUCache`
+        :param transform: The transformation whose value to get.
+        :type transform: :class:`matplotlib.transforms.Transform`
+        :param calculate: A function without arguments that calculates the value if it is not cached.
+        :type calculate: function
+
+        :return: The cached or calculated value.
+        :rtype: object
+        """
+
+        key = IdentityKey(transform)
+        value = cache.get(key)
+        if value is None:
+            value = calculate()
+            cache.put(key, value)
+
+        return value
+
+    def _clear(self):
+        """
+        Remove all cached values and increment the generation.
+        """
+
+        self._renderer = None
+        self._inverted.clear()
+        self._origins.clear()
+        self._inverted_origins.clear()
+        self._aspects.clear()
+        self.generation += 1
+
+    def _changed(self, axes_list):
+        """
+        Check whether the figure changed since the context started watching it.
+
+        :param axes_list: The watched axes.
+        :type axes_list: list of :class:`matplotlib.axes.Axes`
+
+        :return: A boolean indicating whether the figure changed.
+        :rtype: bool
+        """
+
+        if self._watchable:
+            return bool(self._watcher._invalid)
+
+        return self._get_state(axes_list) != self._state
+
+    def _get_state(self, axes_list):
+        """
+        Get the state of the figure that the cached values depend on.
+        The state is only used when the context cannot listen to matplotlib's transformations.
+
+        :param axes_list: The axes whose state to get.
+        :type axes_list: list of :class:`matplotlib.axes.Axes`
+
+        :return: The figure's size and resolution, and each axes' position, view limits and scales.
+        :rtype: tuple
+        """
+
+        figure = self.figure
+        return (tuple(figure.bbox.bounds), figure.dpi,
+                tuple( (tuple(axes.bbox.bounds), tuple(self._get_view_limits(axes).bounds), axes.get_xscale(), axes.get_yscale())
+                       for axes in axes_list ))
+
+    def _get_view_limits(self, axes):
+        """
+        Get the raw view limits of the given axes.
+        Newer versions of matplotlib autoscale the axes when their view limits are read.
+        The raw view limits are read instead, so that validating the context does not autoscale the axes before all of the data is plotted.
+
+        :param axes: The axes whose view limits to get.
+        :type axes: :class:`matplotlib.axes.Axes`
+
+        :return: The view limits of the axes.
+        :rtype: :class:`matplotlib.transforms.Bbox`
+        """
+
+        return axes._viewLim if hasattr(axes, '_viewLim') else axes.viewLim
+
+    def _watch(self, axes_list):
+        """
+        Start watching the transformations that the cached values depend on.
+
+        matplotlib invalidates a transformation when anything that it depends on changes, and it also invalidates the transformation's parents.
+        The context creates a node that is the parent of the figure's bounding box and of each axes' bounding box, view limits and scale transformation.
+        These cover the figure's size and resolution, and each axes' position, limits and scales.
+        When any of them changes, the node is invalidated, so checking whether the context is still valid only means checking the node.
+
+        matplotlib stops invalidating parents when a transformation is already invalid.
+        Therefore the watched transformations are evaluated, which makes them valid, so that the node is invalidated again by the next change.
+
+        :param axes_list: The axes to watch.
+        :type axes_list: list of :class:`matplotlib.axes.Axes`
+        """
+
+        """
+        If the installed version of matplotlib does not invalidate transformations in the same way, the context remembers the figure's state instead.
+        """
+        if not self._watchable:
+            self._state = self._get_state(axes_list)
+            return
+
+        """
+        The raw view limits are watched, so that validating the context does not autoscale the axes.
+        If autoscaling changes the view limits later on, the node is still invalidated.
+        """
+        bbs = [ self.figure.bbox ]
+        for axes in axes_list:
+            bbs.extend([ axes.bbox, self._get_view_limits(axes) ])
+
+        self._watcher = TransformNode()
+        self._watcher.set_children(*bbs, *( axes.transScale for axes in axes_list ))
+        for bb in bbs:
+            bb.get_points()
+        self._watcher._invalid = 0
@@ -7,15 +7,37 @@ That way, readers can understand how to interpret the visualization before seein
    :class: example
 
 Apart from drawing the annotations, the legend aligns and organizes them on different lines.
+
+Every time that a legend annotation is added, the :class:`~drawable.Drawable` is re-drawn to make room for the legend.
+When adding many legend annotations, you can re-draw the :class:`~drawable.Drawable` only once by adding them in a batch:
+
+.. code-block:: python
+
+    with viz.legend.batch():
+        for label in labels:
+            viz.legend.draw_text_only(label)
+
+When there are many labels, you can limit the number of lines in the legend.
+The legend annotations that do not fit are hidden, and the legend shows how many there are instead.
+In a batch, the most frequent labels are drawn first, unless you give the legend annotations a priority:
+
+.. code-block:: python
+
+    viz.legend.max_lines = 2
+    with viz.legend.batch():
+        for label in labels:
+            viz.legend.draw_text_only(label, priority=len(label))
 """
 
+from contextlib import contextmanager
 import os
 import sys
 
 from matplotlib import collections, lines, text, rcParams
-from matplotlib.transforms import Bbox
+from matplotlib.transforms import Affine2D, Bbox
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from metrics import IdentityKey, LRUCache
 from text.annotation import Annotation
 import text_util, util
 
@@ -27,34 +49,73 @@ class Legend(object):
     All of the drawn legend annotations go through the :func:`~legend.Legend.draw` decorator.
     This function first draws the visual part of the annotation.
     Then, it draws the label next to it.
-    This function is also responsible to lay out the legend annotations, creating new lines when necessary.
+    This function is also responsible to assign the legend annotations to lines, creating new lines when necessary.
+    Finally, it lays out the legend and re-draws the :class:`~drawable.Drawable`, unless the legend annotation is added in a :func:`~legend.Legend.batch`.
+
+    All of the legend's components are drawn through one shared translation, the ``offset``.
+    Each legend annotation is measured once, when it is drawn, and it is moved at most once, to the start of a new line beneath the other lines.
+    When the legend is laid out, the offset moves the whole legend up to make room for the new lines, so the older lines are not moved one by one.
+    Moving the offset still invalidates the cached bounding box of each legend annotation, but this only means incrementing a counter for each one.
 
     :ivar drawable: The :class:`~drawable.Drawable` where the legend will be drawn.
     :vartype drawable: :class:`~drawable.Drawable`
+    :ivar offset: The translation applied to all of the legend's components, in terms of the axes.
+    :vartype offset: :class:`matplotlib.transforms.Affine2D`
+    :ivar transform: The transformation of the legend's components: the ``offset``, followed by the axes transformation.
+    :vartype transform: :class:`matplotlib.transforms.Transform`
     :ivar lines: The legend components, separated into lines.
                  Each component is a tuple of the visual representation and the associated label.
     :vartype lines: list of list of tuple
+    :ivar entries: The legend components, indexed by the text of their labels.
+                   Each component is a tuple of the visual representation and the associated label, as in the lines.
+    :vartype entries: dict
+    :ivar max_lines: The maximum number of lines in the legend, or `None` if the legend has no limit.
+                     When the legend is full, new legend annotations are hidden, and a last legend annotation counts them, such as `+3 more`.
+                     The counting legend annotation may need one more line.
+    :vartype max_lines: None or int
+    :ivar hidden: The labels of the hidden legend annotations, and the number of times that each one was added.
+    :vartype hidden: dict
+    :ivar virtual_bbs: The cache of the legend's virtual bounding boxes.
+                       The cached bounding boxes remain valid until the legend changes, or until the figure's layout changes.
+                       Its :func:`~metrics.LRUCache.info` function returns the cache's hit and miss statistics.
+    :vartype virtual_bbs: :class:`~metrics.LRUCache`
     """
 
-    def __init__(self, drawable):
+    _params = None
+
+    def __init__(self, drawable, max_lines=None):
         """
         Create the legend.
 
         :param drawable: The :class:`~drawable.Drawable` where the legend will be drawn.
         :type drawable: :class:`~drawable.Drawable`
+        :param max_lines: The maximum number of lines in the legend.
+                          If `None` is given, the legend has no limit.
+        :type max_lines: None or int
         """
 
         self.lines = [ [ ] ]
+        self.entries = { }
         self.drawable = drawable
+        self.offset = Affine2D()
+        self.transform = self.offset + drawable.axes.transAxes
+        self.virtual_bbs = LRUCache(maxsize=8)
+        self._version = 0
+        self.max_lines = max_lines
+        self.hidden = { }
+        self._batch, self._pending = 0, False
+        self._new_lines, self._bottom = [ ], None
+        self._queue, self._more = { }, None
 
     def draw(f):
         """
         This function is the most important one in the :class:`~legend.Legend` class.
-        This decorator wraps all of the legend annotations and draws them in three steps:
+        This decorator wraps all of the legend annotations and draws them in four steps:
 
         1. First, it draws the visual part of the legend annotation.
         2. Second, it draws the textual label next to the visual part.
         3. Third, it adds a new line to the legend if need be.
+        4. Fourth, it lays out the legend, unless the legend annotation is added in a batch.
 
         :param f: The function to wrap.
         :type f: function
@@ -63,7 +124,7 @@ class Legend(object):
         :rtype: function
         """
 
-        def wrapper(self, label, label_style=None, *args, **kwargs):
+        def wrapper(self, label, label_style=None, *args, priority=0, **kwargs):
             """
             Call the test function with any arguments and keyword arguments.
 
@@ -72,14 +133,16 @@ class Legend(object):
             :param label_style: The style of the label.
                                 If `None` is given, a default style is used.
             :type label_style: None or dict
+            :param priority: The priority of the legend annotation when the legend has a limited number of lines.
+                             In a batch, legend annotations with a higher priority are drawn first.
+            :type priority: int
 
             :return: A tuple containing the drawn visual and the annotation.
-            :rtype: tuple
+                     If the legend annotation is hidden because the legend is full, `None` is returned.
+                     `None` is also returned if the legend has a limited number of lines and the legend annotation is added in a batch.
+            :rtype: tuple or None
             """
 
-            figure = self.drawable.figure
-            axes = self.drawable.axes
-
             """
             If the label is already in the legend, return it.
             """
@@ -87,60 +150,187 @@ class Legend(object):
             if drawn:
                 return drawn
 
-            """
-            Load the default legend style and update the styling.
-            If a custom style is given, it overwrites the styling.
-            """
-            label_style = label_style or { }
-            default_style = self._get_legend_params('fontsize')
-            default_style.update(label_style)
-            default_style['alpha'] = default_style.get('alpha', 0.8)
-
-            """
-            Get the x and y offsets for the new legend.
-            Then, draw the line first and the annotation second.
-            """
-            offset = self._get_offset(transform=axes.transAxes)
-            linespacing = text_util.get_linespacing(figure, axes, transform=axes.transAxes, **default_style)
-            y = 1
-            if axes.xaxis.get_label_position() == 'top':
-                y += self.drawable._get_xlabel(transform=axes.transAxes).height * 2
-
-                xtick_labels_bb = self.drawable._get_xtick_labels(transform=axes.transAxes)
-                if xtick_labels_bb:
-                    y += max(xtick_labels_bb, key=lambda bb: bb.height).height * 2
-
-            visual = f(self, *args, offset=offset, y=y, linespacing=linespacing, **kwargs)
+            if self.max_lines is None:
+                drawn = self._add(f, label, label_style, args, kwargs)
+            else:
+                """
+                If the legend has a limited number of lines, the legend annotation may be hidden.
+                Labels that have already been hidden are only counted.
+                """
+                key = label if isinstance(label, str) else str(label)
+                if key in self.hidden:
+                    self.hidden[key] += 1
+                    return None
 
-            """
-            Calculate the offset of the annotation.
-            """
-            if visual:
-                offset = util.get_bb(figure, axes, visual, transform=axes.transAxes).x1 + 0.00625
-            annotation = self.draw_annotation(label, offset, y, **default_style)
+                """
+                In a batch, the legend annotations are only drawn when the batch ends, in order of priority and frequency.
+                Outside of a batch, they are drawn until the legend is full.
+                """
+                if self._batch:
+                    entry = self._queue.setdefault(key, { 'order': len(self._queue), 'frequency': 0, 'priority': priority,
+                                                          'draw': (f, label, label_style, args, kwargs) })
+                    entry['frequency'] += 1
+                    entry['priority'] = max(entry['priority'], priority)
+                    self._pending = True
+                    return None
+
+                self._remove_more()
+                drawn = self._add(f, label, label_style, args, kwargs)
+                if not drawn:
+                    self.hidden[key] = 1
+                self._update_more()
 
             """
-            If need be, create a new line for the legend.
+            Lay out the legend and re-draw the drawable to make room for the legend.
+            In a batch, the legend is laid out and the drawable is re-drawn only once, at the end of the batch.
             """
-            if annotation.get_virtual_bb(transform=axes.transAxes).x1 > 1:
-                self._newline(visual, annotation, linespacing)
+            self.drawable.invalidate('legend')
+            if self._batch:
+                self._pending = True
             else:
-                self.lines[-1].append((visual, annotation))
+                self._layout()
+                self.drawable.redraw()
 
-            self.drawable.redraw()
-            return (visual, annotation)
+            return drawn
 
         wrapper.__doc__ = f.__doc__
         return wrapper
 
-    def redraw(self):
+    def _add(self, f, label, label_style, args, kwargs, limit=True):
+        """
+        Draw a new legend annotation and assign it to a line.
+        This function does not lay out the legend.
+
+        :param f: The function that draws the visual part of the legend annotation.
+        :type f: function
+        :param label: The text of the legend label.
+        :type label: str
+        :param label_style: The style of the label.
+                            If `None` is given, a default style is used.
+        :type label_style: None or dict
+        :param args: The arguments to pass on to the drawing function.
+        :type args: tuple
+        :param kwargs: The keyword arguments to pass on to the drawing function.
+        :type kwargs: dict
+        :param limit: A boolean indicating whether the legend annotation is subject to the limited number of lines.
+                      If it is, and the legend annotation would create a new line when the legend is full, it is not drawn.
+        :type limit: bool
+
+        :return: A tuple containing the drawn visual and the annotation, or `None` if the legend is full.
+        :rtype: tuple or None
+        """
+
+        figure = self.drawable.figure
+        axes = self.drawable.axes
+
+        """
+        Once the legend is full, no more legend annotations are drawn.
+        """
+        if limit and self.hidden:
+            return None
+
+        """
+        Load the default legend style and update the styling.
+        If a custom style is given, it overwrites the styling.
+        """
+        label_style = label_style or { }
+        default_style = self._get_legend_params('fontsize')
+        default_style.update(label_style)
+        default_style['alpha'] = default_style.get('alpha', 0.8)
+
+        """
+        Get the x and y offsets for the new legend.
+        The legend annotation is drawn on the last line, in terms of the legend's transformation.
+        Then, draw the line first and the annotation second.
+        """
+        offset = self._get_offset(transform=axes.transAxes)
+        linespacing = text_util.get_linespacing(figure, axes, transform=axes.transAxes, context=self.drawable.context, **default_style)
+        if self._bottom is None:
+            self._bottom = self._get_y(transform=axes.transAxes)
+        y = self._bottom
+        visual = f(self, *args, offset=offset, y=y, linespacing=linespacing, **kwargs)
+
+        """
+        Calculate the offset of the annotation.
+        """
+        if visual:
+            offset = util.get_bb(figure, axes, visual, transform=axes.transAxes, context=self.drawable.context).x1 + 0.00625
+        annotation = self.draw_annotation(label, offset, y, **default_style)
+
+        """
+        If need be, create a new line for the legend.
+        The first legend annotation in a line never needs a new line.
+        If the legend is full, remove the legend annotation instead.
+        """
+        if annotation.get_virtual_bb(transform=axes.transAxes).x1 > 1 and self.lines[-1]:
+            if limit and self.max_lines is not None and len(self.lines) >= self.max_lines:
+                if visual:
+                    visual.remove()
+                annotation.remove()
+                return None
+
+            self._newline(visual, annotation, linespacing)
+        else:
+            self.lines[-1].append((visual, annotation))
+
+        """
+        The legend annotation that counts hidden legend annotations is not a real entry.
+        """
+        if limit:
+            self.entries[str(annotation)] = (visual, annotation)
+        self._invalidate()
+
+        return (visual, annotation)
+
+    @contextmanager
+    def batch(self):
+        """
+        Add many legend annotations while laying out the legend and re-drawing the :class:`~drawable.Drawable` only once.
+        Normally, the legend is laid out and the :class:`~drawable.Drawable` is re-drawn after adding each legend annotation.
+        In a batch, this happens once when the batch ends, and only if any legend annotations were added.
+        Until then, the new lines of the legend hang below the axes' top.
+        Labels that are already in the legend are still not drawn again.
+
+        If the legend has a limited number of lines, the legend annotations are only drawn when the batch ends.
+        They are drawn in order of priority, and then in order of frequency: how many times the label was added in the batch.
+        Legend annotations that do not fit are hidden.
+
+        Batches may be nested, in which case the :class:`~drawable.Drawable` is re-drawn when the outermost batch ends.
+
+        .. code-block:: python
+
+            with viz.legend.batch():
+                viz.legend.draw_line('A')
+                viz.legend.draw_line('B')
+
+        :return: The legend itself.
+        :rtype: :class:`~legend.Legend`
+        """
+
+        self._batch += 1
+        try:
+            yield self
+        finally:
+            self._batch -= 1
+            if not self._batch and self._pending:
+                self._pending = False
+                self._flush()
+                self._layout()
+                self.drawable.invalidate('legend')
+                self.drawable.redraw()
+
+    def redraw(self, y=None):
         """
         Redraw the legend.
         This function only has an effect when the x-axis label and ticks are at the top, instead of at the bottom.
         In this case, this function moves the legend up to make room for the label and ticks.
+
+        :param y: The y-coordinate, in axes coordinates, above which the legend should be.
+                  If `None` is given, it is calculated based on the x-axis label and ticks.
+        :type y: None or float
         """
 
-        figure, axes = self.drawable.figure, self.drawable.axes
+        axes = self.drawable.axes
 
         """
         If the legend is empty, do nothing.
@@ -148,45 +338,19 @@ class Legend(object):
         if not(self.lines[-1]):
             return
 
-        """
-        Get the position at which the legend should be.
-        """
-        y = 1
-        if axes.xaxis.get_label_position() == 'top':
-            y += self.drawable._get_xlabel(transform=axes.transAxes).height * 2
-
-            xtick_labels_bb = self.drawable._get_xtick_labels(transform=axes.transAxes)
-            if xtick_labels_bb:
-                y += max(xtick_labels_bb, key=lambda bb: bb.height).height * 2
+        self.drawable.context.validate()
 
         """
-        Get the position of the last line.
+        Get the position at which the legend should be, and the position of the last line.
         """
+        y = self._get_y(transform=axes.transAxes) if y is None else y
         bottom = self.get_virtual_bb(transform=axes.transAxes).y0
 
         """
-        If the legend is below the x-axis label and tick labels, move all lines up by that amount.
+        If the legend is below the x-axis label and tick labels, move the whole legend up by that amount.
         """
         if bottom < y:
-            offset = y - bottom
-            for line in self.lines:
-                for (visual, annotation) in line:
-                    """
-                    Move the visual first, then the text.
-                    """
-                    if visual:
-                        bb = util.get_bb(figure, axes, visual, transform=axes.transAxes)
-                        if type(visual) == lines.Line2D:
-                            visual.set_ydata([ bb.y0 + offset ] * 2)
-                        elif type(visual) == text.Annotation:
-                            visual.xyann = (bb.x0, bb.y1 + offset)
-                            visual.xy = (bb.x1, bb.y1 + offset)
-                        elif type(visual) == collections.PathCollection:
-                            offsets = visual.get_offsets()[0]
-                            visual.set_offsets([[ offsets[0], offsets[1] + offset ]])
-
-                    bb = annotation.get_virtual_bb(transform=axes.transAxes)
-                    annotation.set_position((bb.x0, bb.y0 + offset), transform=axes.transAxes)
+            self._translate(y - bottom)
 
     def draw_annotation(self, label, x, y, va='bottom', *args, **kwargs):
         """
@@ -215,7 +379,7 @@ class Legend(object):
         figure = self.drawable.figure
         axes = self.drawable.axes
 
-        annotation = Annotation(self.drawable, label, (x, 1), y, va=va, transform=axes.transAxes, **kwargs)
+        annotation = Annotation(self.drawable, label, (x, 1), y, va=va, transform=self.transform, **kwargs)
         annotation.draw()
         return annotation
 
@@ -257,7 +421,7 @@ class Legend(object):
 
         arrow = text.Annotation('', xy=(offset + 0.025, y + linespacing / 2.),
                                 xytext=(offset, y + linespacing / 2.),
-                                xycoords=axes.transAxes, textcoords=axes.transAxes, arrowprops=kwargs)
+                                xycoords=self.transform, textcoords=self.transform, arrowprops=kwargs)
         arrow.set_clip_on(False)
         axes.add_artist(arrow)
 
@@ -292,7 +456,7 @@ class Legend(object):
         style = dict(kwargs)
         style['markersize'] = 5 if 'markersize' in style else 0
         style['markeredgewidth'] = 1 if 'markeredgewidth' in style else 0
-        line = lines.Line2D(x, y, transform=axes.transAxes, *args, **style)
+        line = lines.Line2D(x, y, transform=self.transform, *args, **style)
         line.set_clip_on(False)
         axes.add_line(line)
 
@@ -324,11 +488,12 @@ class Legend(object):
         Update the offset by by calculating the x-radius of the point.
         """
         kwargs['s'] = 100
-        origin = self.drawable.axes.transAxes.inverted().transform((0, 0))
-        x = (self.drawable.axes.transAxes.inverted().transform((kwargs['s'] ** 0.5, 0))[0] - origin[0]) / 2.
+        context = self.drawable.context
+        origin = context.inverted_origin(axes.transAxes)
+        x = (context.inverted(axes.transAxes).transform((kwargs['s'] ** 0.5, 0))[0] - origin[0]) / 2.
         offset += x
 
-        point = axes.scatter(offset, y + linespacing / 2., transform=axes.transAxes, *args, **kwargs)
+        point = axes.scatter(offset, y + linespacing / 2., transform=self.transform, *args, **kwargs)
         point.set_clip_on(False)
 
         return point
@@ -338,6 +503,7 @@ class Legend(object):
         Get the bounding box of the entire annotation.
         This is called a virtual bounding box because it is not a real bounding box.
         Rather, it is the smallest rectangular bounding box that covers all of the bounding boxes of the legend.
+        The bounding box is cached for each transformation until the legend changes, or until the axes limits or the figure size change.
 
         :param transform: The bounding box transformation.
                           If `None` is given, the data transformation is used.
@@ -369,14 +535,28 @@ class Legend(object):
             if not len(top) or not len(bottom):
                 return Bbox(((0, 1), (1, 1)))
 
-            y1 = max( annotation.get_virtual_bb(transform=transform).y1 for _, annotation in top )
-            y0 = min( annotation.get_virtual_bb(transform=transform).y0 for _, annotation in bottom )
+            """
+            The cache key includes the layout context's generation and the legend's version.
+            Like the annotations, the legend validates the context first, unless it is frozen, so the bounding box follows any change to the figure.
+            """
+            context = self.drawable.context
+            context.validate()
+            key = (IdentityKey(transform), context.generation, self._version)
+            cached = self.virtual_bbs.get(key)
+            if cached is None:
+                y1 = max( annotation.get_virtual_bb(transform=transform).y1 for _, annotation in top )
+                y0 = min( annotation.get_virtual_bb(transform=transform).y0 for _, annotation in bottom )
+                cached = (y0, y1)
+                self.virtual_bbs.put(key, cached)
+
+            y0, y1 = cached
             return Bbox(((0, y0), (1, y1)))
 
     def _contains(self, label):
         """
         Check whether the legend already contains a legend for the given label.
         If it exists, the visual and the annotation are returned as a tuple.
+        The label is looked up in the legend's entries, indexed by the text of the drawn labels, so there is no need to go through every line.
 
         :param label: The label to look for.
         :type label: str
@@ -386,10 +566,11 @@ class Legend(object):
         :rtype: tuple or None
         """
 
-        for line in self.lines:
-            for visual, annotation in line:
-                if str(annotation) == label:
-                    return (visual, annotation)
+        """
+        Only textual labels can be in the legend's entries.
+        """
+        if isinstance(label, str):
+            return self.entries.get(label)
 
     def _get_offset(self, pad=0.025, transform=None):
         """
@@ -414,9 +595,73 @@ class Legend(object):
 
         return 0
 
-    def _newline(self, visual, annotation, linespacing, va='bottom'):
+    def _flush(self):
+        """
+        Draw the legend annotations that were added in a batch when the legend has a limited number of lines.
+        The legend annotations are drawn in order of priority, then in order of frequency, and then in the order in which they were added.
+        Any legend annotations that do not fit are hidden.
+        """
+
+        if not self._queue:
+            return
+
+        self.drawable.context.validate()
+
+        queue = sorted(self._queue.items(), key=lambda item: (-item[1]['priority'], -item[1]['frequency'], item[1]['order']))
+        self._queue = { }
+
+        self._remove_more()
+        for key, entry in queue:
+            f, label, label_style, args, kwargs = entry['draw']
+            if not self._add(f, label, label_style, args, kwargs):
+                self.hidden[key] = entry['frequency']
+        self._update_more()
+
+    def _update_more(self):
+        """
+        Draw the legend annotation that counts the hidden legend annotations, such as `+3 more`.
+        The legend annotation is added at the end of the legend, even if the legend is full.
+        """
+
+        if self.hidden:
+            lines = len(self.lines)
+            _, annotation = self._add(lambda *args, **kwargs: None, f"+{ len(self.hidden) } more", None, ( ), { }, limit=False)
+            self._more = (annotation, self._new_lines[-1] if len(self.lines) > lines else None)
+
+    def _remove_more(self):
+        """
+        Remove the legend annotation that counts the hidden legend annotations.
+        The legend annotation is always the last one in the legend.
+        If it is alone on its line, the line is removed as well.
+        """
+
+        if not self._more:
+            return
+
+        annotation, linespacing = self._more
+        self.lines[-1].pop()
+        annotation.remove()
+        self._more = None
+
+        """
+        If the legend annotation had its own line, remove the line.
+        If the legend has already been laid out, the legend was moved up to make room for the line, so move it back down.
+        """
+        if linespacing is not None:
+            self.lines.pop()
+            self._bottom += linespacing
+            if self._new_lines:
+                self._new_lines.pop()
+            else:
+                self._translate(- linespacing)
+
+        self._invalidate()
+
+    def _newline(self, visual, annotation, linespacing):
         """
         Create a new line with the given legend.
+        The visual and the annotation move to the start of the new line, beneath the other lines.
+        The legend is only moved up to make room for the new line when the legend is laid out.
 
         :param visual: The visual of the legend.
         :type visual: object
@@ -424,70 +669,116 @@ class Legend(object):
         :type annotation: :class:`~text.annotation.Annotation`
         :param linespacing: The space between lines.
         :type linespacing: float
-        :param va: The vertical alignment, can be one of `top`, `center` or `bottom`.
-                   If the vertical alignment is `top`, the given y-coordinate becomes the highest point of the annotation.
-                   If the vertical alignment is `center`, the given y-coordinate becomes the center point of the annotation.
-                   If the vertical alignment is `bottom`, the given y-coordinate becomes the lowest point of the annotation.
-        :type va: str
         """
 
         figure = self.drawable.figure
         axes = self.drawable.axes
 
         """
-        Go through each line and move all of its components one line up.
+        The legend annotation starts where the visual starts, or where the annotation starts if there is no visual.
+        Lines and arrows start at their first coordinate, but the size of other visuals has to be measured.
         """
-        for line in self.lines:
-            for push_visual, push_annotation in line:
-                """
-                The lines that have been drawn can be pushed up by the height of the line.
-                """
-                if push_visual:
-                    bb = util.get_bb(figure, axes, push_visual, transform=axes.transAxes)
-                    if type(push_visual) == lines.Line2D:
-                        push_visual.set_ydata([ bb.y0 + linespacing ] * 2)
-                    elif type(push_visual) == text.Annotation:
-                        push_visual.xyann = (bb.x0, bb.y1 + linespacing / 2.)
-                        push_visual.xy = (bb.x1, bb.y1 + linespacing / 2.)
-                    elif type(push_visual) == collections.PathCollection:
-                        offsets = push_visual.get_offsets()[0]
-                        push_visual.set_offsets([[ offsets[0], offsets[1] + linespacing ]])
+        if type(visual) == lines.Line2D:
+            x = min(visual.get_xdata())
+        elif type(visual) == text.Annotation:
+            x = min(visual.xyann[0], visual.xy[0])
+        elif visual:
+            x = util.get_bb(figure, axes, visual, transform=axes.transAxes, context=self.drawable.context).x0
+        else:
+            x = annotation.get_virtual_bb(transform=axes.transAxes).x0
 
-                """
-                The annotations are moved differently depending on the vertical alignment.
-                If the vertical alignment is `top`, the annotation is moved from the top.
-                If the vertical alignment is `center`, the annotation is moved from the center.
-                If the vertical alignment is `bottom`, the annotation is moved from the bottom.
-                """
-                bb = push_annotation.get_virtual_bb(transform=axes.transAxes)
-                if va == 'top':
-                    y = bb.y1
-                elif va == 'center':
-                    y = (bb.y0 + bb.y1) / 2.
-                elif va == 'bottom':
-                    y = bb.y0
+        self._move(visual, annotation, -x, - linespacing)
+        self.lines.append( [ (visual, annotation) ] )
+        self._bottom -= linespacing
+        self._new_lines.append(linespacing)
+        self._invalidate()
+
+    def _layout(self):
+        """
+        Lay out the legend's lines.
+        The lines created since the last time that the legend was laid out are beneath the other lines.
+        This function moves the whole legend up by the total space of the new lines at once, so the last line ends up where the legend starts.
+        """
+
+        if not self._new_lines:
+            return
+
+        self.drawable.context.validate()
+        self._translate(sum(self._new_lines))
+        self._new_lines = [ ]
+
+    def _translate(self, dy):
+        """
+        Move the whole legend vertically by updating the shared ``offset``.
+        The legend annotations are not moved one by one, but their cached bounding boxes are invalidated.
+
+        :param dy: The amount by which to move the legend, in axes coordinates.
+        :type dy: float
+        """
 
-                push_annotation.set_position((bb.x0, y + linespacing), va=va, transform=axes.transAxes)
+        self.offset.translate(0, dy)
+        self.drawable.context.forget(self.transform)
+        for line in self.lines:
+            for _, annotation in line:
+                annotation._invalidate()
+
+        self._invalidate()
 
+    def _move(self, visual, annotation, dx, dy):
         """
-        Move the visual and the annotation to the start of the line.
-        Finally, create a new line container.
+        Move a legend annotation, made up of its visual and its annotation, by the given amount.
+        The amount is expressed in axes coordinates, which the legend's shared translation does not scale.
+
+        :param visual: The visual of the legend.
+        :type visual: object
+        :param annotation: The drawn annotation.
+        :type annotation: :class:`~text.annotation.Annotation`
+        :param dx: The amount by which to move the legend annotation horizontally.
+        :type dx: float
+        :param dy: The amount by which to move the legend annotation vertically.
+        :type dy: float
         """
+
+        axes = self.drawable.axes
+
         if visual:
-            bb = util.get_bb(figure, axes, visual, transform=axes.transAxes)
             if type(visual) == lines.Line2D:
-                visual.set_xdata([ 0, 0.025 ])
+                visual.set_xdata([ x + dx for x in visual.get_xdata() ])
+                visual.set_ydata([ y + dy for y in visual.get_ydata() ])
             elif type(visual) == text.Annotation:
-                visual.xyann = (0, bb.y0 + linespacing / 2.)
-                visual.xy = (0.025, bb.y0 + linespacing / 2.)
-            elif type(push_visual) == collections.PathCollection:
-                origin = self.drawable.axes.transData.inverted().transform((0, 0))
-                x = (self.drawable.axes.transData.inverted().transform((100 ** 0.5, 0))[0] - origin[0]) / 4.
-                visual.set_offsets([[ x, 1 + linespacing / 2. ]])
-
-        annotationbb = annotation.get_virtual_bb(transform=axes.transAxes)
-        annotation.set_position((bb.width + 0.00625, 1), va=va, transform=axes.transAxes)
-        self.lines.append( [ (visual, annotation) ] )
+                visual.xyann = (visual.xyann[0] + dx, visual.xyann[1] + dy)
+                visual.xy = (visual.xy[0] + dx, visual.xy[1] + dy)
+            elif type(visual) == collections.PathCollection:
+                visual.set_offsets([ [ x + dx, y + dy ] for x, y in visual.get_offsets() ])
+
+        """
+        The annotation's tokens are drawn in terms of the legend's transformation, so the annotation is moved by translating its own offset.
+        """
+        annotation.offset.translate(dx, dy)
+        annotation._invalidate()
+
+    def _get_y(self, transform):
+        """
+        Get the y-coordinate of the legend's last line.
+        Normally, the legend starts at the top of the axes.
+        When the x-axis label and ticks are at the top, the legend starts above them.
+
+        :param transform: The coordinate transformation.
+        :type transform: :class:`matplotlib.transforms.TransformNode`
+
+        :return: The y-coordinate of the legend's last line.
+        :rtype: float
+        """
+
+        return 1 + self.drawable._get_top_labels_height(transform=transform)
+
+    def _invalidate(self):
+        """
+        Invalidate the cached virtual bounding boxes.
+        This function should be called whenever the legend's components change or move.
+        """
+
+        self._version += 1
 
     def _get_legend_params(self, *args):
         """
@@ -498,9 +789,12 @@ class Legend(object):
         :rtpe: dict
         """
 
-        params = { param: rcParams[param] for param in rcParams if param.startswith('legend') }
-        params = { param[ param.index('.') + 1: ]: params[param] for param in params }
-        if args:
-            params = { param: params[param] for param in params if param in args }
+        """
+        The names of the legend parameters never change, so they are only collected once.
+        The values are read every time because they can change.
+        """
+        if Legend._params is None:
+            Legend._params = [ param[ param.index('.') + 1: ] for param in rcParams if param.startswith('legend') ]
 
-        return params
+        return { param: rcParams[f"legend.{ param }"] for param in Legend._params
+                 if not args or param in args }
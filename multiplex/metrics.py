@@ -0,0 +1,569 @@
+"""
+The metrics module measures text.
+Measuring text is one of the most common operations in Multiplex: every token of every annotation, label and legend is measured to lay it out.
+Asking the renderer to measure the same word in the same font over and over again is wasteful.
+Therefore this module memoizes text measurements so that identical tokens are measured only once.
+
+The measurements are stored relative to the text's anchor, in display coordinates.
+This means that the same measurement can be re-used regardless of where the text is drawn.
+
+The module can also measure text without creating any text at all.
+The :class:`~FontMeasurer` reads the dimensions of a string directly from the font file, the same way that matplotlib's renderer does.
+This means that layouts can be calculated before any text is added to the axes.
+"""
+
+from collections import OrderedDict
+import os
+import weakref
+
+from matplotlib import cbook, rcParams
+from matplotlib.backends.backend_agg import get_hinting_flag
+from matplotlib.font_manager import FontProperties, findfont, get_font
+from matplotlib.textpath import TextToPath
+from matplotlib.transforms import Bbox
+
+class LRUCache(object):
+    """
+    The :class:`~LRUCache` is a bounded dictionary that evicts the least-recently used entries first.
+    The cache keeps track of how many lookups it could answer (hits) and how many it could not (misses).
+
+    :ivar maxsize: The maximum number of entries that the cache stores.
+    :vartype maxsize: int
+    :ivar hits: The number of lookups that found an entry in the cache.
+    :vartype hits: int
+    :ivar misses: The number of lookups that did not find an entry in the cache.
+    :vartype misses: int
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        Create an empty cache.
+
+        :param maxsize: The maximum number of entries that the cache stores.
+        :type maxsize: int
+
+        :raises ValueError: When the maximum size is not positive.
+        """
+
+        if maxsize < 1:
+            raise ValueError(f"The maximum size of the cache must be positive, received { maxsize }")
+
+        self.maxsize = maxsize
+        self.hits, self.misses = 0, 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Get the value stored under the given key.
+        If the key is found, it becomes the most-recently used entry.
+
+        :param key: The key to look up.
+        :type key: object
+        :param default: The value to return if the key is not in the cache.
+        :type default: object
+
+        :return: The cached value, or the default value if the key is not in the cache.
+        :rtype: object
+        """
+
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """
+        Store the given value under the given key.
+        If the cache is full, the least-recently used entry is evicted.
+
+        :param key: The key of the entry.
+        :type key: object
+        :param value: The value to store.
+        :type value: object
+        """
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def remove(self, key):
+        """
+        Remove the entry stored under the given key.
+        If the key is not in the cache, nothing happens.
+
+        :param key: The key of the entry.
+        :type key: object
+        """
+
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all entries from the cache and reset the hit and miss counters.
+        """
+
+        self._entries.clear()
+        self.hits, self.misses = 0, 0
+
+    def info(self):
+        """
+        Get the cache statistics.
+
+        :return: A dictionary with the number of hits, misses, the current size and the maximum size of the cache.
+        :rtype: dict
+        """
+
+        return { 'hits': self.hits, 'misses': self.misses,
+                 'size': len(self._entries), 'maxsize': self.maxsize }
+
+    def __contains__(self, key):
+        """
+        Check whether the given key is in the cache.
+        This check does not update the hit and miss counters.
+
+        :param key: The key to look for.
+        :type key: object
+
+        :return: A boolean indicating whether the key is in the cache.
+        :rtype: bool
+        """
+
+        return key in self._entries
+
+    def __len__(self):
+        """
+        Get the number of entries in the cache.
+
+        :return: The number of entries in the cache.
+        :rtype: int
+        """
+
+        return len(self._entries)
+
+class IdentityKey(object):
+    """
+    The :class:`~IdentityKey` lets objects that cannot be hashed, such as matplotlib's transformations, be used in cache keys.
+    Two keys are equal only if they refer to the very same object, not to objects that are equal in value.
+
+    The key only keeps a weak reference to the object.
+    Once the object is garbage-collected, the key is no longer equal to any other key.
+    Therefore a new object that happens to re-use the identity of an old one never finds the old object's entries.
+    """
+
+    __slots__ = ('_ref', '_hash')
+
+    def __init__(self, obj):
+        """
+        Create the key of the given object.
+
+        :param obj: The object that the key refers to.
+                    The object must support weak references.
+        :type obj: object
+        """
+
+        self._ref = weakref.ref(obj)
+        self._hash = id(obj)
+
+    def __eq__(self, other):
+        """
+        Check whether the two keys refer to the same object, which must still exist.
+
+        :param other: The other key.
+        :type other: object
+
+        :return: A boolean indicating whether the two keys refer to the same object.
+        :rtype: bool
+        """
+
+        if not isinstance(other, IdentityKey):
+            return NotImplemented
+
+        obj = self._ref()
+        return obj is not None and obj is other._ref()
+
+    def __hash__(self):
+        """
+        Get the hash of the key, which is the identity of the object.
+
+        :return: The hash of the key.
+        :rtype: int
+        """
+
+        return self._hash
+
+class TextMetrics(object):
+    """
+    The :class:`~TextMetrics` class memoizes the extents of `matplotlib.text.Text <https://matplotlib.org/3.2.2/api/text_api.html#matplotlib.text.Text>`_ artists.
+
+    Each extent is stored relative to the text's anchor—its position in display coordinates.
+    The key is made up of everything that changes the shape of the text, but not its position:
+
+        - The text itself,
+        - The resolved font properties,
+        - The rotation and alignment,
+        - The padding of the text's bounding box, and
+        - The figure's DPI.
+
+    Texts that the cache cannot describe fully, such as multi-line or wrapped text, are always measured by the renderer.
+
+    :ivar cache: The cache of extents.
+    :vartype cache: :class:`~LRUCache`
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        Create the text metrics with an empty cache.
+
+        :param maxsize: The maximum number of extents that the cache stores.
+        :type maxsize: int
+        """
+
+        self.cache = LRUCache(maxsize)
+
+    def get_extent(self, figure, component, renderer=None):
+        """
+        Get the extent of the given text component in display coordinates.
+        This function is equivalent to the text's ``get_window_extent`` function, but it only asks the renderer the first time that it sees a text.
+
+        :param figure: The figure that the component occupies.
+                       This is used to get the figure renderer.
+        :type figure: :class:`matplotlib.figure.Figure`
+        :param component: The text whose extent will be fetched.
+        :type component: :class:`matplotlib.text.Text`
+        :param renderer: The renderer to use when the extent is not cached.
+                         If `None` is given, the figure's renderer is used.
+        :type renderer: None or :class:`matplotlib.backend_bases.RendererBase`
+
+        :return: The extent of the text in display coordinates.
+        :rtype: :class:`matplotlib.transforms.Bbox`
+        """
+
+        key = self._get_key(figure, component)
+        if key is None:
+            renderer = renderer or figure.canvas.get_renderer()
+            return component.get_window_extent(renderer)
+
+        x, y = component.get_transform().transform(component.get_unitless_position())
+        offsets = self.cache.get(key)
+        if offsets is None:
+            renderer = renderer or figure.canvas.get_renderer()
+            bb = component.get_window_extent(renderer)
+            self.cache.put(key, (bb.x0 - x, bb.y0 - y, bb.x1 - x, bb.y1 - y))
+            return bb
+
+        return Bbox(((x + offsets[0], y + offsets[1]), (x + offsets[2], y + offsets[3])))
+
+    def clear(self):
+        """
+        Remove all cached extents.
+        """
+
+        self.cache.clear()
+
+    def info(self):
+        """
+        Get the cache statistics.
+
+        :return: A dictionary with the number of hits, misses, the current size and the maximum size of the cache.
+        :rtype: dict
+        """
+
+        return self.cache.info()
+
+    def _get_key(self, figure, component):
+        """
+        Get the key that describes the shape of the given text component.
+
+        :param figure: The figure that the component occupies.
+        :type figure: :class:`matplotlib.figure.Figure`
+        :param component: The text whose key will be created.
+        :type component: :class:`matplotlib.text.Text`
+
+        :return: The key that describes the text, or `None` if the text cannot be cached.
+        :rtype: tuple or None
+        """
+
+        """
+        Invisible, wrapped and multi-line text are not cached.
+        The extent of invisible text is not relative to its position.
+        The extent of wrapped text depends on where it is drawn.
+        The extent of multi-line text depends on the line spacing.
+        """
+        content = component.get_text()
+        if (not component.get_visible() or component.get_wrap() or '\n' in content or
+            getattr(component, '_transform_rotates_text', False)):
+            return None
+
+        patch = component.get_bbox_patch()
+        pad = patch.get_boxstyle().pad if patch else None
+        return (content, hash(component.get_fontproperties()),
+                component.get_rotation(), component.get_rotation_mode(),
+                component.get_horizontalalignment(), component.get_verticalalignment(),
+                component.get_usetex(), pad,
+                figure.dpi, type(figure.canvas).__name__)
+
+class FontMeasurer(object):
+    """
+    The :class:`~FontMeasurer` measures text directly from the font file, without creating `matplotlib.text.Text <https://matplotlib.org/3.2.2/api/text_api.html#matplotlib.text.Text>`_ artists.
+
+    Normal text is measured with matplotlib's FreeType fonts, using the same hinting and kerning as the Agg renderer.
+    Therefore the width of a string is the same as the width of the same string drawn as a text artist.
+    Mathematical text and LaTeX text are measured using matplotlib's text-to-path machinery.
+
+    The heights follow matplotlib's text layout.
+    A line is always at least as tall as the string `lp`, so that all lines in the same font have the same height regardless of their ascenders and descenders.
+
+    .. note::
+
+        The measurer only supports text on a single line.
+
+    :ivar cache: The cache of measurements.
+                 The keys are made up of the string, the font properties, the DPI and the type of text.
+                 The values are tuples with the width, height and descent of the string in pixels.
+    :vartype cache: :class:`~LRUCache`
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        Create the font measurer with an empty cache.
+
+        :param maxsize: The maximum number of measurements that the cache stores.
+        :type maxsize: int
+        """
+
+        self.cache = LRUCache(maxsize)
+        self._text_to_path = TextToPath()
+
+    def measure(self, text, fontproperties=None, dpi=72, usetex=None):
+        """
+        Measure the given string.
+
+        :param text: The string to measure.
+        :type text: str
+        :param fontproperties: The font properties of the string.
+                               If `None` is given, the default font properties are used.
+        :type fontproperties: None or :class:`matplotlib.font_manager.FontProperties`
+        :param dpi: The resolution of the figure, in dots per inch.
+        :type dpi: float
+        :param usetex: A boolean indicating whether the string is rendered with LaTeX.
+                       If `None` is given, the value is taken from matplotlib's ``text.usetex`` parameter.
+        :type usetex: None or bool
+
+        :return: A tuple with the width, ascent and descent of the string, in pixels.
+        :rtype: tuple of float
+        """
+
+        fontproperties = FontProperties() if fontproperties is None else fontproperties
+        usetex = rcParams['text.usetex'] if usetex is None else usetex
+
+        """
+        A line is at least as tall as the string `lp`.
+        Empty strings have no width, but they still have the height of the line.
+        """
+        text, ismath = self._preprocess(text, usetex)
+        _, lp_h, lp_d = self._measure('lp', fontproperties, dpi, 'TeX' if usetex else False)
+        w, h, d = self._measure(text, fontproperties, dpi, ismath) if text else (0, 0, 0)
+        h, d = max(h, lp_h), max(d, lp_d)
+        return (w, h - d, d)
+
+    def get_extent(self, text, transform, fontproperties=None, dpi=72, usetex=None,
+                   position=(0, 0), ha='left', va='baseline', context=None):
+        """
+        Get the extent of the given string if it were drawn at the given position.
+        The extent is equivalent to the bounding box that :func:`~util.get_bb` returns for the same text.
+
+        :param text: The string to measure.
+        :type text: str
+        :param transform: The transformation of the position and of the returned extent, such as the axes' data transformation.
+        :type transform: :class:`matplotlib.transforms.Transform`
+        :param fontproperties: The font properties of the string.
+                               If `None` is given, the default font properties are used.
+        :type fontproperties: None or :class:`matplotlib.font_manager.FontProperties`
+        :param dpi: The resolution of the figure, in dots per inch.
+        :type dpi: float
+        :param usetex: A boolean indicating whether the string is rendered with LaTeX.
+                       If `None` is given, the value is taken from matplotlib's ``text.usetex`` parameter.
+        :type usetex: None or bool
+        :param position: The position where the string would be drawn.
+        :type position: tuple
+        :param ha: The horizontal alignment of the string: ``left``, ``center`` or ``right``.
+        :type ha: str
+        :param va: The vertical alignment of the string: ``top``, ``center``, ``baseline`` or ``bottom``.
+        :type va: str
+        :param context: The layout context, which caches inverted transformations.
+                        If `None` is given, the transformation is inverted anew.
+        :type context: None or :class:`~layout.LayoutContext`
+
+        :return: The extent of the string in terms of the given transformation.
+        :rtype: :class:`matplotlib.transforms.Bbox`
+
+        :raises ValueError: When the given horizontal alignment is not supported.
+        :raises ValueError: When the given vertical alignment is not supported.
+        """
+
+        width, ascent, descent = self.measure(text, fontproperties, dpi, usetex)
+
+        """
+        Calculate the offset of the bottom-left corner from the anchor, in pixels.
+        """
+        if ha == 'left':
+            x = 0
+        elif ha == 'center':
+            x = - width / 2.
+        elif ha == 'right':
+            x = - width
+        else:
+            raise ValueError(f"Unsupported horizontal alignment: {ha}")
+
+        if va == 'bottom':
+            y = 0
+        elif va == 'baseline':
+            y = - descent
+        elif va == 'center':
+            y = - (ascent + descent) / 2.
+        elif va == 'top':
+            y = - (ascent + descent)
+        else:
+            raise ValueError(f"Unsupported vertical alignment: {va}")
+
+        """
+        Convert the extent from pixels to the given transformation.
+        """
+        x0, y0 = transform.transform(position)
+        x0, y0 = x0 + x, y0 + y
+        inverted = context.inverted(transform) if context is not None else transform.inverted()
+        return Bbox(inverted.transform(((x0, y0), (x0 + width, y0 + ascent + descent))))
+
+    def clear(self):
+        """
+        Remove all cached measurements.
+        """
+
+        self.cache.clear()
+
+    def info(self):
+        """
+        Get the cache statistics.
+
+        :return: A dictionary with the number of hits, misses, the current size and the maximum size of the cache.
+        :rtype: dict
+        """
+
+        return self.cache.info()
+
+    def _preprocess(self, text, usetex):
+        """
+        Find out what kind of text the given string is.
+        This function mirrors how matplotlib's text artists pre-process their text.
+
+        :param text: The string to pre-process.
+        :type text: str
+        :param usetex: A boolean indicating whether the string is rendered with LaTeX.
+        :type usetex: bool
+
+        :return: A tuple with the string to measure and the kind of text: `False` for normal text, `True` for mathematical text, or ``TeX`` for LaTeX.
+        :rtype: tuple
+        """
+
+        if usetex:
+            return ('\\ ' if text == ' ' else text), 'TeX'
+        elif cbook.is_math_text(text):
+            return text, True
+
+        return text.replace(r'\$', '$'), False
+
+    def _measure(self, text, fontproperties, dpi, ismath):
+        """
+        Measure the given string, looking it up in the cache first.
+
+        :param text: The string to measure.
+        :type text: str
+        :param fontproperties: The font properties of the string.
+        :type fontproperties: :class:`matplotlib.font_manager.FontProperties`
+        :param dpi: The resolution of the figure, in dots per inch.
+        :type dpi: float
+        :param ismath: The kind of text: `False` for normal text, `True` for mathematical text, or ``TeX`` for LaTeX.
+        :type ismath: bool or str
+
+        :return: A tuple with the width, height and descent of the string, in pixels.
+        :rtype: tuple of float
+        """
+
+        key = (text, hash(fontproperties), dpi, ismath)
+        dimensions = self.cache.get(key)
+        if dimensions is not None:
+            return dimensions
+
+        if ismath:
+            """
+            Mathematical and LaTeX text are measured in points, so they are converted to pixels.
+            """
+            w, h, d = self._text_to_path.get_text_width_height_descent(text, fontproperties, ismath)
+            dimensions = (w * dpi / 72., h * dpi / 72., d * dpi / 72.)
+        else:
+            """
+            Normal text is measured in the same way as the Agg renderer measures it.
+            The font's measurements are given in subpixels, so they are converted to pixels.
+            """
+            font = get_font(findfont(fontproperties))
+            font.clear()
+            font.set_size(fontproperties.get_size_in_points(), dpi)
+            font.set_text(text, 0.0, flags=get_hinting_flag())
+            w, h = font.get_width_height()
+            d = font.get_descent()
+            dimensions = (w / 64., h / 64., d / 64.)
+
+        self.cache.put(key, dimensions)
+        return dimensions
+
+def get_fontproperties(**kwargs):
+    """
+    Create the font properties described by the given text style.
+    The style is the same as the keyword arguments accepted by the `matplotlib.text.Text <https://matplotlib.org/3.2.2/api/text_api.html#matplotlib.text.Text>`_ class.
+    Any styling options that do not affect the font, such as the color, are ignored.
+
+    :return: The font properties described by the style.
+    :rtype: :class:`matplotlib.font_manager.FontProperties`
+    """
+
+    """
+    The font may be given as font properties, as a dictionary of font properties, as the path to a font file or as a fontconfig pattern.
+    A copy is always created so that the given font properties are not changed.
+    """
+    fontproperties = FontProperties()
+    for key in [ 'fontproperties', 'font_properties', 'font' ]:
+        font = kwargs.get(key)
+        if font is None:
+            continue
+
+        if isinstance(font, FontProperties):
+            fontproperties = font.copy()
+        elif isinstance(font, dict):
+            fontproperties = FontProperties(**font)
+        elif isinstance(font, os.PathLike):
+            fontproperties = FontProperties(fname=font)
+        else:
+            fontproperties = FontProperties(font)
+
+    setters = { 'family': fontproperties.set_family, 'fontfamily': fontproperties.set_family,
+                'fontname': fontproperties.set_family,
+                'style': fontproperties.set_style, 'fontstyle': fontproperties.set_style,
+                'variant': fontproperties.set_variant, 'fontvariant': fontproperties.set_variant,
+                'weight': fontproperties.set_weight, 'fontweight': fontproperties.set_weight,
+                'stretch': fontproperties.set_stretch, 'fontstretch': fontproperties.set_stretch,
+                'size': fontproperties.set_size, 'fontsize': fontproperties.set_size }
+    for key, value in kwargs.items():
+        if key in setters:
+            setters[key](value)
+
+    return fontproperties
+
+"""
+The text metrics and font measurer shared by all of Multiplex's visualizations.
+"""
+text_metrics = TextMetrics()
+font_measurer = FontMeasurer()
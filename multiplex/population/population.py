@@ -209,27 +209,28 @@ class Population(LabelledVisualization):
         items = list(population) if isinstance(population, Iterable) else [ True for _ in range(population) ]
         columns = math.ceil(len(items)/rows)
 
-        # draw the population
-        for x in range(columns):
-            _drawn = [ ]
-            for y in range(rows):
-                # stop drawing if all points have been drawn
-                if x * rows + y >= len(items):
-                    break
-
-                # draw the point with the correct style
-                item = items[ x * rows + y ]
-                style = dict(kwargs)
-                style.update(item if type(item) is dict else { })
-                label = style.pop('label', None)
-                point = self.drawable.scatter(1 + x, lim[0] + y * gap, **style)
-                _drawn.append(point)
-
-                # draw a legend label if the point has a label
-                if label:
-                    self._draw_legend(label, label_style, **style)
-
-            drawn.append(_drawn)
+        # draw the population, adding any labels to the legend in a batch so the drawable is re-drawn only once
+        with self.drawable.legend.batch():
+            for x in range(columns):
+                _drawn = [ ]
+                for y in range(rows):
+                    # stop drawing if all points have been drawn
+                    if x * rows + y >= len(items):
+                        break
+
+                    # draw the point with the correct style
+                    item = items[ x * rows + y ]
+                    style = dict(kwargs)
+                    style.update(item if type(item) is dict else { })
+                    label = style.pop('label', None)
+                    point = self.drawable.scatter(1 + x, lim[0] + y * gap, **style)
+                    _drawn.append(point)
+
+                    # draw a legend label if the point has a label
+                    if label:
+                        self._draw_legend(label, label_style, **style)
+
+                drawn.append(_drawn)
 
         self._update_xticks(rows, columns)
         return drawn
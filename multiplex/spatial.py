@@ -0,0 +1,390 @@
+"""
+The spatial module indexes components by where they are on the figure.
+Checking whether a label overlaps with any other component normally means comparing it with every other component.
+When a figure has thousands of labels, points or lines, these comparisons dominate the time it takes to lay it out.
+
+The :class:`~GridIndex` divides the plane into square cells and remembers which components cover which cells.
+Checking for overlaps then only involves the components in the same cells, which are usually very few.
+The index stores extents, so it works with any coordinate system.
+However, display coordinates work best because components have the same size everywhere on the figure.
+
+Long, thin components, like the edges of a graph, cover many cells with their extents, but they only pass through a few of them.
+These components can be inserted as segments instead, in which case they only cover the cells that the segment passes through.
+
+.. code-block:: python
+
+    import matplotlib.pyplot as plt
+    from multiplex import drawable
+    from multiplex.spatial import GridIndex
+    viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+    index = GridIndex(cell_size=50)
+    text = viz.text(0, 0, 'token')
+    index.insert(text, text.get_window_extent(viz.figure.canvas.get_renderer()).extents)
+    nearby = index.query((0, 0, 100, 100))
+"""
+
+import math
+
+class GridIndex(object):
+    """
+    The :class:`~GridIndex` is a uniform grid over the extents of components.
+    Each component is stored with a key, such as the component itself, and its extents.
+    A component covers all of the cells that its extents overlap, or only the cells that its segment passes through if it is inserted as a segment.
+
+    :ivar cell_size: The width and height of each cell.
+    :vartype cell_size: float
+    """
+
+    def __init__(self, cell_size=50):
+        """
+        Create an empty index.
+
+        :param cell_size: The width and height of each cell.
+                          Ideally, the cells should be about as big as the typical component.
+        :type cell_size: float
+
+        :raises ValueError: When the cell size is not positive.
+        """
+
+        if not cell_size > 0:
+            raise ValueError(f"The cell size must be positive, received { cell_size }")
+
+        self.cell_size = cell_size
+        self._cells = { }
+        self._extents = { }
+        self._order, self._inserted = { }, 0
+        self._segments = { }
+
+    def insert(self, key, extents):
+        """
+        Add a component to the index.
+        If the key is already in the index, its extents are replaced.
+
+        :param key: The key of the component.
+        :type key: object
+        :param extents: The extents of the component as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates.
+                        The coordinates may be given in any order.
+        :type extents: tuple of float
+
+        :raises ValueError: When the extents are not finite.
+        """
+
+        x0, y0, x1, y1 = ( float(value) for value in extents )
+        if not all( math.isfinite(value) for value in (x0, y0, x1, y1) ):
+            raise ValueError(f"The extents must be finite, received { extents }")
+
+        if key in self._extents:
+            self.remove(key)
+
+        extents = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        self._extents[key] = extents
+        self._order[key], self._inserted = self._inserted, self._inserted + 1
+        for cell in self._get_cells(extents):
+            self._cells.setdefault(cell, { })[key] = None
+
+    def insert_segment(self, key, segment):
+        """
+        Add a segment to the index.
+        The segment only covers the cells that it passes through, but its extents are those of the segment's bounding box.
+        If the key is already in the index, its extents are replaced.
+
+        :param key: The key of the segment.
+        :type key: object
+        :param segment: The segment as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates of its endpoints.
+        :type segment: tuple of float
+
+        :raises ValueError: When the segment's coordinates are not finite.
+        """
+
+        x0, y0, x1, y1 = ( float(value) for value in segment )
+        if not all( math.isfinite(value) for value in (x0, y0, x1, y1) ):
+            raise ValueError(f"The segment must be finite, received { segment }")
+
+        if key in self._extents:
+            self.remove(key)
+
+        self._extents[key] = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        self._segments[key] = (x0, y0, x1, y1)
+        self._order[key], self._inserted = self._inserted, self._inserted + 1
+        for cell in self._get_segment_cells((x0, y0, x1, y1)):
+            self._cells.setdefault(cell, { })[key] = None
+
+    def remove(self, key):
+        """
+        Remove a component from the index.
+        If the key is not in the index, nothing happens.
+
+        :param key: The key of the component.
+        :type key: object
+        """
+
+        extents = self._extents.pop(key, None)
+        if extents is None:
+            return
+
+        del self._order[key]
+
+        segment = self._segments.pop(key, None)
+        cells = self._get_cells(extents) if segment is None else self._get_segment_cells(segment)
+        for cell in cells:
+            keys = self._cells[cell]
+            del keys[key]
+            if not keys:
+                del self._cells[cell]
+
+    def get(self, key, default=None):
+        """
+        Get the extents of a component.
+
+        :param key: The key of the component.
+        :type key: object
+        :param default: The value to return if the key is not in the index.
+        :type default: object
+
+        :return: The extents of the component, with the lower coordinates first, or the default value.
+        :rtype: tuple of float or object
+        """
+
+        return self._extents.get(key, default)
+
+    def clear(self):
+        """
+        Remove all components from the index.
+        """
+
+        self._cells.clear()
+        self._extents.clear()
+        self._order.clear()
+        self._segments.clear()
+
+    def query(self, extents):
+        """
+        Get the components that intersect with the given extents.
+        Components whose extents only touch the given extents are also returned.
+        Therefore the result contains all components that overlap according to :func:`~util.overlapping_bb`, and possibly a few more.
+
+        :param extents: The extents to look up as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates.
+        :type extents: tuple of float
+
+        :return: The keys of the components that intersect with the extents, in the order in which they were inserted.
+                 Components that were inserted again, to update their extents, count as inserted last.
+        :rtype: list
+        """
+
+        x0, y0, x1, y1 = extents
+        x0, y0, x1, y1 = min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+        """
+        Collect the components in all the cells that the extents cover.
+        Then, keep only the components whose extents actually intersect.
+        """
+        candidates = { }
+        for cell in self._get_cells((x0, y0, x1, y1)):
+            candidates.update(self._cells.get(cell, { }))
+
+        keys = [ key for key in candidates if self._intersects(self._extents[key], (x0, y0, x1, y1)) ]
+        return sorted(keys, key=self._order.get)
+
+    def nearest(self, point, k=1):
+        """
+        Get the components that are closest to the given point.
+        The distance to a component is the distance to the closest point of its extents, or of its segment if it was inserted as a segment.
+        Components that contain the point are at a distance of 0.
+
+        The search starts from the point's cell and visits rings of cells around it until the closest components are found.
+
+        :param point: The point as a tuple of x and y coordinates.
+        :type point: tuple of float
+        :param k: The number of components to return.
+        :type k: int
+
+        :return: The keys of the closest components, from the closest to the farthest.
+                 If the index has fewer than `k` components, all of them are returned.
+        :rtype: list
+        """
+
+        x, y = point
+        i, j = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+        """
+        Visit one ring of cells at a time.
+        Any component that has not been found after visiting ring `r` is at least `r` cells away from the point.
+        Therefore the search stops when the `k` closest components found so far are closer than that.
+        """
+        distances = { }
+        ring = 0
+        while len(distances) < len(self._extents):
+            for cell in self._get_ring(i, j, ring):
+                for key in self._cells.get(cell, { }):
+                    if key not in distances:
+                        distances[key] = (self._get_distance(self._extents[key], (x, y)) if key not in self._segments else
+                                          self._get_segment_distance(self._segments[key], (x, y)))
+
+            closest = sorted(distances.values())[:k]
+            if len(closest) == k and closest[-1] <= ring * self.cell_size:
+                break
+
+            ring += 1
+
+        return sorted(distances, key=distances.get)[:k]
+
+    def __contains__(self, key):
+        """
+        Check whether the given key is in the index.
+
+        :param key: The key to look for.
+        :type key: object
+
+        :return: A boolean indicating whether the key is in the index.
+        :rtype: bool
+        """
+
+        return key in self._extents
+
+    def __len__(self):
+        """
+        Get the number of components in the index.
+
+        :return: The number of components in the index.
+        :rtype: int
+        """
+
+        return len(self._extents)
+
+    def _get_cells(self, extents):
+        """
+        Get the cells that the given extents cover.
+
+        :param extents: The extents as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates, with the lower coordinates first.
+        :type extents: tuple of float
+
+        :return: The cells as tuples of column and row indices.
+        :rtype: list of tuple of int
+        """
+
+        x0, y0, x1, y1 = extents
+        size = self.cell_size
+        return [ (i, j) for i in range(math.floor(x0 / size), math.floor(x1 / size) + 1)
+                        for j in range(math.floor(y0 / size), math.floor(y1 / size) + 1) ]
+
+    def _get_segment_cells(self, segment):
+        """
+        Get the cells that the given segment passes through.
+        The function walks from the cell of the segment's start to the cell of its end, each time crossing the closest cell boundary.
+        Therefore the number of cells grows with the segment's length, not with the area of its bounding box.
+
+        :param segment: The segment as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates of its endpoints.
+        :type segment: tuple of float
+
+        :return: The cells as tuples of column and row indices, from the segment's start to its end.
+        :rtype: list of tuple of int
+        """
+
+        x0, y0, x1, y1 = segment
+        size = self.cell_size
+        i, j = math.floor(x0 / size), math.floor(y0 / size)
+        end = (math.floor(x1 / size), math.floor(y1 / size))
+
+        """
+        Calculate how far along the segment, as a fraction of its length, it crosses the next vertical and horizontal cell boundaries.
+        Moving from one boundary to the next adds the same fraction every time.
+        """
+        dx, dy = x1 - x0, y1 - y0
+        step_i, step_j = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+        next_x = ((i + (step_i > 0)) * size - x0) / dx if dx else math.inf
+        next_y = ((j + (step_j > 0)) * size - y0) / dy if dy else math.inf
+        delta_x = size / abs(dx) if dx else math.inf
+        delta_y = size / abs(dy) if dy else math.inf
+
+        """
+        The segment crosses one boundary for each column and row between its start and end.
+        The number of steps is bounded so that rounding errors cannot make the walk overshoot.
+        """
+        cells = [ (i, j) ]
+        for _ in range(abs(end[0] - i) + abs(end[1] - j)):
+            if next_x < next_y:
+                i, next_x = i + step_i, next_x + delta_x
+            else:
+                j, next_y = j + step_j, next_y + delta_y
+            cells.append((i, j))
+
+        if cells[-1] != end:
+            cells.append(end)
+
+        return cells
+
+    def _get_ring(self, i, j, ring):
+        """
+        Get the cells that are exactly `ring` cells away from the given cell.
+
+        :param i: The column of the central cell.
+        :type i: int
+        :param j: The row of the central cell.
+        :type j: int
+        :param ring: The distance, in cells, from the central cell.
+                     If the distance is 0, only the central cell is returned.
+        :type ring: int
+
+        :return: The cells in the ring as tuples of column and row indices.
+        :rtype: list of tuple of int
+        """
+
+        if ring == 0:
+            return [ (i, j) ]
+
+        cells = [ (i + di, j + dj) for di in (-ring, ring) for dj in range(-ring, ring + 1) ]
+        cells.extend([ (i + di, j + dj) for dj in (-ring, ring) for di in range(-ring + 1, ring) ])
+        return cells
+
+    def _get_distance(self, extents, point):
+        """
+        Get the distance between the given extents and point.
+
+        :param extents: The extents as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates, with the lower coordinates first.
+        :type extents: tuple of float
+        :param point: The point as a tuple of x and y coordinates.
+        :type point: tuple of float
+
+        :return: The distance between the extents and the point.
+        :rtype: float
+        """
+
+        x0, y0, x1, y1 = extents
+        x, y = point
+        return math.hypot(max(x0 - x, 0, x - x1), max(y0 - y, 0, y - y1))
+
+    def _get_segment_distance(self, segment, point):
+        """
+        Get the distance between the given segment and point.
+
+        :param segment: The segment as a tuple made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates of its endpoints.
+        :type segment: tuple of float
+        :param point: The point as a tuple of x and y coordinates.
+        :type point: tuple of float
+
+        :return: The distance between the segment and the point.
+        :rtype: float
+        """
+
+        x0, y0, x1, y1 = segment
+        x, y = point
+        dx, dy = x1 - x0, y1 - y0
+        length = dx ** 2 + dy ** 2
+        t = min(max(((x - x0) * dx + (y - y0) * dy) / length, 0), 1) if length else 0
+        return math.hypot(x0 + t * dx - x, y0 + t * dy - y)
+
+    def _intersects(self, extents1, extents2):
+        """
+        Check whether the two given extents intersect or touch.
+
+        :param extents1: The first extents, with the lower coordinates first.
+        :type extents1: tuple of float
+        :param extents2: The second extents, with the lower coordinates first.
+        :type extents2: tuple of float
+
+        :return: A boolean indicating whether the extents intersect or touch.
+        :rtype: bool
+        """
+
+        return (extents1[0] <= extents2[2] and extents2[0] <= extents1[2] and
+                extents1[1] <= extents2[3] and extents2[1] <= extents1[3])
@@ -146,3 +146,224 @@ class TestDrawable(MultiplexTest):
         for i, t1 in enumerate(tokens):
             for j, t2 in enumerate(tokens[(i + 1):]):
                 self.assertFalse(util.overlapping(viz.figure, viz.axes, t1, t2))
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_unchanged(self):
+        """
+        Test that re-drawing an unchanged drawable does not lay out the figure again.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.draw_time_series(range(0, 10), range(0, 10), label='A')
+        viz.set_caption('Caption')
+        viz.redraw()
+
+        draws = [ ]
+        draw = viz.context.draw
+        viz.context.draw = lambda *args, **kwargs: draws.append(True) or draw(*args, **kwargs)
+        viz.redraw()
+        viz.redraw()
+        self.assertFalse(draws)
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_dirty(self):
+        """
+        Test that changing a component through the drawable re-draws the drawable.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.set_caption('Caption')
+        viz.redraw()
+        bb = viz.caption.get_virtual_bb(transform=viz.axes.transAxes)
+
+        """
+        Adding a legend entry moves the caption up.
+        """
+        viz.legend.draw_line('A')
+        self.assertGreater(viz.caption.get_virtual_bb(transform=viz.axes.transAxes).y0, bb.y0)
+
+        """
+        Methods called through the drawable that change the layout mark all components as dirty, but getters and other methods do not.
+        """
+        viz.get_xlim()
+        self.assertFalse(viz._dirty)
+        viz.text(0, 0, 'text')
+        viz.scatter([ 0 ], [ 0 ])
+        self.assertFalse(viz._dirty)
+        viz.set_xlim((0, 10))
+        self.assertEqual(set(drawable.Drawable.COMPONENTS), viz._dirty)
+        viz.redraw()
+        self.assertFalse(viz._dirty)
+        viz.set_title('Title', loc='left')
+        self.assertEqual(set(drawable.Drawable.COMPONENTS), viz._dirty)
+        viz.redraw()
+        self.assertFalse(viz._dirty)
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_layout_change(self):
+        """
+        Test that changing the axes limits directly re-draws all components.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.set_caption('Caption')
+        viz.redraw()
+
+        draws = [ ]
+        draw = viz.context.draw
+        viz.context.draw = lambda *args, **kwargs: draws.append(True) or draw(*args, **kwargs)
+        viz.axes.set_xlim(0, 100)
+        viz.redraw()
+        self.assertTrue(draws)
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_axes_changed_directly(self):
+        """
+        Test that changing the x-axis label or the title directly through the axes re-draws the header.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.set_caption('Caption')
+        viz.axes.xaxis.set_label_position('top')
+        viz.axes.xaxis.tick_top()
+        viz.redraw()
+        bb = viz.caption.get_virtual_bb(transform=viz.axes.transAxes)
+
+        """
+        Adding an x-axis label at the top moves the caption up.
+        """
+        viz.axes.set_xlabel('label')
+        viz.redraw()
+        self.assertLess(bb.y0, viz.caption.get_virtual_bb(transform=viz.axes.transAxes).y0)
+        self.assertFalse(util.overlapping_bb(viz.caption.get_virtual_bb(transform=viz.axes.transAxes),
+                                             viz._get_xlabel(transform=viz.axes.transAxes)))
+
+        """
+        Setting the title directly resets its padding, so re-drawing has to restore it.
+        """
+        pad = viz.axes.titleOffsetTrans.get_matrix()[1, 2]
+        viz.axes.set_title('Title', loc='left')
+        self.assertNotEqual(pad, viz.axes.titleOffsetTrans.get_matrix()[1, 2])
+        viz.redraw()
+        self.assertAlmostEqual(pad, viz.axes.titleOffsetTrans.get_matrix()[1, 2])
+
+    @MultiplexTest.temporary_plot
+    def test_invalidate(self):
+        """
+        Test that invalidating components marks them as dirty, and that unknown components raise a ValueError.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.redraw()
+        self.assertFalse(viz._dirty)
+        viz.invalidate('legend')
+        self.assertEqual({ 'legend' }, viz._dirty)
+        viz.invalidate()
+        self.assertEqual(set(drawable.Drawable.COMPONENTS), viz._dirty)
+        self.assertRaises(ValueError, viz.invalidate, 'axes')
+
+    @MultiplexTest.temporary_plot
+    def test_batch_draws_once(self):
+        """
+        Test that drawing many components in a batch lays out the figure a constant number of times.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        draws = [ ]
+        draw = viz.context.draw
+        viz.context.draw = lambda *args, **kwargs: draws.append(True) or draw(*args, **kwargs)
+
+        with viz.batch():
+            viz.set_caption('Caption')
+            for i in range(0, 20):
+                viz.annotate(f"Annotation { i }", (i, i + 1), i)
+                viz.legend.draw_line(f"label { i }")
+            self.assertFalse(draws)
+        self.assertLessEqual(len(draws), 2)
+
+        """
+        Test that the batch lays out the visualization when it ends.
+        """
+        self.assertFalse(viz._dirty)
+        self.assertLess(viz.legend.get_virtual_bb(transform=viz.axes.transAxes).y1,
+                        viz.caption.get_virtual_bb(transform=viz.axes.transAxes).y0)
+
+    @MultiplexTest.temporary_plot
+    def test_batch_nested(self):
+        """
+        Test that nested batches only run the deferred work when the outermost batch ends.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        calls = [ ]
+        with viz.batch():
+            with viz.batch():
+                viz._defer(lambda: calls.append(True))
+            self.assertFalse(calls)
+        self.assertEqual(1, len(calls))
+
+        """
+        Test that outside of a batch, work is not deferred.
+        """
+        viz._defer(lambda: calls.append(True))
+        self.assertEqual(2, len(calls))
+
+    @MultiplexTest.temporary_plot
+    def test_batch_same_layout(self):
+        """
+        Test that drawing slope graphs in a batch fits the axes in the same way as drawing them one by one.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        for i in range(0, 5):
+            viz.draw_slope(i, 5 - i, label=f"label { i }")
+        viz.redraw()
+        expected = viz.axes.get_xlim()
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        with viz.batch():
+            for i in range(0, 5):
+                viz.draw_slope(i, 5 - i, label=f"label { i }")
+        for e, x in zip(expected, viz.axes.get_xlim()):
+            self.assertAlmostEqual(e, x, places=5)
+
+    @MultiplexTest.temporary_plot
+    def test_header_stacked(self):
+        """
+        Test that the header stacks the legend, the caption and the title without overlapping.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.set_title('Title', loc='left')
+        caption = viz.set_caption('Caption')
+        for i in range(0, 20):
+            viz.legend.draw_line(f"label { i }")
+        viz.redraw()
+
+        legend_bb = viz.legend.get_virtual_bb(transform=viz.axes.transAxes)
+        caption_bb = caption.get_virtual_bb(transform=viz.axes.transAxes)
+        title_bb = util.get_bb(viz.figure, viz.axes, viz.axes.title, transform=viz.axes.transAxes)
+        self.assertLessEqual(1, round(legend_bb.y0, 10))
+        self.assertLess(legend_bb.y1, caption_bb.y0)
+        self.assertLess(caption_bb.y1, title_bb.y0)
+
+    @MultiplexTest.temporary_plot
+    def test_header_top_xaxes(self):
+        """
+        Test that when the x-axis label is at the top, the header makes space for the label and tick labels.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.set_caption('Caption')
+        legend_y, caption_y, title_pad = viz._get_header()
+        self.assertEqual(1, legend_y)
+
+        viz.axes.xaxis.set_label_position('top')
+        viz.axes.xaxis.tick_top()
+        viz.set_xlabel('label')
+        top_legend_y, top_caption_y, top_title_pad = viz._get_header()
+        height = viz._get_top_labels_height(transform=viz.axes.transAxes)
+        self.assertGreater(height, 0)
+        self.assertAlmostEqual(1 + height, top_legend_y)
+        self.assertAlmostEqual(caption_y + height, top_caption_y)
+        self.assertGreater(top_title_pad, title_pad)
@@ -126,3 +126,84 @@ class TestLabelledVisualization(MultiplexTest):
         viz.redraw()
         post_bb1, post_bb2 = l1.get_virtual_bb(), l2.get_virtual_bb()
         self.assertFalse(util.overlapping_bb(post_bb1, post_bb2))
+
+    @MultiplexTest.temporary_plot
+    def test_overlapping_labels_keep_order(self):
+        """
+        Test that when many labels overlap, they are distributed in one pass, keeping their order and staying close to their positions.
+        """
+
+        viz = DummyLabelledVisualization(drawable.Drawable(plt.figure(figsize=(10, 10))))
+        viz.drawable.set_ylim((0, 100))
+        labels = [ viz.draw_label(f"Label {i}", 0, 50 + i * 0.1) for i in range(0, 20) ]
+        viz.redraw()
+
+        bbs = [ label.get_virtual_bb() for label in labels ]
+        for bb1, bb2 in zip(bbs[:-1], bbs[1:]):
+            self.assertLessEqual(round(bb1.y1, 10), round(bb2.y0, 10))
+
+        middle = (bbs[0].y0 + bbs[-1].y1) / 2.
+        self.assertEqual(round(sum( 50 + i * 0.1 for i in range(0, 20) ) / 20, 10), round(middle, 10))
+
+    @MultiplexTest.temporary_plot
+    def test_overlapping_labels_within_bounds(self):
+        """
+        Test that labels that overlap at the edge of the axes are distributed within the axes.
+        """
+
+        viz = DummyLabelledVisualization(drawable.Drawable(plt.figure(figsize=(10, 10))))
+        viz.drawable.set_ylim((0, 100))
+        labels = [ viz.draw_label(f"Label {i}", 0, 99) for i in range(0, 5) ]
+        viz.redraw()
+
+        self.assertLessEqual(round(max( label.get_virtual_bb().y1 for label in labels ), 10), 100)
+
+    @MultiplexTest.temporary_plot
+    def test_draw_label_arranges_immediately(self):
+        """
+        Test that a new label is drawn and arranged immediately, without re-drawing the visualization.
+        """
+
+        viz = DummyLabelledVisualization(drawable.Drawable(plt.figure(figsize=(10, 10))))
+        viz.drawable.set_ylim((0, 100))
+        label1 = viz.draw_label('A', 4, 50)
+        label2 = viz.draw_label('B', 4, 50)
+        self.assertTrue(label1.lines)
+        self.assertTrue(label2.lines)
+        self.assertFalse(util.overlapping_bb(label1.get_virtual_bb(), label2.get_virtual_bb()))
+
+    @MultiplexTest.temporary_plot
+    def test_draw_label_only_moves_touched_clusters(self):
+        """
+        Test that adding a label only moves the labels that it overlaps.
+        """
+
+        viz = DummyLabelledVisualization(drawable.Drawable(plt.figure(figsize=(10, 10))))
+        viz.drawable.set_ylim((0, 100))
+        low = [ viz.draw_label(f"Low {i}", 4, 10) for i in range(0, 3) ]
+        high = [ viz.draw_label(f"High {i}", 4, 90) for i in range(0, 3) ]
+        bbs = [ label.get_virtual_bb().bounds for label in high ]
+
+        viz.draw_label('Low 3', 4, 10)
+        self.assertEqual(bbs, [ label.get_virtual_bb().bounds for label in high ])
+        self.assertEqual(1, len(set( id(viz._clusters[label]) for label in low )))
+        self.assertFalse(any( label in viz._clusters[low[0]] for label in high ))
+
+        for i, l1 in enumerate(viz.labels):
+            for l2 in viz.labels[(i + 1):]:
+                self.assertFalse(util.overlapping_bb(l1.get_virtual_bb(), l2.get_virtual_bb()))
+
+    @MultiplexTest.temporary_plot
+    def test_index_follows_labels(self):
+        """
+        Test that the spatial index of labels stores the labels' current positions, even after they are distributed.
+        """
+
+        viz = DummyLabelledVisualization(drawable.Drawable(plt.figure(figsize=(10, 10))))
+        viz.drawable.set_ylim((0, 100))
+        labels = [ viz.draw_label(f"Label {i}", 4, 50) for i in range(0, 4) ]
+        for label in labels:
+            bb = label.get_virtual_bb()
+            extents = viz.drawable.axes.transData.transform(((bb.x0, bb.y0), (bb.x1, bb.y1))).flatten()
+            for value, expected in zip(viz._index.get(label), extents):
+                self.assertAlmostEqual(expected, value, 8)
@@ -0,0 +1,272 @@
+"""
+Unit tests for the :mod:`~layout` module.
+"""
+
+import matplotlib.pyplot as plt
+import os
+import sys
+
+path = os.path.join(os.path.dirname(__file__), '..')
+if path not in sys.path:
+    sys.path.insert(1, path)
+
+from .test import MultiplexTest
+from layout import LayoutContext
+import drawable, util
+
+class TestLayout(MultiplexTest):
+    """
+    Unit tests for the :mod:`~layout` module.
+    """
+
+    @MultiplexTest.temporary_plot
+    def test_drawable_context(self):
+        """
+        Test that the drawable creates a layout context for its figure and axes.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        self.assertEqual(LayoutContext, type(viz.context))
+        self.assertEqual(viz.figure, viz.context.figure)
+        self.assertEqual(viz.axes, viz.context.axes)
+
+    @MultiplexTest.temporary_plot
+    def test_inverted_cached(self):
+        """
+        Test that the inverted transformation is re-used while the figure does not change.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        self.assertTrue(context.inverted(viz.axes.transData) is context.inverted(viz.axes.transData))
+        self.assertFalse(context.inverted(viz.axes.transData) is context.inverted(viz.axes.transAxes))
+
+    @MultiplexTest.temporary_plot
+    def test_inverted_equal(self):
+        """
+        Test that the cached inverted transformation is equivalent to matplotlib's inverted transformation.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.set_xlim((-2, 5))
+        viz.set_ylim((10, 20))
+        transform = viz.axes.transData
+        for point in [ (0, 0), (100, 50), (-20, 300) ]:
+            self.assertEqual(tuple(transform.inverted().transform(point)),
+                             tuple(viz.context.inverted(transform).transform(point)))
+        self.assertEqual(tuple(transform.inverted().transform((0, 0))),
+                         tuple(viz.context.inverted_origin(transform)))
+        self.assertEqual(tuple(transform.transform((0, 0))), tuple(viz.context.origin(transform)))
+
+    @MultiplexTest.temporary_plot
+    def test_limits_invalidate(self):
+        """
+        Test that changing the axes limits invalidates the cached values.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        inverted = context.inverted(viz.axes.transData)
+        generation = context.generation
+
+        viz.set_xlim((0, 10))
+        self.assertFalse(inverted is context.inverted(viz.axes.transData))
+        self.assertEqual(generation + 1, context.generation)
+        self.assertEqual(tuple(viz.axes.transData.inverted().transform((100, 100))),
+                         tuple(context.inverted(viz.axes.transData).transform((100, 100))))
+
+    @MultiplexTest.temporary_plot
+    def test_repeated_changes_invalidate(self):
+        """
+        Test that every change to the figure invalidates the cached values, even if the changes are not measured in between.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        context.validate()
+        for limit in range(1, 4):
+            viz.axes.set_xlim((0, limit))
+            viz.axes.set_ylim((0, limit))
+            self.assertFalse(context.validate())
+            self.assertTrue(context.validate())
+            self.assertEqual(util.get_aspect(viz.axes), context.get_aspect())
+
+        viz.axes.set_position([ 0.2, 0.2, 0.5, 0.5 ])
+        self.assertFalse(context.validate())
+        viz.axes.set_yscale('log')
+        self.assertFalse(context.validate())
+        viz.figure.set_dpi(50)
+        self.assertFalse(context.validate())
+
+    @MultiplexTest.temporary_plot
+    def test_inverted_bounded(self):
+        """
+        Test that the context caches the values of a bounded number of transformations.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = LayoutContext(viz.figure, viz.axes, maxsize=2)
+        transforms = [ viz.axes.transData + viz.axes.transAxes.inverted() for _ in range(5) ]
+        for transform in transforms:
+            context.inverted(transform)
+        self.assertEqual(2, len(context._inverted))
+
+    @MultiplexTest.temporary_plot
+    def test_figure_size_invalidates(self):
+        """
+        Test that changing the figure size invalidates the cached values.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        aspect = context.get_aspect()
+        viz.figure.set_size_inches(5, 5)
+        self.assertNotEqual(aspect, context.get_aspect())
+        self.assertEqual(util.get_aspect(viz.axes), context.get_aspect())
+
+    @MultiplexTest.temporary_plot
+    def test_watches_transformations(self):
+        """
+        Test that with the installed version of matplotlib, the context listens to the transformations instead of comparing the figure's state.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        context.validate()
+        self.assertTrue(context._watchable)
+        self.assertEqual(None, context._state)
+        self.assertFalse(context._watcher._invalid)
+
+    @MultiplexTest.temporary_plot
+    def test_state_invalidates(self):
+        """
+        Test that when the context cannot listen to the transformations, changing the figure still invalidates the cached values.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        context._watchable = False
+        context.invalidate()
+        context.validate()
+        generation = context.generation
+        self.assertTrue(context.validate())
+
+        changes = [ lambda: viz.axes.set_xlim((0, 10)), lambda: viz.axes.set_yscale('log'),
+                    lambda: viz.figure.set_size_inches(5, 5), lambda: viz.figure.set_dpi(200),
+                    lambda: viz.axes.set_position((0.2, 0.2, 0.5, 0.5)) ]
+        for change in changes:
+            change()
+            self.assertFalse(context.validate())
+            self.assertTrue(context.validate())
+            generation += 1
+            self.assertEqual(generation, context.generation)
+
+        self.assertEqual(tuple(viz.axes.transData.inverted().transform((100, 100))),
+                         tuple(context.inverted(viz.axes.transData).transform((100, 100))))
+
+    @MultiplexTest.temporary_plot
+    def test_other_axes_invalidate(self):
+        """
+        Test that changing the limits of another axes in the same figure invalidates the cached values.
+        """
+
+        figure, axes = plt.subplots(2, 1, figsize=(10, 10))
+        viz = drawable.Drawable(figure, axes[0])
+        context = viz.context
+        context.validate()
+        generation = context.generation
+
+        axes[1].set_ylim((0, 10))
+        self.assertFalse(context.validate())
+        self.assertEqual(generation + 1, context.generation)
+
+    @MultiplexTest.temporary_plot
+    def test_invalidate(self):
+        """
+        Test that invalidating the context discards the cached values.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        inverted = context.inverted(viz.axes.transData)
+        context.invalidate()
+        self.assertFalse(inverted is context.inverted(viz.axes.transData))
+
+    @MultiplexTest.temporary_plot
+    def test_get_aspect(self):
+        """
+        Test that the cached aspect ratio is equivalent to the calculated aspect ratio.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.set_xlim((0, 4))
+        self.assertEqual(util.get_aspect(viz.axes), util.get_aspect(viz.axes, context=viz.context))
+
+    @MultiplexTest.temporary_plot
+    def test_get_bb_equal(self):
+        """
+        Test that the bounding box calculated with the context is equivalent to the bounding box calculated without it.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        text = viz.text(0, 0, 'token')
+        point = viz.scatter(0.5, 0.5, s=100)
+        line = viz.plot([ 0, 1 ], [ 0, 1 ])[0]
+        viz.set_xlim((-1, 2))
+        viz.set_ylim((-1, 2))
+        for component in [ text, point, line ]:
+            for transform in [ axes.transData, axes.transAxes ]:
+                bb = util.get_bb(figure, axes, component, transform=transform)
+                cached = util.get_bb(figure, axes, component, transform=transform, context=viz.context)
+                self.assertEqual(bb.bounds, cached.bounds)
+
+    @MultiplexTest.temporary_plot
+    def test_frozen(self):
+        """
+        Test that while the context is frozen, changes to the figure are not detected, and that they are detected afterwards.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        context = viz.context
+        with context.frozen():
+            generation = context.generation
+            viz.set_xlim((0, 10))
+            self.assertTrue(context.validate())
+            self.assertEqual(generation, context.generation)
+
+        self.assertFalse(context.validate())
+        self.assertEqual(generation + 1, context.generation)
+
+    @MultiplexTest.temporary_plot
+    def test_draw_positions_ticks(self):
+        """
+        Test that laying out the figure positions the tick labels in the same way as drawing the canvas.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.scatter(range(0, 1000), range(0, 1000))
+        viz.set_xlim((0, 1000))
+        viz.context.draw()
+        bbs = [ util.get_bb(viz.figure, viz.axes, label).bounds for label in viz.axes.xaxis.get_ticklabels() ]
+        self.assertTrue(any( label.get_text() for label in viz.axes.xaxis.get_ticklabels() ))
+
+        viz.figure.canvas.draw()
+        self.assertEqual(bbs, [ util.get_bb(viz.figure, viz.axes, label).bounds for label in viz.axes.xaxis.get_ticklabels() ])
+
+    @MultiplexTest.temporary_plot
+    def test_draw_no_rendering(self):
+        """
+        Test that laying out the figure does not draw the canvas or render the points.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        viz.scatter(range(0, 10), range(0, 10))
+
+        calls = [ ]
+        viz.figure.canvas.draw = lambda *args, **kwargs: calls.append('canvas')
+        renderer = viz.figure.canvas.get_renderer()
+        renderer.draw_path_collection = lambda *args, **kwargs: calls.append('points')
+        renderer.draw_markers = lambda *args, **kwargs: calls.append('points')
+        viz.context.draw()
+        self.assertFalse(calls)
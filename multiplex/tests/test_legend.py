@@ -550,3 +550,269 @@ class TestLegend(MultiplexTest):
         visual, annotation = viz.legend.draw_line('label')
         self.assertEqual((visual, annotation), viz.legend._contains('label'))
         self.assertEqual(None, viz.legend._contains('another label'))
+
+    @MultiplexTest.temporary_plot
+    def test_virtual_bb_axes_limits_changed_directly(self):
+        """
+        Test that the legend's cached virtual bounding box is invalidated when the axes limits change directly, without passing through the drawable.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.axes.set_ylim((0, 10))
+        viz.legend.draw_line('label')
+        bb = viz.legend.get_virtual_bb()
+
+        viz.axes.set_ylim((0, 20))
+        self.assertAlmostEqual(bb.height * 2, viz.legend.get_virtual_bb().height)
+
+    @MultiplexTest.temporary_plot
+    def test_virtual_bb_cached(self):
+        """
+        Test that the legend's virtual bounding box is cached until the legend changes.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.legend.draw_line('label')
+        bb = viz.legend.get_virtual_bb(transform=viz.axes.transAxes)
+        hits = viz.legend.virtual_bbs.info()['hits']
+        self.assertEqual(bb.bounds, viz.legend.get_virtual_bb(transform=viz.axes.transAxes).bounds)
+        self.assertEqual(hits + 1, viz.legend.virtual_bbs.info()['hits'])
+
+        """
+        Test that adding a new line to the legend invalidates the cached bounding box.
+        """
+        for i in range(0, 20):
+            viz.legend.draw_line(f"label {i}")
+        self.assertGreater(viz.legend.get_virtual_bb(transform=viz.axes.transAxes).y1, bb.y1)
+
+    @MultiplexTest.temporary_plot
+    def test_batch_redraws_once(self):
+        """
+        Test that adding legend annotations in a batch re-draws the drawable only once, when the batch ends.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        redraws = [ ]
+        redraw = viz.redraw
+        viz.redraw = lambda *args, **kwargs: redraws.append(True) or redraw(*args, **kwargs)
+
+        with viz.legend.batch():
+            for i in range(0, 20):
+                viz.legend.draw_line(f"label {i}")
+            self.assertEqual(0, len(redraws))
+        self.assertEqual(1, len(redraws))
+
+        """
+        Test that a batch that adds nothing does not re-draw the drawable.
+        """
+        with viz.legend.batch():
+            viz.legend.draw_line('label 0')
+        self.assertEqual(1, len(redraws))
+
+    @MultiplexTest.temporary_plot
+    def test_batch_nested(self):
+        """
+        Test that nested batches re-draw the drawable only when the outermost batch ends.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        redraws = [ ]
+        redraw = viz.redraw
+        viz.redraw = lambda *args, **kwargs: redraws.append(True) or redraw(*args, **kwargs)
+
+        with viz.legend.batch():
+            with viz.legend.batch():
+                viz.legend.draw_line('A')
+            self.assertEqual(0, len(redraws))
+            viz.legend.draw_line('B')
+        self.assertEqual(1, len(redraws))
+
+    @MultiplexTest.temporary_plot
+    def test_batch_duplicates(self):
+        """
+        Test that a batch does not draw duplicate labels.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        with viz.legend.batch():
+            drawn = viz.legend.draw_line('label')
+            for i in range(0, 10):
+                self.assertEqual(drawn, viz.legend.draw_line('label'))
+        self.assertEqual(1, sum( len(line) for line in viz.legend.lines ))
+
+    @MultiplexTest.temporary_plot
+    def test_batch_same_layout(self):
+        """
+        Test that adding legend annotations in a batch lays them out in the same way as adding them one by one.
+        """
+
+        labels = [ f"label {i}" for i in range(0, 30) ]
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        for label in labels:
+            viz.legend.draw_line(label)
+        expected = [ annotation.get_virtual_bb(transform=viz.axes.transAxes).bounds
+                     for line in viz.legend.lines for _, annotation in line ]
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        with viz.legend.batch():
+            for label in labels:
+                viz.legend.draw_line(label)
+        bounds = [ annotation.get_virtual_bb(transform=viz.axes.transAxes).bounds
+                   for line in viz.legend.lines for _, annotation in line ]
+
+        self.assertEqual(len(expected), len(bounds))
+        for _expected, _bounds in zip(expected, bounds):
+            for e, b in zip(_expected, _bounds):
+                self.assertAlmostEqual(e, b, places=5)
+
+    @MultiplexTest.temporary_plot
+    def test_contains_multiple_lines(self):
+        """
+        Test that the legend finds labels on any line, including labels that moved to a new line.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        drawn = { f"label {i}": viz.legend.draw_line(f"label {i}") for i in range(0, 30) }
+        self.assertGreater(len(viz.legend.lines), 1)
+        self.assertEqual(30, len(viz.legend.entries))
+        for label, (visual, annotation) in drawn.items():
+            self.assertEqual((visual, annotation), viz.legend._contains(label))
+            self.assertEqual(label, str(annotation))
+
+    @MultiplexTest.temporary_plot
+    def test_new_line_point_start(self):
+        """
+        Test that when creating a new line for points, the point moves to the start of the line.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        for label in string.ascii_uppercase:
+            viz.legend.draw_point(label)
+        self.assertGreaterEqual(len(viz.legend.lines), 2)
+
+        for line in viz.legend.lines:
+            point, annotation = line[0]
+            bb = util.get_bb(viz.figure, viz.axes, point, transform=viz.axes.transAxes)
+            self.assertAlmostEqual(0, bb.x0, places=5)
+            self.assertLess(bb.x1, annotation.get_virtual_bb(transform=viz.axes.transAxes).x0)
+
+    @MultiplexTest.temporary_plot
+    def test_legend_params(self):
+        """
+        Test that the legend parameters reflect changes to matplotlib's parameters.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        self.assertEqual({ 'fontsize': plt.rcParams['legend.fontsize'] }, viz.legend._get_legend_params('fontsize'))
+        with plt.rc_context({ 'legend.fontsize': 21 }):
+            self.assertEqual({ 'fontsize': 21 }, viz.legend._get_legend_params('fontsize'))
+        self.assertIn('frameon', viz.legend._get_legend_params())
+
+    @MultiplexTest.temporary_plot
+    def test_max_lines(self):
+        """
+        Test that when the legend has a limited number of lines, the other legend annotations are hidden and counted.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.legend.max_lines = 2
+        drawn = [ viz.legend.draw_line(f"label {i}") for i in range(0, 100) ]
+        self.assertTrue(all(drawn[:10]))
+        self.assertFalse(any(drawn[-10:]))
+
+        shown = [ str(annotation) for line in viz.legend.lines for _, annotation in line ]
+        self.assertLessEqual(len(viz.legend.lines), 3)
+        self.assertEqual(f"+{ len(viz.legend.hidden) } more", shown[-1])
+        self.assertEqual(100, len(shown) - 1 + len(viz.legend.hidden))
+        self.assertEqual(len(shown) - 1, len(viz.legend.entries))
+
+        """
+        Test that hidden labels are only counted when they are added again.
+        """
+        viz.legend.draw_line('label 99')
+        self.assertEqual(2, viz.legend.hidden['label 99'])
+        shown = [ str(annotation) for line in viz.legend.lines for _, annotation in line ]
+        self.assertEqual(1, sum( label.endswith('more') for label in shown ))
+
+    @MultiplexTest.temporary_plot
+    def test_max_lines_no_overlap(self):
+        """
+        Test that the legend annotation that counts hidden legend annotations does not overlap with the rest of the legend.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.legend.max_lines = 1
+        for i in range(0, 50):
+            viz.legend.draw_text_only(f"label {i}")
+
+        annotations = [ annotation for line in viz.legend.lines for _, annotation in line ]
+        for i in range(len(annotations) - 1):
+            bb1 = annotations[i].get_virtual_bb(transform=viz.axes.transAxes)
+            bb2 = annotations[i + 1].get_virtual_bb(transform=viz.axes.transAxes)
+            self.assertFalse(util.overlapping_bb(bb1, bb2))
+        self.assertAlmostEqual(1, viz.legend.get_virtual_bb(transform=viz.axes.transAxes).y0, places=5)
+
+    @MultiplexTest.temporary_plot
+    def test_max_lines_batch_frequency(self):
+        """
+        Test that in a batch, the most frequent labels are drawn when the legend has a limited number of lines.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.legend.max_lines = 1
+        with viz.legend.batch():
+            for i in range(0, 50):
+                self.assertEqual(None, viz.legend.draw_line(f"label {i}"))
+            for i in range(0, 5):
+                viz.legend.draw_line('frequent')
+
+        shown = [ str(annotation) for line in viz.legend.lines for _, annotation in line ]
+        self.assertEqual('frequent', shown[0])
+        self.assertEqual(f"+{ len(viz.legend.hidden) } more", shown[-1])
+        self.assertEqual(51, len(shown) - 1 + len(viz.legend.hidden))
+
+    @MultiplexTest.temporary_plot
+    def test_max_lines_batch_priority(self):
+        """
+        Test that in a batch, the labels with the highest priority are drawn first, even if they are less frequent.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.legend.max_lines = 1
+        with viz.legend.batch():
+            for i in range(0, 5):
+                viz.legend.draw_line('frequent')
+            for i in range(0, 50):
+                viz.legend.draw_line(f"label {i}", priority=1 if i == 49 else 0)
+
+        shown = [ str(annotation) for line in viz.legend.lines for _, annotation in line ]
+        self.assertEqual([ 'label 49', 'frequent' ], shown[:2])
+
+    @MultiplexTest.temporary_plot
+    def test_new_line_shared_offset(self):
+        """
+        Test that outside of a batch, new lines move the legend through its shared offset, not by moving each earlier annotation.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        for label in string.ascii_uppercase:
+            viz.legend.draw_line(label * 10)
+        self.assertGreaterEqual(len(viz.legend.lines), 3)
+
+        """
+        The first line's annotations never move by themselves, but the legend's offset moves them up.
+        """
+        for _, annotation in viz.legend.lines[0]:
+            self.assertTrue(annotation.offset.is_affine)
+            self.assertAlmostEqual(0, annotation.offset.get_matrix()[1, 2])
+        self.assertGreater(viz.legend.offset.get_matrix()[1, 2], 0)
+
+        """
+        The lines do not overlap, and the legend ends at the top of the axes.
+        """
+        bbs = [ max(annotation.get_virtual_bb(transform=viz.axes.transAxes).y0 for _, annotation in line) for line in viz.legend.lines ]
+        for i in range(1, len(bbs)):
+            _, annotation = viz.legend.lines[i][0]
+            self.assertLessEqual(annotation.get_virtual_bb(transform=viz.axes.transAxes).y1, bbs[i - 1] + 1e-5)
+        self.assertAlmostEqual(viz.legend._get_y(transform=viz.axes.transAxes), min(bbs), places=2)
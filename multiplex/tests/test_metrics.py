@@ -0,0 +1,325 @@
+"""
+Unit tests for the :mod:`~metrics` module.
+"""
+
+from matplotlib.font_manager import FontProperties
+from matplotlib.transforms import Affine2D
+import matplotlib.pyplot as plt
+import os
+import sys
+
+path = os.path.join(os.path.dirname(__file__), '..')
+if path not in sys.path:
+    sys.path.insert(1, path)
+
+from .test import MultiplexTest
+from metrics import FontMeasurer, IdentityKey, LRUCache, TextMetrics, get_fontproperties
+import drawable, text_util, util
+
+class TestMetrics(MultiplexTest):
+    """
+    Unit tests for the :mod:`~metrics` module.
+    """
+
+    def test_lru_cache_zero_size(self):
+        """
+        Test that creating a cache that cannot store anything raises a ValueError.
+        """
+
+        self.assertRaises(ValueError, LRUCache, 0)
+
+    def test_lru_cache_hits_misses(self):
+        """
+        Test that the cache counts hits and misses.
+        """
+
+        cache = LRUCache()
+        self.assertEqual(None, cache.get('a'))
+        cache.put('a', 1)
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual({ 'hits': 2, 'misses': 1, 'size': 1, 'maxsize': 4096 }, cache.info())
+
+    def test_lru_cache_evicts_least_recently_used(self):
+        """
+        Test that when the cache is full, the least-recently used entry is evicted.
+        """
+
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(2, len(cache))
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+
+    def test_lru_cache_clear(self):
+        """
+        Test that clearing the cache removes all entries and resets the statistics.
+        """
+
+        cache = LRUCache()
+        cache.put('a', 1)
+        cache.get('a')
+        cache.clear()
+        self.assertEqual({ 'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 4096 }, cache.info())
+
+    def test_identity_key(self):
+        """
+        Test that identity keys are only equal when they refer to the same object, even if other objects are equal in value.
+        """
+
+        first, second = Affine2D(), Affine2D()
+        self.assertEqual(first, second)
+        self.assertEqual(IdentityKey(first), IdentityKey(first))
+        self.assertNotEqual(IdentityKey(first), IdentityKey(second))
+
+        cache = LRUCache()
+        cache.put(IdentityKey(first), 1)
+        self.assertEqual(1, cache.get(IdentityKey(first)))
+        self.assertEqual(None, cache.get(IdentityKey(second)))
+
+    def test_identity_key_collected(self):
+        """
+        Test that once an object is garbage-collected, its key is no longer equal to any other key.
+        """
+
+        transform = Affine2D()
+        key = IdentityKey(transform)
+        del transform
+        self.assertNotEqual(key, key)
+
+    @MultiplexTest.temporary_plot
+    def test_get_extent_equal_window_extent(self):
+        """
+        Test that the cached extent is equivalent to the extent calculated by the renderer.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        metrics = TextMetrics()
+
+        renderer = figure.canvas.get_renderer()
+        for x, y in [ (0, 0), (0.5, 0.25), (0.75, 0.5) ]:
+            token = axes.text(x, y, 'token')
+            bb, expected = metrics.get_extent(figure, token), token.get_window_extent(renderer)
+            self.assertAlmostEqual(expected.x0, bb.x0, 8)
+            self.assertAlmostEqual(expected.y0, bb.y0, 8)
+            self.assertAlmostEqual(expected.x1, bb.x1, 8)
+            self.assertAlmostEqual(expected.y1, bb.y1, 8)
+
+        self.assertEqual(1, metrics.info()['misses'])
+        self.assertEqual(2, metrics.info()['hits'])
+
+    @MultiplexTest.temporary_plot
+    def test_get_extent_style_miss(self):
+        """
+        Test that the same text with a different font is measured again.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        metrics = TextMetrics()
+
+        small = metrics.get_extent(figure, axes.text(0, 0, 'token', fontsize=10))
+        large = metrics.get_extent(figure, axes.text(0, 0, 'token', fontsize=20))
+        self.assertEqual(2, metrics.info()['misses'])
+        self.assertGreater(large.width, small.width)
+
+    @MultiplexTest.temporary_plot
+    def test_get_extent_dpi_miss(self):
+        """
+        Test that the same text is measured again when the DPI changes.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        metrics = TextMetrics()
+
+        token = axes.text(0, 0, 'token')
+        metrics.get_extent(figure, token)
+        figure.set_dpi(figure.dpi * 2)
+        metrics.get_extent(figure, token)
+        self.assertEqual(2, metrics.info()['misses'])
+
+    @MultiplexTest.temporary_plot
+    def test_get_extent_multiline_not_cached(self):
+        """
+        Test that multi-line text is not cached.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        metrics = TextMetrics()
+
+        metrics.get_extent(figure, axes.text(0, 0, 'multi\nline'))
+        self.assertEqual(0, len(metrics.cache))
+
+    @MultiplexTest.temporary_plot
+    def test_get_bb_uses_text_metrics(self):
+        """
+        Test that getting the bounding box of text uses the shared text metrics.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+
+        hits = util.text_metrics.info()['hits']
+        token = axes.text(0, 0, 'shared metrics')
+        util.get_bb(figure, axes, token)
+        util.get_bb(figure, axes, token)
+        self.assertLess(hits, util.text_metrics.info()['hits'])
+
+    @MultiplexTest.temporary_plot
+    def test_measure_width_equal_window_extent(self):
+        """
+        Test that the width measured from the font is equal to the width of the drawn text.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        measurer = FontMeasurer()
+
+        renderer = figure.canvas.get_renderer()
+        for text, style in [ ('token', { }), ('Memphis Depay', { 'fontsize': 14 }),
+                             ('AVAWAY', { 'fontweight': 'bold' }), ('—', { 'fontsize': 'larger' }) ]:
+            bb = axes.text(0, 0, text, **style).get_window_extent(renderer)
+            width, _, _ = measurer.measure(text, get_fontproperties(**style), figure.dpi)
+            self.assertEqual(bb.width, width)
+
+    @MultiplexTest.temporary_plot
+    def test_measure_cached(self):
+        """
+        Test that measuring the same text with the same font re-uses the cached measurement.
+        """
+
+        measurer = FontMeasurer()
+        measurer.measure('token')
+        misses = measurer.info()['misses']
+        self.assertEqual(measurer.measure('token'), measurer.measure('token'))
+        self.assertEqual(misses, measurer.info()['misses'])
+
+    @MultiplexTest.temporary_plot
+    def test_measure_line_height(self):
+        """
+        Test that all text in the same font is at least as tall as a line, regardless of its ascenders and descenders.
+        """
+
+        measurer = FontMeasurer()
+        _, ascent, descent = measurer.measure('lp')
+        for text in [ 'a', 'x', 'o', '' ]:
+            _, _ascent, _descent = measurer.measure(text)
+            self.assertEqual(ascent + descent, _ascent + _descent)
+
+    @MultiplexTest.temporary_plot
+    def test_measure_empty(self):
+        """
+        Test that empty text has no width.
+        """
+
+        width, ascent, descent = FontMeasurer().measure('')
+        self.assertEqual(0, width)
+        self.assertGreater(ascent, 0)
+
+    @MultiplexTest.temporary_plot
+    def test_measure_math(self):
+        """
+        Test that mathematical text is measured.
+        """
+
+        measurer = FontMeasurer()
+        self.assertGreater(measurer.measure('$x^2$')[0], 0)
+        self.assertGreater(measurer.measure('$x^2 + y^2$')[0], measurer.measure('$x^2$')[0])
+
+    @MultiplexTest.temporary_plot
+    def test_get_extent_width_equal_get_bb(self):
+        """
+        Test that the width of the extent is equal to the width of the bounding box of the drawn text.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        measurer = FontMeasurer()
+
+        for transform in [ axes.transData, axes.transAxes ]:
+            token = axes.text(0, 0, 'token', transform=transform)
+            bb = util.get_bb(figure, axes, token, transform=transform)
+            extent = measurer.get_extent('token', transform, dpi=figure.dpi)
+            self.assertEqual(bb.width, extent.width)
+
+    @MultiplexTest.temporary_plot
+    def test_get_extent_alignment(self):
+        """
+        Test that the extent considers the text's alignment.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        measurer = FontMeasurer()
+
+        left = measurer.get_extent('token', axes.transAxes, dpi=figure.dpi, position=(0.5, 0.5), ha='left', va='bottom')
+        self.assertEqual(0.5, round(left.x0, 10))
+        self.assertEqual(0.5, round(left.y0, 10))
+
+        right = measurer.get_extent('token', axes.transAxes, dpi=figure.dpi, position=(0.5, 0.5), ha='right', va='top')
+        self.assertEqual(0.5, round(right.x1, 10))
+        self.assertEqual(0.5, round(right.y1, 10))
+
+        center = measurer.get_extent('token', axes.transAxes, dpi=figure.dpi, position=(0.5, 0.5), ha='center', va='center')
+        self.assertEqual(0.5, round((center.x0 + center.x1) / 2., 10))
+        self.assertEqual(0.5, round((center.y0 + center.y1) / 2., 10))
+
+    @MultiplexTest.temporary_plot
+    def test_get_extent_invalid_alignment(self):
+        """
+        Test that an unsupported alignment raises a ValueError.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        measurer = FontMeasurer()
+        self.assertRaises(ValueError, measurer.get_extent, 'token', viz.axes.transAxes, ha='top')
+        self.assertRaises(ValueError, measurer.get_extent, 'token', viz.axes.transAxes, va='left')
+
+    def test_get_fontproperties(self):
+        """
+        Test that the font properties are created from the text style, ignoring other styling options.
+        """
+
+        fontproperties = get_fontproperties(fontsize=20, fontweight='bold', style='italic', color='red')
+        self.assertEqual(20, fontproperties.get_size_in_points())
+        self.assertEqual('bold', fontproperties.get_weight())
+        self.assertEqual('italic', fontproperties.get_style())
+
+    def test_get_fontproperties_font(self):
+        """
+        Test that the font can be given as font properties, a dictionary or a pattern, and that the given font properties are not changed.
+        """
+
+        font = FontProperties(size=12, weight='bold')
+        fontproperties = get_fontproperties(fontproperties=font, fontsize=20)
+        self.assertEqual(20, fontproperties.get_size_in_points())
+        self.assertEqual('bold', fontproperties.get_weight())
+        self.assertEqual(12, font.get_size_in_points())
+
+        fontproperties = get_fontproperties(font={ 'size': 14, 'style': 'italic' })
+        self.assertEqual(14, fontproperties.get_size_in_points())
+        self.assertEqual('italic', fontproperties.get_style())
+
+        fontproperties = get_fontproperties(font_properties='serif:size=16')
+        self.assertEqual(16, fontproperties.get_size_in_points())
+        self.assertEqual([ 'serif' ], fontproperties.get_family())
+
+    @MultiplexTest.temporary_plot
+    def test_spacing_does_not_draw(self):
+        """
+        Test that calculating the line spacing and word spacing does not add text to the axes.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+        texts = len(axes.texts)
+        text_util.get_linespacing(figure, axes, fontsize=14)
+        text_util.get_wordspacing(figure, axes, fontsize=14)
+        self.assertEqual(texts, len(axes.texts))
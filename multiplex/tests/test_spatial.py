@@ -0,0 +1,192 @@
+"""
+Unit tests for the :mod:`~spatial` module.
+"""
+
+import os
+import sys
+
+path = os.path.join(os.path.dirname(__file__), '..')
+if path not in sys.path:
+    sys.path.insert(1, path)
+
+from .test import MultiplexTest
+from spatial import GridIndex
+
+class TestSpatial(MultiplexTest):
+    """
+    Unit tests for the :mod:`~spatial` module.
+    """
+
+    def test_zero_cell_size(self):
+        """
+        Test that creating an index with cells that have no size raises a ValueError.
+        """
+
+        self.assertRaises(ValueError, GridIndex, 0)
+        self.assertRaises(ValueError, GridIndex, -1)
+
+    def test_insert_not_finite(self):
+        """
+        Test that inserting extents that are not finite raises a ValueError.
+        """
+
+        index = GridIndex()
+        self.assertRaises(ValueError, index.insert, 'a', (0, 0, float('nan'), 1))
+        self.assertRaises(ValueError, index.insert, 'a', (0, 0, float('inf'), 1))
+        self.assertEqual(0, len(index))
+
+    def test_query(self):
+        """
+        Test that querying the index returns only the components that intersect with the extents.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        index.insert('b', (20, 20, 25, 25))
+        index.insert('c', (4, 4, 30, 6))
+        self.assertEqual([ 'a', 'c' ], index.query((1, 1, 4.5, 4.5)))
+        self.assertEqual([ 'b', 'c' ], index.query((22, 5, 23, 22)))
+        self.assertEqual([ ], index.query((100, 100, 110, 110)))
+
+    def test_query_touching(self):
+        """
+        Test that components that only touch the extents are returned.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        self.assertEqual([ 'a' ], index.query((5, 5, 10, 10)))
+
+    def test_query_reversed_extents(self):
+        """
+        Test that the extents may be given with the higher coordinates first.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (5, 5, 0, 0))
+        self.assertEqual((0, 0, 5, 5), index.get('a'))
+        self.assertEqual([ 'a' ], index.query((4, 4, 1, 1)))
+
+    def test_query_negative_coordinates(self):
+        """
+        Test that components with negative coordinates are indexed.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (-25, -25, -15, -15))
+        self.assertEqual([ 'a' ], index.query((-20, -20, -19, -19)))
+        self.assertEqual([ ], index.query((15, 15, 25, 25)))
+
+    def test_insert_again_updates(self):
+        """
+        Test that inserting a key again updates its extents.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        index.insert('a', (50, 50, 55, 55))
+        self.assertEqual(1, len(index))
+        self.assertEqual([ ], index.query((0, 0, 5, 5)))
+        self.assertEqual([ 'a' ], index.query((50, 50, 55, 55)))
+
+    def test_remove(self):
+        """
+        Test that removed components are no longer returned, and that removing a missing key does nothing.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        index.remove('a')
+        index.remove('b')
+        self.assertFalse('a' in index)
+        self.assertEqual([ ], index.query((0, 0, 5, 5)))
+
+    def test_clear(self):
+        """
+        Test that clearing the index removes all components.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        index.insert('b', (10, 10, 15, 15))
+        index.clear()
+        self.assertEqual(0, len(index))
+        self.assertEqual([ ], index.query((0, 0, 15, 15)))
+
+    def test_nearest(self):
+        """
+        Test that the nearest components are returned from the closest to the farthest.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 1, 1))
+        index.insert('b', (100, 100, 101, 101))
+        index.insert('c', (30, 0, 31, 1))
+        self.assertEqual([ 'a' ], index.nearest((0.5, 0.5)))
+        self.assertEqual([ 'c' ], index.nearest((29, 0)))
+        self.assertEqual([ 'c', 'a', 'b' ], index.nearest((40, 0), 3))
+        self.assertEqual([ 'b' ], index.nearest((200, 200)))
+
+    def test_nearest_more_than_size(self):
+        """
+        Test that when asking for more components than the index has, all components are returned.
+        """
+
+        index = GridIndex(cell_size=10)
+        self.assertEqual([ ], index.nearest((0, 0)))
+        index.insert('a', (0, 0, 1, 1))
+        index.insert('b', (50, 50, 51, 51))
+        self.assertEqual([ 'a', 'b' ], index.nearest((0, 0), 5))
+
+    def test_insert_segment_cells(self):
+        """
+        Test that a segment only covers the cells that it passes through, and that it is found in them.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert_segment('a', (0, 0, 100, 100))
+        self.assertLessEqual(len(index._cells), 21)
+        self.assertEqual([ 'a' ], index.query((45, 45, 46, 46)))
+        self.assertEqual([ 'a' ], index.query((95, 95, 96, 96)))
+        self.assertEqual([ ], index.query((85, 5, 95, 15)))
+        self.assertEqual((0, 0, 100, 100), index.get('a'))
+
+    def test_insert_segment_reversed(self):
+        """
+        Test that a segment covers the same cells regardless of its direction, even with negative coordinates.
+        """
+
+        index = GridIndex(cell_size=10)
+        self.assertEqual(set(index._get_segment_cells((-35, 12, 47, -8))),
+                         set(index._get_segment_cells((47, -8, -35, 12))))
+        self.assertEqual([ (0, 0) ], index._get_segment_cells((1, 1, 2, 2)))
+
+    def test_insert_segment_not_finite(self):
+        """
+        Test that inserting a segment that is not finite raises a ValueError.
+        """
+
+        index = GridIndex(cell_size=10)
+        self.assertRaises(ValueError, index.insert_segment, 'a', (0, 0, float('inf'), 1))
+
+    def test_remove_segment(self):
+        """
+        Test that removing a segment removes it from all of the cells that it covers.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert_segment('a', (0, 0, 100, 30))
+        index.insert('a', (0, 0, 5, 5))
+        self.assertEqual([ ], index.query((95, 25, 96, 26)))
+        index.remove('a')
+        self.assertFalse(index._cells)
+
+    def test_nearest_segment(self):
+        """
+        Test that the distance to a segment is the distance to the segment, not to its extents.
+        """
+
+        index = GridIndex(cell_size=10)
+        index.insert_segment('a', (0, 0, 100, 100))
+        index.insert('b', (80, 10, 81, 11))
+        self.assertEqual([ 'b', 'a' ], index.nearest((90, 10), 2))
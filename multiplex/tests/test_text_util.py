@@ -66,3 +66,83 @@ class TestUtil(MultiplexTest):
         token = axes.text(0, 0, '—', bbox=style)
         bb = util.get_bb(figure, axes, token)
         self.assertEqual(wordspacing, bb.width / 4.)
+
+    def test_layout_breaks_lines(self):
+        """
+        Test that the layout breaks tokens into a new line when they exceed the x-limit.
+        """
+
+        lines, positions, spaces = text_util.layout([ 3, 3, 3, 3 ], (0, 10), 0, 1, 2)
+        self.assertEqual([ [ 0, 1 ], [ 2, 3 ] ], lines)
+        self.assertEqual([ (0, 0), (4, 0), (0, -2), (4, -2) ], positions)
+        self.assertEqual([ 1, 1 ], spaces)
+
+    def test_layout_long_token(self):
+        """
+        Test that a token that is wider than the line is still drawn on its own line.
+        """
+
+        lines, _, _ = text_util.layout([ 3, 20, 3 ], (0, 10), 0, 1, 2)
+        self.assertEqual([ [ 0 ], [ 1 ], [ 2 ] ], lines)
+
+    def test_layout_not_breakable(self):
+        """
+        Test that tokens that are not breakable never start a new line.
+        """
+
+        lines, _, _ = text_util.layout([ 3, 3, 3, 1 ], (0, 10), 0, 1, 2, breakable=[ True, True, True, False ])
+        self.assertEqual([ [ 0, 1 ], [ 2, 3 ] ], lines)
+        lines, _, _ = text_util.layout([ 3, 3, 1 ], (0, 6), 0, 1, 2, breakable=[ True, True, False ])
+        self.assertEqual([ [ 0 ], [ 1, 2 ] ], lines)
+
+    def test_layout_empty(self):
+        """
+        Test that laying out no tokens creates one empty line.
+        """
+
+        lines, positions, _ = text_util.layout([ ], (0, 10), 0, 1, 2)
+        self.assertEqual([ [ ] ], lines)
+        self.assertEqual([ ], positions)
+
+    def test_layout_va_bottom(self):
+        """
+        Test that when the vertical alignment is bottom, the last line is at the given y-coordinate and the rest go up.
+        """
+
+        _, positions, _ = text_util.layout([ 3, 3, 3, 3, 3 ], (0, 10), 5, 1, 2, va='bottom')
+        self.assertEqual([ 9, 9, 7, 7, 5 ], [ y for _, y in positions ])
+
+    def test_layout_right(self):
+        """
+        Test that right-aligned lines end at the x-limit.
+        """
+
+        _, positions, _ = text_util.layout([ 3, 3, 3 ], (0, 10), 0, 1, 2, align='right')
+        self.assertEqual([ 3, 7, 7 ], [ x for x, _ in positions ])
+
+    def test_layout_center(self):
+        """
+        Test that centered lines have the same space on both sides.
+        """
+
+        _, positions, _ = text_util.layout([ 3, 3, 3 ], (0, 10), 0, 1, 2, align='center')
+        self.assertEqual([ 1.5, 5.5, 3.5 ], [ x for x, _ in positions ])
+
+    def test_layout_justify(self):
+        """
+        Test that justified lines fill the entire width, except for the last line.
+        """
+
+        lines, positions, spaces = text_util.layout([ 3, 3, 3 ], (0, 10), 0, 1, 2, align='justify')
+        self.assertEqual([ 0, 7, 0 ], [ x for x, _ in positions ])
+        self.assertEqual([ 4, 1 ], spaces)
+
+        _, positions, _ = text_util.layout([ 3, 3, 3 ], (0, 10), 0, 1, 2, align='justify-end')
+        self.assertEqual([ 0, 7, 7 ], [ x for x, _ in positions ])
+
+    def test_layout_unsupported_alignment(self):
+        """
+        Test that an unsupported alignment raises a ValueError.
+        """
+
+        self.assertRaises(ValueError, text_util.layout, [ 3 ], (0, 10), 0, 1, 2, align='top')
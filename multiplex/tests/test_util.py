@@ -380,3 +380,162 @@ class TestUtil(MultiplexTest):
 
         bb = util.get_scatter_bb(figure, axes, point, transform=axes.transData)
         self.assertEqual(round(radius, 10), round(bb.height / 2, 10))
+
+    @MultiplexTest.temporary_plot
+    def test_get_bbs_equal_get_bb(self):
+        """
+        Test that the bounding boxes returned in bulk are equal to the bounding boxes returned one by one.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+
+        components = [ viz.text(0, 0, 'token'), viz.scatter(0.5, 0.5, s=100), viz.plot([ 0, 1 ], [ 0, 2 ])[0] ]
+        viz.set_xlim((-1, 2))
+        viz.set_ylim((-1, 3))
+        bbs = util.get_bbs(figure, axes, components)
+        self.assertEqual((3, 4), bbs.shape)
+        for component, bb in zip(components, bbs):
+            self.assertTrue(all( round(expected, 10) == round(actual, 10)
+                                 for expected, actual in zip(util.get_bb(figure, axes, component).extents, bb) ))
+
+    @MultiplexTest.temporary_plot
+    def test_get_bbs_empty(self):
+        """
+        Test that getting the bounding boxes of no components returns an empty array.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        self.assertEqual((0, 4), util.get_bbs(viz.figure, viz.axes, [ ]).shape)
+
+    @MultiplexTest.temporary_plot
+    def test_get_bbs_scatter_multiple_points(self):
+        """
+        Test that the bounding box of a scatter with multiple points covers all of the points.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 5)))
+        figure, axes = viz.figure, viz.axes
+
+        s = 100
+        points = viz.scatter([ 0, 1, 2 ], [ 1, 3, 2 ], s=s)
+        viz.set_xlim((-1, 3))
+        viz.set_ylim((0, 4))
+        origin = axes.transData.inverted().transform((0, 0))
+        radius = (axes.transData.inverted().transform((s ** 0.5, 0))[0] - origin[0])/2.
+
+        x0, y0, x1, y1 = util.get_bbs(figure, axes, [ points ])[0]
+        self.assertEqual(round(0 - radius, 10), round(x0, 10))
+        self.assertEqual(round(2 + radius, 10), round(x1, 10))
+        self.assertLess(y0, 1)
+        self.assertGreater(y1, 3)
+
+    def test_union_bbs(self):
+        """
+        Test that the union of bounding boxes covers all of them.
+        """
+
+        bbs = [ (0, 1, 2, 3), (-1, 2, 1, 5), (1, 0, 4, 1) ]
+        self.assertEqual([ -1, 0, 4, 5 ], list(util.union_bbs(bbs)))
+
+    def test_translate_bbs(self):
+        """
+        Test that translating bounding boxes moves all of their coordinates.
+        """
+
+        bbs = [ (0, 1, 2, 3), (-1, 2, 1, 5) ]
+        self.assertEqual([ [ 1, -1, 3, 1 ], [ 0, 0, 2, 3 ] ], util.translate_bbs(bbs, 1, -2).tolist())
+
+    def test_overlapping_bbs_equal_overlapping_bb(self):
+        """
+        Test that checking for overlaps in bulk is equivalent to checking for overlaps one pair at a time.
+        """
+
+        bbs = [ (0, 0, 1, 1), (2, 2, 3, 3), (0.5, 0.5, 1.5, 1.5), (0, 0, 1, 1),
+                (1, 0, 0, 1), (1, 1, 2, 2), (0.25, 0.25, 0.75, 0.75), (-1, 0.5, 5, 0.75) ]
+        overlapping = util.overlapping_bbs(bbs)
+        self.assertEqual((len(bbs), len(bbs)), overlapping.shape)
+        for i, bb1 in enumerate(bbs):
+            for j, bb2 in enumerate(bbs):
+                expected = util.overlapping_bb(Bbox.from_extents(*bb1), Bbox.from_extents(*bb2))
+                self.assertEqual(expected, overlapping[i, j])
+
+    def test_overlapping_groups(self):
+        """
+        Test that overlapping bounding boxes are grouped together, including bounding boxes that overlap through another bounding box.
+        """
+
+        bbs = [ (0, 4, 1, 5), (0, 0, 1, 1), (0, 0.5, 1, 1.5), (0, 1.25, 1, 2.25), (0, 10, 1, 11), (0, 4.5, 1, 5.5) ]
+        self.assertEqual([ [ 1, 2, 3 ], [ 0, 5 ] ], util.overlapping_groups(bbs))
+
+    def test_overlapping_groups_no_overlaps(self):
+        """
+        Test that bounding boxes that do not overlap are not grouped.
+        """
+
+        bbs = [ (0, 0, 1, 1), (0, 1, 1, 2), (2, 0, 3, 1) ]
+        self.assertEqual([ ], util.overlapping_groups(bbs))
+        self.assertEqual([ ], util.overlapping_groups([ ]))
+
+    def test_overlapping_groups_equal_overlapping_bbs(self):
+        """
+        Test that the groups are the connected components of the overlap matrix.
+        """
+
+        bbs = [ (0, 0, 1, 1), (2, 2, 3, 3), (0.5, 0.5, 1.5, 1.5), (0, 0, 1, 1),
+                (1, 0, 0, 1), (1, 1, 2, 2), (0.25, 0.25, 0.75, 0.75), (-1, 0.5, 5, 0.75),
+                (2.5, 2.5, 2.75, 2.75), (4, 0, 5, 1) ]
+        overlapping = util.overlapping_bbs(bbs)
+        groups = util.overlapping_groups(bbs)
+        group = { i: j for j, members in enumerate(groups) for i in members }
+        for i in range(len(bbs)):
+            for j in range(len(bbs)):
+                if i != j and (overlapping[i, j] or overlapping[j, i]):
+                    self.assertEqual(group[i], group[j])
+
+        for members in groups:
+            self.assertTrue(all( any( overlapping[i, j] or overlapping[j, i] for j in members if j != i ) for i in members ))
+
+    def test_overlapping_groups_indices(self):
+        """
+        Test that when indices are given, overlaps between other bounding boxes are ignored.
+        """
+
+        bbs = [ (0, 0, 1, 1), (0, 0.5, 1, 1.5), (0, 5, 1, 6), (0, 5.5, 1, 6.5), (0, 6, 1, 7) ]
+        self.assertEqual([ [ 2, 3, 4 ] ], util.overlapping_groups(bbs, [ 3 ]))
+        self.assertEqual([ [ 2, 3 ] ], util.overlapping_groups(bbs, [ 2 ]))
+
+    def test_distribute_no_overlaps(self):
+        """
+        Test that intervals that do not overlap are not moved.
+        """
+
+        self.assertEqual([ -0.5, 1.5, 4 ], util.distribute([ 0, 2, 5 ], [ 1, 1, 2 ]).tolist())
+
+    def test_distribute_overlaps(self):
+        """
+        Test that overlapping intervals are stacked around the mean of their positions, keeping their order.
+        """
+
+        self.assertEqual([ -0.5, 0.5, 1.5 ], util.distribute([ 1, 1, 1 ], [ 1, 1, 1 ]).tolist())
+        self.assertEqual([ 1.75, 0.75, -0.25 ], util.distribute([ 1.5, 1.25, 1 ], [ 1, 1, 1 ]).tolist())
+
+    def test_distribute_bounds(self):
+        """
+        Test that the intervals are distributed within the given bounds.
+        """
+
+        self.assertEqual([ 0, 1 ], util.distribute([ 0, 0 ], [ 1, 1 ], lower=0).tolist())
+        self.assertEqual([ 8, 9 ], util.distribute([ 10, 10 ], [ 1, 1 ], upper=10).tolist())
+
+        """
+        Test that when the intervals do not fit, they are centered between the bounds.
+        """
+        self.assertEqual([ -0.5, 0.5 ], util.distribute([ 0, 0 ], [ 1, 1 ], lower=0, upper=1).tolist())
+
+    def test_distribute_empty(self):
+        """
+        Test that distributing no intervals returns an empty array.
+        """
+
+        self.assertEqual([ ], util.distribute([ ], [ ]).tolist())
@@ -30,9 +30,10 @@ import os
 import string
 import sys
 
-from matplotlib.transforms import Bbox
+from matplotlib.transforms import Affine2D, Bbox
 
 sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(__file__)), '..'))
+from metrics import IdentityKey, LRUCache, font_measurer, get_fontproperties
 import text_util
 import util
 from visualization import Visualization
@@ -49,6 +50,12 @@ class Annotation(Visualization):
     In addition to the drawn tokens, the annotation stores the original annotation, position and style.
     This information is used when the annotation is re-drawn.
 
+    All of the tokens are drawn through one shared translation, the ``offset``.
+    Moving the annotation only updates this translation, so the cost of moving an annotation does not depend on how many tokens it has.
+
+    The annotation caches its virtual bounding box for each transformation in the ``virtual_bbs`` instance variable.
+    The cached bounding boxes remain valid until the annotation is drawn, moved or removed, or until the figure's layout changes.
+
     :ivar drawable: The :class:`~drawable.Drawable` where the time series visualization will be drawn.
     :vartype drawable: :class:`~drawable.Drawable`
     :ivar lines: The lines drawn by the annotation.
@@ -63,8 +70,20 @@ class Annotation(Visualization):
     :vartype_: float
     :ivar style: The general style of the annotation.
     :vartype style: dict
+    :ivar offset: The translation applied to all tokens, in terms of the tokens' transformation.
+                  Initially, the offset does not move the tokens.
+    :vartype offset: :class:`matplotlib.transforms.Affine2D`
+    :ivar virtual_bbs: The cache of virtual bounding boxes.
+                       Its :func:`~metrics.LRUCache.info` function returns the cache's hit and miss statistics.
+    :vartype virtual_bbs: :class:`~metrics.LRUCache`
+
+    :cvar POOL_SIZE: The maximum number of hidden tokens of each style that the annotation keeps to re-use when it is re-drawn.
+                     Any other tokens that are no longer needed are removed from the plot.
+    :vartype POOL_SIZE: int
     """
 
+    POOL_SIZE = 16
+
     def __init__(self, drawable, annotation, x, y, wordspacing=None,
                  lineheight=1.25, align='left', va='top', pad=0, *args, **kwargs):
         """
@@ -160,6 +179,11 @@ class Annotation(Visualization):
                        'align': align, 'va': va, 'pad': pad, **kwargs }
 
         self.lines = [ ]
+        self.offset = Affine2D()
+        self._transform = None
+        self._styles, self._pool = { }, { }
+        self.virtual_bbs = LRUCache(maxsize=8)
+        self._version = 0
 
     def draw(self, *args, **kwargs):
         """
@@ -170,6 +194,12 @@ class Annotation(Visualization):
         :rtype: list of :class:`matplotlib.text.Text`
         """
 
+        """
+        Validate the layout context once, at the start of the layout pass.
+        The cached measurements are keyed by the context's generation, so they are not validated again individually.
+        """
+        self.drawable.context.validate()
+
         x, y = self.x, self.y
         if type(self.x) is not tuple and type(self.x) is not list: # TODO: make iterable instead
             x = (self.x, self.drawable.axes.get_xlim()[1])
@@ -187,6 +217,7 @@ class Annotation(Visualization):
 
         tokens = self._draw_tokens(tokens, x, y, wordspacing, lineheight, align, va, **style) # send whatever remains as the tokens' style
         self.lines.extend(tokens)
+        self._invalidate()
 
         # if the vertical alignment is meant to be centered, center the annotation now.
         if va == 'center':
@@ -200,6 +231,14 @@ class Annotation(Visualization):
         This is called a virtual bounding box because it is not a real bounding box.
         Rather, it is the smallest rectangular bounding box that covers all of the bounding boxes of the :class:`~Annotation`'s tokens.
 
+        The bounding box is cached for each transformation.
+        The cached bounding box is re-used until the annotation is drawn, moved or removed, or until the axes limits or the figure size change.
+
+        .. note::
+
+            If you move the annotation's tokens yourself, the cached bounding box does not reflect the change.
+            Use the :func:`~Annotation.set_position` function to move the annotation instead.
+
         :param transform: The bounding box transformation.
                           If `None` is given, the data transformation is used.
         :type transform: None or :class:`matplotlib.transforms.TransformNode`
@@ -212,28 +251,39 @@ class Annotation(Visualization):
         axes = self.drawable.axes
 
         transform = axes.transData if transform is None else transform
-        renderer = figure.canvas.get_renderer()
 
         """
-        Go through all the lines and their tokens and get their bounding boxes.
-        Compare them with the virtual bounding box and update it as need be.
+        Get the bounding boxes of all the tokens in all the lines.
+        The virtual bounding box is the union of these bounding boxes.
         """
-        x0, y0, x1, y1 = None, None, None, None
-        for line in self.lines:
-            for token in line:
-                bb = util.get_bb(figure, axes, token, transform)
-                x0 = bb.x0 if x0 is None or bb.x0 < x0 else x0
-                y0 = bb.y0 if y0 is None or bb.y0 < y0 else y0
-                x1 = bb.x1 if x1 is None or bb.x1 > x1 else x1
-                y1 = bb.y1 if y1 is None or bb.y1 > y1 else y1
+        tokens = [ token for line in self.lines for token in line ]
+        if not tokens:
+            return Bbox(((None, None), (None, None)))
 
+        """
+        The cache key includes the layout context's generation, which changes when the axes limits or the figure size change.
+        The context is validated first, which is cheap, so the bounding box follows any change to the figure.
+        Within a frozen layout pass, the validation is skipped altogether.
+        The key also includes the annotation's version, which changes when the annotation is drawn, moved or removed.
+        """
+        context = self.drawable.context
+        context.validate()
+        key = (IdentityKey(transform), context.generation, self._version)
+        cached = self.virtual_bbs.get(key)
+        if cached is None:
+            bbs = util.get_bbs(figure, axes, tokens, transform, context=context)
+            cached = tuple(util.union_bbs(bbs))
+            self.virtual_bbs.put(key, cached)
+
+        x0, y0, x1, y1 = cached
         return Bbox(((x0, y0), (x1, y1)))
 
     def set_position(self, position, ha='left', va='top', transform=None,
                      *args, **kwargs):
         """
         Move the annotation to the given position.
-        This function moves all of the tokens stored in the ``lines`` instance variable to its new position.
+        This function moves all of the tokens stored in the ``lines`` instance variable to its new position by updating the shared ``offset``.
+        Therefore the tokens keep their original positions, but they are drawn elsewhere.
 
         .. warning::
 
@@ -264,17 +314,21 @@ class Annotation(Visualization):
         figure = self.drawable.figure
         axes = self.drawable.axes
 
+        if not self.lines:
+            return
+
         """
         Calculate the x-offset by which every token needs to be moved.
         The offset depends on the horizontal alignment.
         """
+        transform = axes.transData if transform is None else transform
         bb = self.get_virtual_bb(transform=transform)
         if ha == 'left':
-            offset_x = bb.x0 - position[0]
+            x = bb.x0
         elif ha == 'center':
-            offset_x = (bb.x0 + bb.x1) / 2. - position[0]
+            x = (bb.x0 + bb.x1) / 2.
         elif ha == 'right':
-            offset_x = bb.x1 - position[0]
+            x = bb.x1
         else:
             raise ValueError(f"Unsupported horizontal alignment: {ha}")
 
@@ -283,31 +337,52 @@ class Annotation(Visualization):
         The offset depends on the vertical alignment.
         """
         if va == 'top':
-            offset_y = bb.y1 - position[1]
+            y = bb.y1
         elif va == 'center':
-            offset_y = (bb.y1 + bb.y0) / 2. - position[1]
+            y = (bb.y1 + bb.y0) / 2.
         elif va == 'bottom':
-            offset_y = bb.y0 - position[1]
+            y = bb.y0
         else:
             raise ValueError(f"Unsupported vertical alignment: {va}")
 
-        offset = (offset_x, offset_y)
+        """
+        The tokens may have been drawn with a different transformation than the one given.
+        In that case, the offset is converted to the tokens' transformation through display coordinates.
+        Finally, all tokens are moved at once by updating the shared offset.
+        """
+        if transform is self._transform:
+            offset_x, offset_y = position[0] - x, position[1] - y
+        else:
+            (x0, y0), (x1, y1) = self.drawable.context.inverted(self._transform).transform(
+                                    transform.transform(((x, y), position)))
+            offset_x, offset_y = x1 - x0, y1 - y0
+
+        self.offset.translate(offset_x, offset_y)
 
-        # go through each token and move them individually.
-        for line in self.lines:
-            for token in line:
-                bb = util.get_bb(figure, axes, token, transform=transform)
-                if va == 'top':
-                    token.set_position((bb.x0 - offset[0], bb.y1 - offset[1]))
-                elif va == 'center':
-                    token.set_position((bb.x0 - offset[0], bb.y1 - offset[1]))
-                elif va == 'bottom':
-                    token.set_position((bb.x0 - offset[0], bb.y0 - offset[1]))
+        """
+        Moving the annotation translates its bounding box in terms of the tokens' transformation by the same offset.
+        If that transformation is affine, the cached bounding box is moved as well instead of being measured again.
+        Like the bounding box lookups, moving the annotation validates the layout context first.
+        """
+        context = self.drawable.context
+        context.validate()
+        key = (IdentityKey(self._transform), context.generation, self._version)
+        cached = self.virtual_bbs.get(key) if key in self.virtual_bbs else None
+        self._invalidate()
+        if cached is not None and self._transform.is_affine:
+            x0, y0, x1, y1 = cached
+            self.virtual_bbs.put((IdentityKey(self._transform), context.generation, self._version),
+                                 (x0 + offset_x, y0 + offset_y, x1 + offset_x, y1 + offset_y))
 
     def redraw(self):
         """
         Re-draw the annotation.
-        This function re-constructs the entire annotation from scratch.
+        This function re-calculates the entire layout from scratch.
+
+        The tokens that have already been drawn are re-used instead of being created again.
+        If the text and style of the annotation did not change, the same tokens are simply moved to their new positions.
+        A few of the tokens that are no longer needed are hidden and kept in a pool, from which they can be re-used later.
+        The rest are removed from the plot.
 
         This function should be called if the axes change as the text tokens could end up overlapping.
 
@@ -317,20 +392,57 @@ class Annotation(Visualization):
         """
 
         super().redraw()
-        self.remove()
-        return self.draw()
+
+        """
+        Move all tokens to the pool, in reverse so that they are re-used in the same order.
+        Then, reset the annotation and draw it again.
+        """
+        for line in self.lines[::-1]:
+            for token in line[::-1]:
+                self._pool.setdefault(self._styles.pop(token), [ ]).append(token)
+
+        self.lines = [ ]
+        self.offset.clear()
+        self._invalidate()
+        lines = self.draw()
+
+        """
+        Hide the tokens that were not re-used, keeping at most a few of each style in the pool.
+        Tokens are re-used from the end of the pool, so the surplus tokens are removed from its start.
+        """
+        for key, tokens in list(self._pool.items()):
+            surplus = max(len(tokens) - self.POOL_SIZE, 0)
+            for token in tokens[:surplus]:
+                token.remove()
+            for token in tokens[surplus:]:
+                token.set_visible(False)
+
+            if surplus == len(tokens):
+                del self._pool[key]
+            else:
+                self._pool[key] = tokens[surplus:]
+
+        return lines
 
     def remove(self):
         """
         Remove all tokens in the annotation from the visualization.
-        This function removes all of the :class:`~Annotation`'s text from the plot and then empties the lines.
+        This function removes all of the :class:`~Annotation`'s text from the plot, including any pooled tokens, and then empties the lines.
+        It also resets the ``offset`` so that the next time that the annotation is drawn, it starts from its original position.
         """
 
         for line in self.lines:
             for token in line:
                 token.remove()
 
+        for tokens in self._pool.values():
+            for token in tokens:
+                token.remove()
+
         self.lines = [ ]
+        self.offset.clear()
+        self._styles, self._pool = { }, { }
+        self._invalidate()
 
     def _draw_tokens(self, tokens, x, y, wordspacing, lineheight, align, va,
                      transform=None, *args, **kwargs):
@@ -377,122 +489,127 @@ class Annotation(Visualization):
         axes = self.drawable.axes
         transform = transform if transform is not None else axes.transData
 
-        wordspacing = wordspacing if wordspacing is not None else text_util.get_wordspacing(figure, axes, transform=transform, *args, **kwargs)
-        linespacing = text_util.get_linespacing(figure, axes, wordspacing, transform=transform, *args, **kwargs) * lineheight
+        context = self.drawable.context
+        wordspacing = wordspacing if wordspacing is not None else text_util.get_wordspacing(figure, axes, transform=transform, context=context, *args, **kwargs)
+        linespacing = text_util.get_linespacing(figure, axes, wordspacing, transform=transform, context=context, *args, **kwargs) * lineheight
+
+        """
+        Measure the tokens and calculate the layout before drawing anything.
+        If the vertical alignment is top, the annotation grows downwards: one line after the other.
+        If the vertical alignment is bottom, the annotation grows upwards: new lines push previous lines up.
+        Lines do not break on punctuation marks.
+
+        Note that the center alignment is not considered here.
+        There is no way of knowing how many lines there will be in advance.
+        Therefore lines are centered at a later stage.
+        """
+        va = 'top' if va == 'center' else va
+        widths = self._measure_tokens(tokens, x[0], y, transform, **kwargs)
+        breakable = [ token.get('text') not in string.punctuation for token in tokens ]
+        lines, positions, spaces = text_util.layout(widths, x, y, wordspacing, linespacing,
+                                                    align=align, va=va, breakable=breakable)
+
+        """
+        Draw each token once, directly at its final position.
+        The padding around each token is half the space between the tokens of its line.
+        """
+        drawn_lines = [ ]
+        for line, space in zip(lines, spaces):
+            drawn_line = [ ]
+            for i in line:
+                """
+                Re-use a pooled token with the same style if there is one.
+                Otherwise, draw a new token.
+                """
+                key = (va, self._get_style_key({ **kwargs, **tokens[i].get('style', { }) }))
+                if self._pool.get(key):
+                    text = self._pool[key].pop()
+                    text.set_text(tokens[i].get('text'))
+                    text.set_position(positions[i])
+                    text.get_bbox_patch().set_boxstyle('square', pad=text_util.get_pad(axes, space, transform, context=context))
+                    text.set_visible(True)
+                else:
+                    text = text_util.draw_token(figure, axes, tokens[i].get('text'), *positions[i],
+                                                tokens[i].get('style', { }), space, context=context, va=va,
+                                                transform=transform, *args, **kwargs)
+                self._styles[text] = key
+                drawn_line.append(text)
+            drawn_lines.append(drawn_line)
+
+        """
+        Finally, route all tokens through the shared offset so that they can be moved together.
+        """
+        self._transform = transform
+        transform = self.offset + transform
+        for line in drawn_lines:
+            for token in line:
+                token.set_transform(transform)
 
+        return drawn_lines
+
+    def _measure_tokens(self, tokens, x, y, transform, *args, **kwargs):
         """
-        Go through each token and draw it on the axes.
+        Measure the width of each token, without drawing it.
+
+        :param tokens: The text tokens to measure.
+                       The method expects a `list` of tokens, each one a `dict`.
+        :type tokens: list of dict
+        :param x: The x-position where the tokens are measured.
+        :type x: float
+        :param y: The y-position where the tokens are measured.
+        :type y: float
+        :param transform: The transformation of the tokens.
+        :type transform: :class:`matplotlib.transforms.TransformNode`
+
+        :return: The width of each token in terms of the given transformation.
+        :rtype: list of float
         """
-        drawn_lines, line_tokens = [], []
-        offset = x[0]
-        for token in tokens:
-            """
-            Draw the text token.
-            If the vertical alignment is top, the annotation grows downwards: one line after the other.
-            If the vertical alignment is bottom, the annotation grows upwards.
-            When the vertical alignment is bottom, new text is always added to the same place.
-            New lines push previous lines up.
-
-            Note that the center alignment is not considered here.
-            There is no way of knowing how many lines there will be in advance.
-            Therefore lines are centered at a later stage.
-            """
-            va = 'top' if va == 'center' else va
-            text = text_util.draw_token(figure, axes, token.get('text'), offset,
-                                        y - len(drawn_lines) * linespacing if va == 'top' else y,
-                                        token.get('style', { }), wordspacing, va=va,
-                                        transform=transform, *args, **kwargs)
-            line_tokens.append(text)
-
-            """
-            If the token exceeds the x-limit, break it into a new line.
-            The offset is reset to the left, and a new line is added.
-            The token is moved to this new line.
-            Lines do not break on punctuation marks.
-
-            Note that lists are passed by reference.
-            Therefore when the last token is removed from drawn lines when create a new line, the change is reflected here.
-            """
-            bb = util.get_bb(figure, axes, text, transform=transform)
-            if len(line_tokens) > 1 and bb.x1 > x[1] and token.get('text') not in string.punctuation:
-                self._newline(line_tokens, drawn_lines, linespacing, x[0], y, va, transform=transform)
-                util.align(figure, axes, line_tokens, xpad=wordspacing,
-                           align=util.get_alignment(align), xlim=x, va=va, transform=transform)
-                offset = x[0]
-                line_tokens = [ text ]
-
-            offset += bb.width + wordspacing
-
-        """
-        Align the last line.
-        """
-        drawn_lines.append(line_tokens)
-        util.align(figure, axes, line_tokens, xpad=wordspacing,
-                   align=util.get_alignment(align, end=True), xlim=x, va=va, transform=transform)
 
-        return drawn_lines
+        figure = self.drawable.figure
+        context = self.drawable.context
 
-    def _newline(self, line, previous_lines, linespacing, x, y, va, transform=None):
         """
-        Create a new line with the given token.
+        Measure the tokens in pixels.
+        Most tokens share the same style, so the font properties of each style are only created once.
+        """
+        fontproperties, widths = { }, [ ]
+        for token in tokens:
+            style = { **kwargs, **token.get('style', { }) }
+            key = self._get_style_key(style)
+            if key not in fontproperties:
+                fontproperties[key] = get_fontproperties(**style)
+            width, _, _ = font_measurer.measure(token.get('text'), fontproperties[key], figure.dpi, style.get('usetex'))
+            widths.append(width)
 
-        If the vertical alignment is top, the text grows downwards.
-        Therefore the last token added to the line is added to a new line.
+        """
+        Convert all widths from pixels to the given transformation at once.
+        """
+        origin = transform.transform((x, y))
+        points = [ origin ] + [ (origin[0] + width, origin[1]) for width in widths ]
+        points = context.inverted(transform).transform(points)
+        return list(points[1:, 0] - points[0, 0])
 
-        If the vertical alignment is bottom, the text grows upwards.
-        Therefore all lines are pushed up by one line.
-        The last token added to the line is moved to the start of the line.
+    def _invalidate(self):
+        """
+        Invalidate the cached virtual bounding boxes.
+        This function should be called whenever the annotation's tokens change or move.
+        """
 
-        :param line: The latest line.
-        :type line: list of :class:`matplotlib.text.Text`
-        :param previous_lines: The previously-drawn lines.
-        :type previous_lines: list of list of :class:`matplotlib.text.Text`
-        :param linespacing: The space between lines.
-        :type linespacing: float
-        :param x: The x-coordinate where the line starts.
-        :type x: float
-        :param y: The starting y-position of the annotation.
-        :type y: float
-        :param va: The vertical alignment, can be one of `top` or `bottom`.
-                   If the vertical alignment is `bottom`, the annotation grows up.
-                   If the vertical alignment is `top`, the annotation grows down.
-        :type va: str
-        :param transform: The bounding box transformation.
-                          If `None` is given, the data transformation is used.
-        :type transform: None or :class:`matplotlib.transforms.TransformNode`
+        self._version += 1
+
+    def _get_style_key(self, style):
         """
+        Get a key that identifies the given token style.
+        Tokens with the same key look the same, apart from their text.
 
-        figure = self.drawable.figure
-        axes = self.drawable.axes
+        :param style: The token's style.
+        :type style: dict
 
+        :return: A key that identifies the style.
+        :rtype: str
         """
-        Remove the last token added to the line.
-        This token will make up the new line.
-        The line that was being edited, without this token, is added to the list of previous lines—it is 'retired'.
-        """
-        token = line.pop(-1)
-        bb = util.get_bb(figure, axes, token, transform=transform)
-        previous_lines.append(line)
-
-        if va == 'bottom':
-            """
-            Move the last token to the start of the line.
-            """
-            token.set_position((x, y))
-
-            """
-            Go through the previous lines and push them up.
-            """
-            for line, previous_line in enumerate(previous_lines[::-1]):
-                for token in previous_line:
-                    position = token.get_position()
-                    bb = util.get_bb(figure, axes, token, transform=transform)
-                    token.set_position((position[0], y + (line + 1) * linespacing))
-        elif va == 'top':
-            """
-            Move the last token to a new line.
-            """
-            token.set_position((x, y - len(previous_lines) * linespacing))
+
+        return repr(sorted(style.items()))
 
     def _center(self, x, y, transform=None, *args, **kwargs):
         """
@@ -962,3 +962,250 @@ class TestAnnotation(MultiplexTest):
         """
 
         return ' '.join([ ' '.join([ token.get_text() for token in line ]) for line in lines ]).strip()
+
+    @MultiplexTest.temporary_plot
+    def test_draw_tokens_once(self):
+        """
+        Test that drawing an annotation adds each token to the axes only once.
+        """
+
+        text = 'Memphis Depay, commonly known simply as Memphis, is a Dutch professional footballer and music artist who plays as a forward and captains French club Lyon and plays for the Netherlands national team.'
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, text, (0, 1), 0, align='justify')
+        lines = annotation.draw()
+        self.assertGreater(len(lines), 1)
+        self.assertEqual(len(text.split()), len(viz.axes.texts))
+        self.assertEqual(len(text.split()), sum( len(line) for line in lines ))
+
+    @MultiplexTest.temporary_plot
+    def test_set_position_updates_offset(self):
+        """
+        Test that moving an annotation updates its offset, but not the positions of its tokens.
+        """
+
+        text = 'Memphis Depay, commonly known simply as Memphis, is a Dutch professional footballer and music artist who plays as a forward and captains French club Lyon and plays for the Netherlands national team.'
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, text, (0, 1), 0)
+        annotation.draw()
+        positions = [ token.get_position() for line in annotation.lines for token in line ]
+        bb = annotation.get_virtual_bb()
+
+        annotation.set_position((0.5, 2))
+        self.assertEqual(positions, [ token.get_position() for line in annotation.lines for token in line ])
+        self.assertEqual(0.5, round(annotation.offset.get_matrix()[0][2], 10))
+        self.assertEqual(round(2 - bb.y1, 10), round(annotation.offset.get_matrix()[1][2], 10))
+
+        _bb = annotation.get_virtual_bb()
+        self.assertEqual(0.5, round(_bb.x0, 10))
+        self.assertEqual(2, round(_bb.y1, 10))
+        self.assertEqual(round(bb.width, 10), round(_bb.width, 10))
+        self.assertEqual(round(bb.height, 10), round(_bb.height, 10))
+
+    @MultiplexTest.temporary_plot
+    def test_set_position_other_transform(self):
+        """
+        Test that an annotation can be moved in terms of a different transformation than the one used to draw it.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.set_xlim((0, 10))
+        viz.set_ylim((0, 10))
+        annotation = Annotation(viz, 'Memphis Depay', (0, 10), 5)
+        annotation.draw()
+
+        annotation.set_position((0.5, 0.5), transform=viz.axes.transAxes)
+        bb = annotation.get_virtual_bb()
+        self.assertEqual(5, round(bb.x0, 10))
+        self.assertEqual(5, round(bb.y1, 10))
+
+    @MultiplexTest.temporary_plot
+    def test_remove_resets_offset(self):
+        """
+        Test that removing an annotation resets its offset, so re-drawing it starts from its original position.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, 'Memphis Depay', (0, 1), 0)
+        annotation.draw()
+        bb = annotation.get_virtual_bb()
+        annotation.set_position((0.5, 2))
+        annotation.redraw()
+        self.assertTrue(annotation.offset.get_matrix().tolist() == [ [ 1, 0, 0 ], [ 0, 1, 0 ], [ 0, 0, 1 ] ])
+        self.assertEqual(bb.bounds, annotation.get_virtual_bb().bounds)
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_reuses_tokens(self):
+        """
+        Test that re-drawing an annotation re-uses the same tokens instead of creating new ones.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, 'Memphis Depay plays for Lyon', (0, 1), 0)
+        tokens = [ token for line in annotation.draw() for token in line ]
+        texts = len(viz.axes.texts)
+        viz.set_xlim((0, 0.5))
+        redrawn = [ token for line in annotation.redraw() for token in line ]
+        self.assertEqual(len(tokens), len(redrawn))
+        self.assertTrue(all( token is other for token, other in zip(tokens, redrawn) ))
+        self.assertEqual(texts, len(viz.axes.texts))
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_pools_surplus_tokens(self):
+        """
+        Test that when re-drawing an annotation with fewer tokens, the surplus tokens are hidden and re-used later.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, 'Memphis Depay plays for Lyon', (0, 1), 0)
+        annotation.draw()
+        texts = len(viz.axes.texts)
+
+        annotation.annotation = 'Memphis Depay'
+        lines = annotation.redraw()
+        self.assertEqual('Memphis Depay', self._reconstruct_text(lines))
+        self.assertEqual(texts, len(viz.axes.texts))
+        self.assertEqual(2, len([ text for text in viz.axes.texts if text.get_visible() ]))
+
+        annotation.annotation = 'Memphis Depay plays for Barcelona'
+        lines = annotation.redraw()
+        self.assertEqual('Memphis Depay plays for Barcelona', self._reconstruct_text(lines))
+        self.assertEqual(texts, len(viz.axes.texts))
+        self.assertTrue(all( text.get_visible() for text in viz.axes.texts ))
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_removes_surplus_tokens(self):
+        """
+        Test that when re-drawing an annotation with many fewer tokens, only a few surplus tokens are kept in the pool, and the rest are removed.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, ' '.join([ 'token' ] * 50), (0, 1), 0)
+        annotation.draw()
+        self.assertEqual(50, len(viz.axes.texts))
+
+        annotation.annotation = 'token'
+        lines = annotation.redraw()
+        self.assertEqual('token', self._reconstruct_text(lines))
+        self.assertEqual(1 + Annotation.POOL_SIZE, len(viz.axes.texts))
+        self.assertEqual(1, len([ text for text in viz.axes.texts if text.get_visible() ]))
+
+        """
+        The pooled tokens are still re-used.
+        """
+        annotation.annotation = ' '.join([ 'token' ] * 10)
+        annotation.redraw()
+        self.assertEqual(1 + Annotation.POOL_SIZE, len(viz.axes.texts))
+        self.assertEqual(10, len([ text for text in viz.axes.texts if text.get_visible() ]))
+
+    @MultiplexTest.temporary_plot
+    def test_redraw_different_style_not_reused(self):
+        """
+        Test that tokens are only re-used for tokens with the same style.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, 'Memphis', (0, 1), 0)
+        token = annotation.draw()[0][0]
+
+        annotation.annotation = [ { 'text': 'Memphis', 'style': { 'color': 'red' } } ]
+        redrawn = annotation.redraw()[0][0]
+        self.assertFalse(token is redrawn)
+        self.assertFalse(token.get_visible())
+        self.assertEqual('red', redrawn.get_color())
+
+    @MultiplexTest.temporary_plot
+    def test_remove_removes_pool(self):
+        """
+        Test that removing an annotation also removes the pooled tokens.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, 'Memphis Depay plays for Lyon', (0, 1), 0)
+        annotation.draw()
+        annotation.annotation = 'Memphis'
+        annotation.redraw()
+        annotation.remove()
+        self.assertEqual(0, len(viz.axes.texts))
+
+    @MultiplexTest.temporary_plot
+    def test_virtual_bb_cached(self):
+        """
+        Test that the virtual bounding box is cached for each transformation.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.set_xlim((0, 10))
+        viz.set_ylim((0, 10))
+        annotation = Annotation(viz, 'Memphis Depay', (0, 10), 5)
+        annotation.draw()
+
+        bb = annotation.get_virtual_bb()
+        self.assertEqual(bb.bounds, annotation.get_virtual_bb().bounds)
+        self.assertEqual({ 'hits': 1, 'misses': 1 }, { key: annotation.virtual_bbs.info()[key] for key in [ 'hits', 'misses' ] })
+
+        annotation.get_virtual_bb(transform=viz.axes.transAxes)
+        self.assertEqual(2, annotation.virtual_bbs.info()['misses'])
+
+    @MultiplexTest.temporary_plot
+    def test_virtual_bb_invalidated(self):
+        """
+        Test that the cached virtual bounding box is invalidated when the annotation moves or when the axes limits change.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.set_xlim((0, 10))
+        viz.set_ylim((0, 10))
+        annotation = Annotation(viz, 'Memphis Depay', (0, 10), 5)
+        annotation.draw()
+        bb = annotation.get_virtual_bb()
+
+        annotation.set_position((2, 2), va='bottom')
+        self.assertEqual(2, round(annotation.get_virtual_bb().x0, 10))
+        self.assertEqual(2, round(annotation.get_virtual_bb().y0, 10))
+
+        viz.set_xlim((0, 20))
+        tokens = [ token for line in annotation.lines for token in line ]
+        bbs = util.get_bbs(viz.figure, viz.axes, tokens)
+        self.assertEqual(tuple(util.union_bbs(bbs)), tuple(annotation.get_virtual_bb().extents))
+
+    @MultiplexTest.temporary_plot
+    def test_virtual_bb_axes_limits_changed_directly(self):
+        """
+        Test that the cached virtual bounding box is invalidated when the axes limits change directly, without passing through the drawable.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.set_xlim((0, 10))
+        viz.set_ylim((0, 10))
+        annotation = Annotation(viz, 'Memphis Depay', (0, 10), 5)
+        annotation.draw()
+        bb = annotation.get_virtual_bb()
+
+        viz.axes.set_xlim((0, 20))
+        self.assertNotEqual(bb.width, annotation.get_virtual_bb().width)
+        tokens = [ token for line in annotation.lines for token in line ]
+        bbs = util.get_bbs(viz.figure, viz.axes, tokens)
+        self.assertEqual(tuple(util.union_bbs(bbs)), tuple(annotation.get_virtual_bb().extents))
+
+    @MultiplexTest.temporary_plot
+    def test_virtual_bb_moved_with_annotation(self):
+        """
+        Test that when the annotation moves, the cached virtual bounding box moves with it without being measured again.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        viz.set_xlim((0, 10))
+        viz.set_ylim((0, 10))
+        annotation = Annotation(viz, 'Memphis Depay', (0, 10), 5)
+        annotation.draw()
+        annotation.get_virtual_bb()
+        misses = annotation.virtual_bbs.info()['misses']
+
+        annotation.set_position((2, 3), va='bottom')
+        bb = annotation.get_virtual_bb()
+        self.assertEqual(misses, annotation.virtual_bbs.info()['misses'])
+
+        tokens = [ token for line in annotation.lines for token in line ]
+        expected = util.union_bbs(util.get_bbs(viz.figure, viz.axes, tokens))
+        for value, expected in zip(bb.extents, expected):
+            self.assertAlmostEqual(expected, value, 10)
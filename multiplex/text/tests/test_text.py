@@ -11,6 +11,7 @@ if path not in sys.path:
     sys.path.insert(1, path)
 
 from tests.test import MultiplexTest
+from text.text import Annotation, TextAnnotation
 import drawable
 import util
 
@@ -240,6 +241,25 @@ class TestTextAnnotation(MultiplexTest):
         lines = viz.draw_text_annotation(tokens, with_legend=False)
         self.assertFalse(len(lines[0][0]))
 
+    @MultiplexTest.temporary_plot
+    def test_tighten_invalidates_virtual_bb(self):
+        """
+        Test that after tightening the layout, the annotation's virtual bounding box covers the tokens where they moved.
+        """
+
+        viz = drawable.Drawable(plt.figure(figsize=(10, 10)))
+        annotation = Annotation(viz, 'Memphis Depay, commonly known simply as Memphis', (0, 1), 0, va='top')
+        lines = annotation.draw()
+        label = viz.text(-0.1, -0.1, 'name')
+        bb = annotation.get_virtual_bb()
+
+        TextAnnotation(viz)._tighten([ ([ label ], lines[0]) ] + [ ([ ], line) for line in lines[1:] ], annotation)
+        tokens = [ token for line in annotation.lines for token in line ]
+        expected = util.union_bbs(util.get_bbs(viz.figure, viz.axes, tokens))
+        self.assertNotEqual(bb.x0, expected[0])
+        for value, expected in zip(annotation.get_virtual_bb().extents, expected):
+            self.assertAlmostEqual(expected, value, 10)
+
     @MultiplexTest.temporary_plot
     def test_lpad_bounds(self):
         """
@@ -162,7 +162,7 @@ class TextAnnotation(Visualization):
         """
         Draw a legend if it is requested.
         """
-        linespacing = text_util.get_linespacing(figure, axes, wordspacing, *args, **kwargs)
+        linespacing = text_util.get_linespacing(figure, axes, wordspacing, context=self.drawable.context, *args, **kwargs)
         labels = self._draw_legend(tokens, lines, wordspacing, linespacing,
                                    *args, **kwargs) if with_legend else [ [] ] * len(lines)
 
@@ -173,7 +173,7 @@ class TextAnnotation(Visualization):
         The axes is turned off since it has no purpose, and the y-limit is re-calculated.
         """
         drawn_lines = list(zip(labels, lines))
-        self._tighten(drawn_lines)
+        self._tighten(drawn_lines, annotation)
         axes.axis('off')
         axes.set_ylim(- len(lines) * linespacing, tpad + linespacing)
 
@@ -220,7 +220,7 @@ class TextAnnotation(Visualization):
                 if label and label not in drawn_labels:
                     drawn_labels.append(label)
                     token = text_util.draw_token(figure, axes, label, 0, line,
-                                                 style, wordspacing, va='top',
+                                                 style, wordspacing, context=self.drawable.context, va='top',
                                                  *args, **kwargs)
                     line_labels.append(token)
 
@@ -230,13 +230,13 @@ class TextAnnotation(Visualization):
             They are reversed so that the first label appears on the left.
             """
             util.align(figure, axes, line_labels[::-1], 'right', wordspacing * 4,
-                       (-1, - wordspacing * 4))
+                       (-1, - wordspacing * 4), context=self.drawable.context)
 
             labels.append(line_labels)
 
         return labels
 
-    def _tighten(self, drawn_lines):
+    def _tighten(self, drawn_lines, annotation):
         """
         Move the text visualization so that it starts from x- and y-coordinate 0.
 
@@ -245,6 +245,9 @@ class TextAnnotation(Visualization):
                            The first value of each tuple should be the legend labels.
                            The second value of each tuple should be the tokens.
         :type drawn_lines: list of float
+        :param annotation: The annotation that drew the tokens.
+                           Its cached bounding boxes are invalidated after the tokens move.
+        :type annotation: :class:`~text.annotation.Annotation`
         """
 
         figure = self.drawable.figure
@@ -253,17 +256,24 @@ class TextAnnotation(Visualization):
         """
         Calculate the necessary offset.
         """
+        legend = [ label for (labels, _) in drawn_lines for label in labels ]
         x_offset, y_offset = 0, 0
-        for (labels, tokens) in drawn_lines:
-            for label in labels:
-                bb = util.get_bb(figure, axes, label)
-                x_offset = min(x_offset, bb.x0)
-                y_offset = min(y_offset, bb.y0)
+        if legend:
+            bbs = util.get_bbs(figure, axes, legend, context=self.drawable.context)
+            x_offset = min(x_offset, bbs[:, 0].min())
+            y_offset = min(y_offset, bbs[:, 1].min())
 
         """
         Move all labels and tokens by this offset.
         """
-        for (labels, tokens) in drawn_lines:
-            for token in labels + tokens:
-                bb = util.get_bb(figure, axes, token)
-                token.set_position((bb.x0 - x_offset, bb.y0 - y_offset))
+        components = [ token for (labels, tokens) in drawn_lines for token in labels + tokens ]
+        if components:
+            bbs = util.translate_bbs(util.get_bbs(figure, axes, components, context=self.drawable.context),
+                                     -x_offset, -y_offset)
+            for component, bb in zip(components, bbs):
+                component.set_position((bb[0], bb[1]))
+
+        """
+        The tokens moved without passing through the annotation, so its cached bounding boxes are no longer valid.
+        """
+        annotation._invalidate()
@@ -2,9 +2,10 @@
 The text utility functions are generally used only with text.
 """
 
+from metrics import font_measurer, get_fontproperties
 import util
 
-def draw_token(figure, axes, text, x, y, style, wordspacing, *args, **kwargs):
+def draw_token(figure, axes, text, x, y, style, wordspacing, context=None, *args, **kwargs):
     """
     Draw the token on the plot.
 
@@ -34,6 +35,9 @@ def draw_token(figure, axes, text, x, y, style, wordspacing, *args, **kwargs):
     :param wordspacing: The space between words.
                         This value is used to add padding around words (the whitespace).
     :type wordspacing: float
+    :param context: The layout context, which caches the renderer and transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
 
     :return: The drawn text box.
     :rtype: :class:`matplotlib.text.Text`
@@ -49,22 +53,46 @@ def draw_token(figure, axes, text, x, y, style, wordspacing, *args, **kwargs):
             bbox_kwargs[arg] = kwargs.get(arg)
             del kwargs[arg]
 
-    """
-    The bbox's padding is calculated in pixels.
-    Therefore it is transformed from the provided axes coordinates to pixels.
-    """
-    wordspacing_px = (axes.transData.transform((wordspacing, 0))[0] -
-                      axes.transData.transform((0, 0))[0])
+    pad = get_pad(axes, wordspacing, kwargs.get('transform'), context=context)
     text = axes.text(x, y, text,
-                     bbox=dict(pad=wordspacing_px / 2., **bbox_kwargs),
+                     bbox=dict(pad=pad, **bbox_kwargs),
                      *args, **kwargs)
     return text
 
-def get_linespacing(figure, axes, wordspacing=0, transform=None, *args, **kwargs):
+def get_pad(axes, wordspacing, transform=None, context=None):
+    """
+    Get the padding of a token's bbox.
+    The padding is half the word spacing on each side of the token.
+
+    :param axes: The axes (or subplot) where the token is plotted.
+    :type axes: :class:`matplotlib.axes.Axes`
+    :param wordspacing: The space between words.
+    :type wordspacing: float
+    :param transform: The token's transformation.
+                      If `None` is given, the data transformation is used.
+    :type transform: None or :class:`matplotlib.transforms.TransformNode`
+    :param context: The layout context, which caches the renderer and transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
+
+    :return: The padding of the token's bbox, in pixels.
+    :rtype: float
+    """
+
+    """
+    The bbox's padding is calculated in pixels.
+    Therefore it is transformed from the token's coordinates to pixels.
+    """
+    transform = axes.transData if transform is None else transform
+    origin = context.origin(transform) if context is not None else transform.transform((0, 0))
+    wordspacing_px = transform.transform((wordspacing, 0))[0] - origin[0]
+    return wordspacing_px / 2.
+
+def get_linespacing(figure, axes, wordspacing=0, transform=None, context=None, *args, **kwargs):
     """
     Calculate the line spacing (or line height) of text tokens.
-    The line spacing is calculated by creating a token and getting its height.
-    The token is immediately removed so it is not visible on the plot.
+    The line spacing is calculated by measuring the height of a token directly from the font.
+    No text is added to the plot.
 
     When calculating the line spacing, it is important to provide the style as ``args`` and ``kwargs``.
     In this way, the line spacing considers the font, font size and other attributes that may affect the line spacing.
@@ -75,11 +103,14 @@ def get_linespacing(figure, axes, wordspacing=0, transform=None, *args, **kwargs
     :param axes: The axes (or subplot) where the component is plotted.
     :type axes: :class:`matplotlib.axes.Axes`
     :param wordspacing: The spacing between tokens.
-                        This is used to be able to create the padding around words.
+                        This is the padding around words, which does not change the height of the text.
     :type wordspacing: float
     :param transform: The bounding box transformation.
                       If `None` is given, the data transformation is used.
     :type transform: None or :class:`matplotlib.transforms.TransformNode`
+    :param context: The layout context, which caches the renderer and transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
 
     :return: The line spacing (or line height).
     :rtype: float
@@ -88,38 +119,24 @@ def get_linespacing(figure, axes, wordspacing=0, transform=None, *args, **kwargs
     transform = axes.transData if transform is None else transform
 
     """
-    Draw a dummy token first.
     Some styling options are set specifically for the bbox.
+    The bbox does not change the height of the text, so they are ignored.
     """
-    bbox_kwargs = { 'facecolor': 'None', 'edgecolor': 'None' } # TODO: Create new text utility function
-    for arg in bbox_kwargs:
-        if arg in kwargs:
-            bbox_kwargs[arg] = kwargs.get(arg)
-            del kwargs[arg]
+    for arg in [ 'facecolor', 'edgecolor' ]:
+        kwargs.pop(arg, None)
 
     """
-    The bbox's padding is calculated in pixels.
-    Therefore it is transformed from the provided axes coordinates to pixels.
-    """
-    wordspacing = wordspacing or 0
-    wordspacing_px = (transform.transform((wordspacing, 0))[0] -
-                      transform.transform((0, 0))[0])
-    token = axes.text(0, 0, 'None', bbox=dict(pad=wordspacing_px / 2., **bbox_kwargs),
-                      *args, **kwargs)
-
-    """
-    Get the height from the bbox.
+    Measure the height of a dummy token directly from the font.
     """
-    bb = util.get_bb(figure, axes, token, transform)
-    height = bb.height
-    token.remove()
-    return height
+    bb = font_measurer.get_extent('None', transform, get_fontproperties(**kwargs), figure.dpi,
+                                  kwargs.get('usetex'), context=context)
+    return bb.height
 
-def get_wordspacing(figure, axes, transform=None, *args, **kwargs):
+def get_wordspacing(figure, axes, transform=None, context=None, *args, **kwargs):
     """
     Calculate the word spacing of text tokens.
-    The word spacing is given as half a sample character.
-    The token is immediately removed so it is not visible on the plot.
+    The word spacing is given as a quarter of a sample character, measured directly from the font.
+    No text is added to the plot.
 
     When calculating the word spacing, it is important to provide the style as ``args`` and ``kwargs``.
     In this way, the word spacing considers the font, font size and other attributes that may affect the word spacing.
@@ -132,6 +149,9 @@ def get_wordspacing(figure, axes, transform=None, *args, **kwargs):
     :param transform: The bounding box transformation.
                       If `None` is given, the data transformation is used.
     :type transform: None or :class:`matplotlib.transforms.TransformNode`
+    :param context: The layout context, which caches the renderer and transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
 
     :return: The word spacing.
     :rtype: float
@@ -140,21 +160,156 @@ def get_wordspacing(figure, axes, transform=None, *args, **kwargs):
     transform = axes.transData if transform is None else transform
 
     """
-    Draw a dummy token first.
     Some styling options are set specifically for the bbox.
+    The bbox does not change the width of the text, so they are ignored.
+    """
+    for arg in [ 'facecolor', 'edgecolor', 'pad' ]:
+        kwargs.pop(arg, None)
+
+    """
+    Measure the width of a sample character directly from the font.
+    """
+    bb = font_measurer.get_extent('—', transform, get_fontproperties(**kwargs), figure.dpi,
+                                  kwargs.get('usetex'), context=context)
+    return bb.width / 4.
+
+def layout(widths, x, y, wordspacing, linespacing, align='left', va='top', breakable=None):
+    """
+    Organize tokens into lines and calculate where each token should be drawn.
+    The layout is calculated only from the widths of the tokens, so it can be calculated before any token is drawn.
+
+    Tokens are added to a line until the next token exceeds the x-limit.
+    Then, that token starts a new line.
+    A line always has at least one token, and tokens that are not breakable never start a new line.
+
+    Each line is aligned once it is complete.
+    All lines except the last one use the normal alignment, and the last line uses the alignment returned by :func:`~util.get_alignment`.
+    The alignment options and their effect are the same as in the :func:`~util.align` function.
+
+    :param widths: The width of each token.
+    :type widths: list of float
+    :param x: The start and end x-position of the lines.
+    :type x: tuple
+    :param y: The y-position of the first line if the vertical alignment is `top`, or of the last line if the vertical alignment is `bottom`.
+    :type y: float
+    :param wordspacing: The space between tokens.
+    :type wordspacing: float
+    :param linespacing: The space between lines.
+    :type linespacing: float
+    :param align: The text's alignment.
+                  Possible values:
+
+                      - ``left``
+                      - ``center``
+                      - ``right``
+                      - ``justify``
+                      - ``justify-start`` (or ``justify-left``)
+                      - ``justify-center``
+                      - ``justify-end`` or (``justify-right``)
+    :type align: str
+    :param va: The vertical alignment, can be one of `top` or `bottom`.
+               If the vertical alignment is `bottom`, the lines grow up.
+               If the vertical alignment is `top`, the lines grow down.
+    :type va: str
+    :param breakable: A list of booleans indicating whether each token can start a new line.
+                      If `None` is given, all tokens can start a new line.
+    :type breakable: None or list of bool
+
+    :return: A tuple with three lists:
+
+             - The lines, each one a list of token indices,
+             - The x- and y-position of each token, and
+             - The space between the tokens of each line.
+               The space is equal to the word spacing unless the line is justified.
+    :rtype: tuple
+
+    :raises ValueError: When the given alignment is not supported.
     """
-    bbox_kwargs = { 'facecolor': 'None', 'edgecolor': 'None', 'pad': 0 } # TODO: Create new text utility function
-    for arg in bbox_kwargs:
-        if arg in kwargs:
-            bbox_kwargs[arg] = kwargs.get(arg)
-            del kwargs[arg]
 
-    token = axes.text(0, 0, '—', bbox=dict(**bbox_kwargs), *args, **kwargs)
+    breakable = [ True ] * len(widths) if breakable is None else breakable
 
     """
-    Get the height from the bbox.
+    Break the tokens into lines.
+    A token starts a new line if it would exceed the x-limit, unless it is the first token in the line.
     """
-    bb = util.get_bb(figure, axes, token, transform)
-    width = bb.width
-    token.remove()
-    return width / 4.
+    lines, line, offset = [ ], [ ], x[0]
+    for i, width in enumerate(widths):
+        if line and offset + width > x[1] and breakable[i]:
+            lines.append(line)
+            line, offset = [ ], x[0]
+
+        line.append(i)
+        offset += width + wordspacing
+    lines.append(line)
+
+    """
+    Align each line horizontally and position it vertically.
+    If the vertical alignment is top, the first line is at the given y-coordinate and the rest go down.
+    If the vertical alignment is bottom, the last line is at the given y-coordinate and the rest go up.
+    """
+    positions, spaces = [ None ] * len(widths), [ ]
+    for i, line in enumerate(lines):
+        _y = y - i * linespacing if va == 'top' else y + (len(lines) - 1 - i) * linespacing
+        xs, space = _align([ widths[token] for token in line ], x, wordspacing,
+                           util.get_alignment(align, end=(i == len(lines) - 1)))
+        for token, _x in zip(line, xs):
+            positions[token] = (_x, _y)
+        spaces.append(space)
+
+    return lines, positions, spaces
+
+def _align(widths, x, wordspacing, align):
+    """
+    Calculate the x-position of each token in a line.
+
+    :param widths: The width of each token in the line.
+    :type widths: list of float
+    :param x: The start and end x-position of the line.
+    :type x: tuple
+    :param wordspacing: The space between tokens.
+    :type wordspacing: float
+    :param align: The line's alignment, as returned by :func:`~util.get_alignment`.
+    :type align: str
+
+    :return: A tuple with the x-position of each token and the space between tokens.
+    :rtype: tuple
+
+    :raises ValueError: When the given alignment is not supported.
+    """
+
+    space = wordspacing
+    if align == 'left':
+        start = x[0]
+    elif align == 'justify':
+        """
+        Spread the empty space evenly between the tokens so that the line fills the entire width.
+        Lines with only one token are not justified.
+        """
+        start = x[0]
+        if len(widths) > 1:
+            space = (x[1] - x[0] - sum(widths)) / (len(widths) - 1)
+    elif align == 'right':
+        """
+        Move the tokens to the end of the line in reverse.
+        """
+        xs, offset = [ ], 0
+        for width in widths[::-1]:
+            offset += width
+            xs.insert(0, x[1] - offset)
+            offset += wordspacing
+        return xs, space
+    elif align == 'center':
+        """
+        Halve the space that is left in the line and move all tokens by that value.
+        """
+        end = x[0] + sum(widths) + wordspacing * (len(widths) - 1)
+        start = x[0] + (x[1] - end) / 2.
+    else:
+        raise ValueError("Unsupported alignment %s" % align)
+
+    xs, offset = [ ], start
+    for width in widths:
+        xs.append(offset)
+        offset += width + space
+
+    return xs, space
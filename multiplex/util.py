@@ -4,11 +4,15 @@ These utilities are very general: they are used in almost all visualization type
 
 from matplotlib.transforms import Bbox
 from matplotlib.collections import PathCollection
+from matplotlib.text import Text
 from operator import sub
 
+import numpy as np
 import re
 
-def get_bb(figure, axes, component, transform=None):
+from metrics import text_metrics
+
+def get_bb(figure, axes, component, transform=None, context=None):
     """
     Get the bounding box of the given component.
 
@@ -26,25 +30,33 @@ def get_bb(figure, axes, component, transform=None):
     :param transform: The bounding box transformation.
                       If `None` is given, the data transformation is used.
     :type transform: None or :class:`matplotlib.transforms.TransformNode`
+    :param context: The layout context, which caches the renderer and inverted transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
 
     :return: The bounding box of the component.
     :rtype: :class:`matplotlib.transforms.Bbox`
     """
 
     transform = axes.transData if transform is None else transform
+    inverted = context.inverted(transform) if context is not None else transform.inverted()
 
     """
     If the component is a PathCollection, assume it's a scatter point plot.
+    If the component is text, its extent is looked up in the shared text metrics so that identical tokens are measured only once.
     """
     if type(component) is PathCollection:
-        bb = get_scatter_bb(figure, axes, component, transform)
+        bb = get_scatter_bb(figure, axes, component, transform, context=context)
+    elif type(component) is Text:
+        renderer = context.renderer if context is not None else None
+        bb = text_metrics.get_extent(figure, component, renderer).transformed(inverted)
     else:
-        renderer = figure.canvas.get_renderer()
-        bb = component.get_window_extent(renderer).transformed(transform.inverted())
+        renderer = context.renderer if context is not None else figure.canvas.get_renderer()
+        bb = component.get_window_extent(renderer).transformed(inverted)
 
     return bb
 
-def get_scatter_bb(figure, axes, component, transform):
+def get_scatter_bb(figure, axes, component, transform, context=None):
     """
     Get the bounding box of the given scatter path component.
     This function assumes that the component is a :class:`matplotlib.collections.PathCollection` with just one scatter point.
@@ -59,20 +71,136 @@ def get_scatter_bb(figure, axes, component, transform):
     :param transform: The bounding box transformation.
                       If `None` is given, the data transformation is used.
     :type transform: None or :class:`matplotlib.transforms.TransformNode`
+    :param context: The layout context, which caches the renderer and inverted transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
 
     :return: The bounding box of the scatter path.
     :rtype: :class:`matplotlib.transforms.Bbox`
     """
 
     s = component.get_sizes()[0]
-    origin = transform.inverted().transform((0, 0))
-    x = (transform.inverted().transform((s ** 0.5, 0))[0] - origin[0])/2.
-    y = (transform.inverted().transform((0, s ** 0.5))[1] - origin[1])/2.
+    if context is not None:
+        inverted, origin = context.inverted(transform), context.inverted_origin(transform)
+    else:
+        inverted = transform.inverted()
+        origin = inverted.transform((0, 0))
+    x = (inverted.transform((s ** 0.5, 0))[0] - origin[0])/2.
+    y = (inverted.transform((0, s ** 0.5))[1] - origin[1])/2.
     offset = component.get_offsets()[0]
     bb = Bbox([[offset[0] - x, offset[1] - y],
                [offset[0] + x, offset[1] + y]])
     return bb
 
+def get_bbs(figure, axes, components, transform=None, context=None):
+    """
+    Get the bounding boxes of all the given components at once.
+
+    This function is equivalent to calling :func:`~util.get_bb` on each component, but it returns the bounding boxes as a NumPy array.
+    Each row in the array is one component's bounding box, made up of its ``x0``, ``y0``, ``x1`` and ``y1`` coordinates.
+    All of the extents are converted to the given transformation in one operation, so it is much faster than creating a :class:`matplotlib.transforms.Bbox` for every component.
+
+    Unlike the :func:`~util.get_scatter_bb` function, this function supports scatter path components with more than one point.
+    The bounding box of such components covers all of their points.
+
+    :param figure: The figure that the components occupy.
+                   This is used to get the figure renderer.
+    :type figure: :class:`matplotlib.figure.Figure`
+    :param axes: The axes (or subplot) where the components are plotted.
+    :type axes: :class:`matplotlib.axes.Axes`
+    :param components: The components whose bounding boxes will be fetched.
+    :type components: list of object
+    :param transform: The bounding box transformation.
+                      If `None` is given, the data transformation is used.
+    :type transform: None or :class:`matplotlib.transforms.TransformNode`
+    :param context: The layout context, which caches the renderer and inverted transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
+
+    :return: An array of shape (N, 4), with one bounding box for each component.
+    :rtype: :class:`numpy.ndarray`
+    """
+
+    transform = axes.transData if transform is None else transform
+    inverted = context.inverted(transform) if context is not None else transform.inverted()
+    renderer = context.renderer if context is not None else figure.canvas.get_renderer()
+
+    """
+    Get the extents of all components in display coordinates.
+    Scatter path components are skipped for now because their extents are calculated separately.
+    """
+    bbs = np.zeros((len(components), 4))
+    scatter = [ ]
+    for i, component in enumerate(components):
+        if type(component) is PathCollection:
+            scatter.append(i)
+        elif type(component) is Text:
+            bbs[i] = text_metrics.get_extent(figure, component, renderer).extents
+        else:
+            bbs[i] = component.get_window_extent(renderer).extents
+
+    """
+    Convert all the extents to the given transformation in one operation.
+    """
+    if len(components):
+        bbs = inverted.transform(bbs.reshape(-1, 2)).reshape(-1, 4)
+
+    """
+    Calculate the bounding box of each scatter path component.
+    Like in the :func:`~util.get_scatter_bb` function, the radius of each point is half the square root of its size, in pixels.
+    The offsets are converted to the given transformation only if the points were drawn using a different transformation.
+    """
+    if scatter:
+        origin = context.inverted_origin(transform) if context is not None else inverted.transform((0, 0))
+    for i in scatter:
+        component = components[i]
+        offsets = np.asarray(component.get_offsets(), dtype=float).reshape(-1, 2)
+        if not len(offsets):
+            continue
+
+        if component.get_offset_transform() is not transform:
+            offsets = inverted.transform(component.get_offset_transform().transform(offsets))
+
+        sizes = np.sqrt(np.resize(np.asarray(component.get_sizes(), dtype=float), len(offsets)))
+        radii = inverted.transform(np.column_stack((sizes, sizes))) - origin
+        x0, y0 = np.min(offsets - radii / 2., axis=0)
+        x1, y1 = np.max(offsets + radii / 2., axis=0)
+        bbs[i] = (x0, y0, x1, y1)
+
+    return bbs
+
+def union_bbs(bbs):
+    """
+    Get the smallest bounding box that covers all of the given bounding boxes.
+
+    :param bbs: An array of shape (N, 4) with the bounding boxes, such as the one returned by :func:`~util.get_bbs`.
+                The array should not be empty.
+    :type bbs: :class:`numpy.ndarray`
+
+    :return: The union of the bounding boxes as an array made up of the ``x0``, ``y0``, ``x1`` and ``y1`` coordinates.
+    :rtype: :class:`numpy.ndarray`
+    """
+
+    bbs = np.asarray(bbs, dtype=float).reshape(-1, 4)
+    return np.concatenate((bbs[:, :2].min(axis=0), bbs[:, 2:].max(axis=0)))
+
+def translate_bbs(bbs, x=0, y=0):
+    """
+    Move the given bounding boxes by the given offsets.
+
+    :param bbs: An array of shape (N, 4) with the bounding boxes, such as the one returned by :func:`~util.get_bbs`.
+    :type bbs: :class:`numpy.ndarray`
+    :param x: The offset along the x-axis.
+    :type x: float
+    :param y: The offset along the y-axis.
+    :type y: float
+
+    :return: A new array with the moved bounding boxes.
+    :rtype: :class:`numpy.ndarray`
+    """
+
+    return np.asarray(bbs, dtype=float).reshape(-1, 4) + (x, y, x, y)
+
 def to_px(axes, bb, transform=None):
     """
     Convert the given bounding box to pixels based on the given transform.
@@ -105,6 +233,8 @@ def overlapping(figure, axes, c1, c2, *args, **kwargs):
 
         Since the overlap considers the rectangular bounding box, it is not perfectly precise.
 
+    Any other arguments and keyword arguments, such as the ``transform`` and the layout ``context``, are passed on to the :func:`~util.get_bb` function.
+
     :param figure: The figure that the component occupies.
                    This is used to get the figure renderer.
     :type figure: :class:`matplotlib.figure.Figure`
@@ -159,6 +289,208 @@ def overlapping_bb(bb1, bb2):
          bb1.y0 == bb2.y0 and bb1.y1 == bb2.y1)
     )
 
+def overlapping_bbs(bbs1, bbs2=None):
+    """
+    Check which of the given bounding boxes overlap.
+    This function is equivalent to calling :func:`~util.overlapping_bb` on every pair of bounding boxes, but it compares them all at once.
+
+    :param bbs1: An array of shape (N, 4) with the first bounding boxes, such as the one returned by :func:`~util.get_bbs`.
+    :type bbs1: :class:`numpy.ndarray`
+    :param bbs2: An array of shape (M, 4) with the second bounding boxes.
+                 If `None` is given, the first bounding boxes are compared with each other.
+    :type bbs2: None or :class:`numpy.ndarray`
+
+    :return: A boolean array of shape (N, M).
+             Each cell indicates whether the bounding box in the first array overlaps with the bounding box in the second array.
+    :rtype: :class:`numpy.ndarray`
+    """
+
+    bbs1 = np.asarray(bbs1, dtype=float).reshape(-1, 4)
+    bbs2 = bbs1 if bbs2 is None else np.asarray(bbs2, dtype=float).reshape(-1, 4)
+
+    """
+    Make sure that the bounding boxes go from the bottom-left to the top-right corner.
+    Then, expand the bounding boxes along different dimensions so that they can be compared pairwise.
+    """
+    x0, x1 = np.minimum(bbs1[:, 0], bbs1[:, 2])[:, None], np.maximum(bbs1[:, 0], bbs1[:, 2])[:, None]
+    y0, y1 = np.minimum(bbs1[:, 1], bbs1[:, 3])[:, None], np.maximum(bbs1[:, 1], bbs1[:, 3])[:, None]
+    _x0, _x1 = np.minimum(bbs2[:, 0], bbs2[:, 2])[None, :], np.maximum(bbs2[:, 0], bbs2[:, 2])[None, :]
+    _y0, _y1 = np.minimum(bbs2[:, 1], bbs2[:, 3])[None, :], np.maximum(bbs2[:, 1], bbs2[:, 3])[None, :]
+
+    same_x = (x0 == _x0) & (x1 == _x1)
+    same_y = (y0 == _y0) & (y1 == _y1)
+    return (
+        (((_x0 < x0) & (x0 < _x1)) | ((_x0 < x1) & (x1 < _x1)) | same_x) &
+        (((_y0 < y0) & (y0 < _y1)) | ((_y0 < y1) & (y1 < _y1)) | same_y) |
+        (((x0 < _x0) & (_x0 < x1)) | ((x0 < _x1) & (_x1 < x1)) | same_x) &
+        (((y0 < _y0) & (_y0 < y1)) | ((y0 < _y1) & (_y1 < y1)) | same_y)
+    )
+
+def overlapping_groups(bbs, indices=None):
+    """
+    Group the given bounding boxes into clusters of overlapping bounding boxes.
+    Two bounding boxes are in the same group if they overlap, or if they both overlap with a third bounding box in the group.
+    The overlaps are calculated in the same way as :func:`~util.overlapping_bb`.
+
+    Instead of comparing every pair of bounding boxes, this function sweeps the bounding boxes from the bottom up.
+    Bounding boxes that do not overlap along the y-axis are never compared.
+
+    :param bbs: An array of shape (N, 4) with the bounding boxes, such as the one returned by :func:`~util.get_bbs`.
+    :type bbs: :class:`numpy.ndarray`
+    :param indices: The indices of the bounding boxes to check for overlaps.
+                    If they are given, overlaps between two bounding boxes that are not in this list are ignored.
+                    If `None` is given, all bounding boxes are checked.
+    :type indices: None or list of int
+
+    :return: A list of groups of overlapping bounding boxes, as lists of indices.
+             Bounding boxes that do not overlap with any other bounding box are not returned.
+             The groups, and the indices in each group, are sorted in ascending order of the bounding boxes' bottom.
+    :rtype: list of list of int
+    """
+
+    bbs = np.asarray(bbs, dtype=float).reshape(-1, 4)
+    y0, y1 = np.minimum(bbs[:, 1], bbs[:, 3]), np.maximum(bbs[:, 1], bbs[:, 3])
+    checked = np.ones(len(bbs), dtype=bool)
+    if indices is not None:
+        checked[:] = False
+        checked[list(indices)] = True
+
+    """
+    Sort the bounding boxes by their bottom.
+    Each bounding box can only overlap with the bounding boxes above it that start before it ends.
+    """
+    order = np.argsort(y0, kind='stable')
+    ends = np.searchsorted(y0[order], y1[order], side='right')
+
+    """
+    Join the overlapping bounding boxes into groups.
+    The groups are stored as a forest: each bounding box points to another bounding box in its group, until the root.
+    """
+    parents = list(range(len(bbs)))
+    for i, end in enumerate(ends):
+        candidates = order[i + 1:end]
+        if not checked[order[i]]:
+            candidates = candidates[checked[candidates]]
+
+        if not len(candidates):
+            continue
+
+        overlapping = overlapping_bbs(bbs[order[i]], bbs[candidates])[0]
+        for j in candidates[overlapping]:
+            _union(parents, order[i], j)
+
+    groups = { }
+    for i in order:
+        groups.setdefault(_find(parents, i), [ ]).append(int(i))
+
+    return [ group for group in groups.values() if len(group) > 1 ]
+
+def _find(parents, i):
+    """
+    Find the root of the group of the given element.
+    The path to the root is shortened along the way, so that later look-ups are faster.
+
+    :param parents: The parent of each element.
+                    Roots are their own parents.
+    :type parents: list of int
+    :param i: The element whose root to find.
+    :type i: int
+
+    :return: The root of the element's group.
+    :rtype: int
+    """
+
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+
+    return i
+
+def _union(parents, i, j):
+    """
+    Merge the groups of the two given elements.
+
+    :param parents: The parent of each element.
+                    Roots are their own parents.
+    :type parents: list of int
+    :param i: The first element.
+    :type i: int
+    :param j: The second element.
+    :type j: int
+    """
+
+    i, j = _find(parents, i), _find(parents, j)
+    if i != j:
+        parents[max(i, j)] = min(i, j)
+
+def distribute(positions, heights, lower=None, upper=None):
+    """
+    Distribute intervals along one dimension so that they do not overlap.
+    The intervals keep the order of their desired positions, and they are moved as little as possible.
+    More precisely, the distribution minimizes the sum of the squared distances between each interval's center and its desired position.
+
+    The distribution is solved directly, without moving the intervals repeatedly.
+    After sorting the intervals, the problem becomes an isotonic regression, which the pool-adjacent-violators algorithm solves in one pass.
+
+    :param positions: The desired center of each interval.
+    :type positions: list of float or :class:`numpy.ndarray`
+    :param heights: The height of each interval.
+    :type heights: list of float or :class:`numpy.ndarray`
+    :param lower: The lowest position that the intervals may occupy.
+                  If `None` is given, the intervals are not bounded from below.
+    :type lower: None or float
+    :param upper: The highest position that the intervals may occupy.
+                  If `None` is given, the intervals are not bounded from above.
+                  If the intervals do not fit between the lower and upper bounds, they are centered between them.
+    :type upper: None or float
+
+    :return: The bottom of each interval, in the same order as the given positions.
+    :rtype: :class:`numpy.ndarray`
+    """
+
+    positions = np.asarray(positions, dtype=float).reshape(-1)
+    heights = np.asarray(heights, dtype=float).reshape(-1)
+    if not len(positions):
+        return np.zeros(0)
+
+    """
+    Sort the intervals by their desired position.
+    Once sorted, each interval's bottom is the bottom of the stack plus the heights of the intervals below it.
+    Therefore the problem is to find the non-decreasing stack bottoms that are closest to each interval's desired stack bottom.
+    """
+    order = np.argsort(positions, kind='stable')
+    heights = heights[order]
+    offsets = np.concatenate(([ 0 ], np.cumsum(heights)[:-1]))
+    targets = positions[order] - heights / 2. - offsets
+
+    """
+    Pool adjacent violators: whenever a block wants to be lower than the block below it, merge the two.
+    A merged block is placed at the mean of its targets.
+    """
+    values, sizes = [ ], [ ]
+    for target in targets:
+        values.append(target)
+        sizes.append(1)
+        while len(values) > 1 and values[-2] > values[-1]:
+            value, size = values.pop(), sizes.pop()
+            values[-1] = (values[-1] * sizes[-1] + value * size) / (sizes[-1] + size)
+            sizes[-1] += size
+
+    """
+    Clipping the regression to the bounds gives the best distribution within the bounds.
+    """
+    bottoms = np.repeat(values, sizes)
+    total = heights.sum()
+    if lower is not None and upper is not None and upper - lower < total:
+        bottoms[:] = (lower + upper - total) / 2.
+    else:
+        bottoms = bottoms if lower is None else np.maximum(bottoms, lower)
+        bottoms = bottoms if upper is None else np.minimum(bottoms, upper - total)
+
+    distributed = np.zeros(len(positions))
+    distributed[order] = bottoms + offsets
+    return distributed
+
 def get_alignment(align, end=False):
     """
     Get the proper alignment value for the current line.
@@ -193,7 +525,7 @@ def get_alignment(align, end=False):
         return alignment[0] if alignment[0] else alignment[1]
 
 def align(figure, axes, items, align='left', xpad=0,
-          xlim=None, va='top', transform=None, *args, **kwargs):
+          xlim=None, va='top', transform=None, context=None, *args, **kwargs):
     """
     Align the given objects horizontally around the given ``xlim``.
 
@@ -229,6 +561,9 @@ def align(figure, axes, items, align='left', xpad=0,
     :param transform: The bounding box transformation.
                       If `None` is given, the data transformation is used.
     :type transform: None or :class:`matplotlib.transforms.TransformNode`
+    :param context: The layout context, which caches the renderer and inverted transformations.
+                    If `None` is given, they are fetched anew.
+    :type context: None or :class:`~layout.LayoutContext`
 
     :raises: ValueError
     """
@@ -259,28 +594,28 @@ def align(figure, axes, items, align='left', xpad=0,
 
         space = 0
         for i in range(len(items) - 1):
-            space += (get_bb(figure, axes, items[i + 1], transform=transform).x0 -
-                      get_bb(figure, axes, items[i], transform=transform).x1)
+            space += (get_bb(figure, axes, items[i + 1], transform=transform, context=context).x0 -
+                      get_bb(figure, axes, items[i], transform=transform, context=context).x1)
 
-        last = get_bb(figure, axes, items[-1], transform=transform)
+        last = get_bb(figure, axes, items[-1], transform=transform, context=context)
         space = space + xlim[1] - last.x1
         space = space / (len(items) - 1)
 
-        wordspacing_px = (transform.transform((space, 0))[0] -
-                          transform.transform((0, 0))[0])
+        origin = context.origin(transform) if context is not None else transform.transform((0, 0))
+        wordspacing_px = transform.transform((space, 0))[0] - origin[0]
 
         """
         Re-position the items.
         """
         offset = xlim[0]
         for item in items:
-            bb = get_bb(figure, axes, item, transform=transform)
+            bb = get_bb(figure, axes, item, transform=transform, context=context)
             item.set_position((offset, bb.y1 if va == 'top' else bb.y0))
             bb = item.get_bbox_patch()
             item.set_bbox(dict(
                 facecolor=bb.get_facecolor(), edgecolor=bb.get_edgecolor(),
                 pad=wordspacing_px / 2.))
-            bb = get_bb(figure, axes, item, transform=transform)
+            bb = get_bb(figure, axes, item, transform=transform, context=context)
             offset += bb.width + space
     elif align == 'right':
         if len(items):
@@ -290,7 +625,7 @@ def align(figure, axes, items, align='left', xpad=0,
 
             offset = 0
             for item in items[::-1]:
-                bb = get_bb(figure, axes, item, transform=transform)
+                bb = get_bb(figure, axes, item, transform=transform, context=context)
                 offset += bb.width
                 item.set_position((xlim[1] - offset, bb.y1 if va == 'top' else bb.y0))
                 offset += xpad
@@ -301,16 +636,16 @@ def align(figure, axes, items, align='left', xpad=0,
             Then, halve it and move all items by that value.
             """
 
-            bb = get_bb(figure, axes, items[-1], transform=transform)
+            bb = get_bb(figure, axes, items[-1], transform=transform, context=context)
             offset = (xlim[1] - bb.x1)/2.
 
             for item in items:
-                bb = get_bb(figure, axes, item, transform=transform)
+                bb = get_bb(figure, axes, item, transform=transform, context=context)
                 item.set_position((bb.x0 + offset, bb.y1 if va == 'top' else bb.y0))
     else:
         raise ValueError("Unsupported alignment %s" % align)
 
-def get_aspect(axes):
+def get_aspect(axes, context=None):
     """
     Get the aspect ratio of the axes.
     The calculation considers the display ratio as well as the data ratio.
@@ -321,11 +656,17 @@ def get_aspect(axes):
 
     :param axes: The axes whose aspect ratio will be calculated.
     :type axes: :class:`matplotlib.axes.Axes`
+    :param context: The layout context, which caches the aspect ratio until the figure changes.
+                    If `None` is given, the aspect ratio is calculated anew.
+    :type context: None or :class:`~layout.LayoutContext`
 
     :return: The aspect ratio as a fraction of the display ratio and the data ratio.
     :rtype: float
     """
 
+    if context is not None:
+        return context.get_aspect(axes)
+
     """
     Get the figure and axes dimensions.
     """
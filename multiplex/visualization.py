@@ -59,6 +59,14 @@ class Visualization(ABC):
 
         return
 
+    def _fit(self):
+        """
+        Fit the axes to the visualization.
+        If the :class:`~drawable.Drawable` is drawing in a batch, the axes are only fit once, when the batch ends.
+        """
+
+        self.drawable._defer(self._fit_axes)
+
     def _fit_axes(self):
         """
         Make space for the x-axes.
@@ -90,13 +98,13 @@ class Visualization(ABC):
 
                 # find the new offset of the axes
                 xlim = axes.get_xlim()
-                tick_bbs = [ util.get_bb(figure, axes, tick) for tick in ticks ]
+                tick_bbs = util.get_bbs(figure, axes, ticks, context=self.drawable.context)
                 if spine == 'left':
-                    offset = min(bb.x0 for bb in tick_bbs)
+                    offset = tick_bbs[:, 0].min()
                     axes.set_xlim((min(offset, xlim[0]), xlim[1]))
                     secondary.set_xlim((min(offset, xlim[0]), xlim[1]))
                 else:
-                    offset = max(bb.x1 for bb in tick_bbs)
+                    offset = tick_bbs[:, 2].max()
                     axes.set_xlim((xlim[0], max(offset, xlim[1])))
                     secondary.set_xlim((xlim[0], max(offset, xlim[1])))
 
@@ -30,11 +30,15 @@ echo -e "${HIGHLIGHT}Visualizations${DEFAULT}"
 echo -e "${HIGHLIGHT}==============${DEFAULT}"
 python3 -m unittest multiplex.bar.tests.test_bar_100
 python3 -m unittest multiplex.graph.tests.test_graph
+python3 -m unittest multiplex.graph.tests.test_cache
 python3 -m unittest multiplex.population.tests.test_population
 python3 -m unittest multiplex.slope.tests.test_slope
 python3 -m unittest multiplex.timeseries.tests.test_time_series
 
 echo -e "${HIGHLIGHT}Utility${DEFAULT}"
 echo -e "${HIGHLIGHT}=======${DEFAULT}"
+python3 -m unittest multiplex.tests.test_layout
+python3 -m unittest multiplex.tests.test_metrics
+python3 -m unittest multiplex.tests.test_spatial
 python3 -m unittest multiplex.tests.test_text_util
 python3 -m unittest multiplex.tests.test_util